@@ -35,13 +35,26 @@ class Extractor:
     BLOB = 'BLOB'
 
     @staticmethod
-    def extract_styles(file_path: str, symbol_type: str, mdbtools_path=None):  # pylint: disable=too-many-locals
+    def extract_styles(file_path: str, symbol_type: str, mdbtools_path=None):
         """
         Extracts all matching styles of a given symbol type from a .style file
         :param file_path: path to .style file
         :param symbol_type: symbol type to extract, e.g. Extractor.FILL_SYMBOLS
         :return: list of raw symbols, ready for parsing
         """
+        return list(Extractor.iter_styles(file_path, symbol_type, mdbtools_path))
+
+    @staticmethod
+    def iter_styles(file_path: str, symbol_type: str, mdbtools_path=None, chunk_size: int = 65536):
+        """
+        Extracts all matching styles of a given symbol type from a .style file,
+        yielding each raw symbol as soon as it has been exported. This allows
+        symbols to be parsed while mdb-export is still running.
+        :param file_path: path to .style file
+        :param symbol_type: symbol type to extract, e.g. Extractor.FILL_SYMBOLS
+        :param chunk_size: size of chunks to read from mdb-export output
+        :return: iterator of raw symbols, ready for parsing
+        """
 
         binary = 'mdb-export'
         if mdbtools_path is not None:
@@ -62,58 +75,92 @@ class Extractor:
 
         CREATE_NO_WINDOW = 0x08000000
         try:
-            result = subprocess.run(export_args, stdout=subprocess.PIPE, creationflags=CREATE_NO_WINDOW)
+            process = subprocess.Popen(export_args, stdout=subprocess.PIPE, creationflags=CREATE_NO_WINDOW)
         except ValueError:
-            result = subprocess.run(export_args, stdout=subprocess.PIPE)
-
-        raw_symbols = []
-        for r in result.stdout.split(Extractor.__NEWLINE):
-            if not r:
-                continue
-
-            res = r.split(Extractor.__DELIMITER)
-            if len(res) == 5:
-                symbol_id, name, category, blob, tags = res
-            elif len(res) == 4:
-                symbol_id, name, category, blob = res
-                tags = None
-            else:
-                assert False, 'Error reading style table'
-
-            def remove_quote(val):
-                """
-                Removes the custom quotation character from start/end of values
-                """
-                if val[:len(Extractor.__QUOTE)] == Extractor.__QUOTE:
-                    val = val[len(Extractor.__QUOTE):]
-                if val[-len(Extractor.__QUOTE):] == Extractor.__QUOTE:
-                    val = val[:-len(Extractor.__QUOTE)]
-                return val
-
-            def extract_text(val):
-                """
-                Extracts a text component from a binary part
-                :param val: binary field value
-                :return: str value
-                """
-                val = remove_quote(val)
-                val = val.decode('UTF-8')
-                return val
-
-            # need to strip __QUOTE from blob too
-            blob = remove_quote(blob)
-
-            # on windows, mdbtools does a weird thing and replaces all 0a bytes with 0a0d. Wonderful wonderful
-            # Windows new endings come round to bite us again
-            blob = blob.replace(b'\r\n', b'\n')
-
-            symbol = {
-                Extractor.NAME: extract_text(name),
-                Extractor.CATEGORY: extract_text(category),
-                Extractor.TAGS: extract_text(tags) if tags else '',
-                Extractor.ID: extract_text(symbol_id),
-                Extractor.BLOB: blob
-            }
-            raw_symbols.append(symbol)
-
-        return raw_symbols
+            process = subprocess.Popen(export_args, stdout=subprocess.PIPE)
+
+        with process:
+            for record in Extractor.split_records(process.stdout, chunk_size):
+                yield Extractor.parse_record(record)
+
+    @staticmethod
+    def split_records(file_handle, chunk_size: int = 65536):
+        """
+        Splits the raw mdb-export output read from a file handle into records,
+        yielding each record as soon as its terminator has been read
+        """
+        separator = Extractor.__NEWLINE
+        pending = bytearray()
+        # offset of the first byte in the buffer not yet yielded as part of a record
+        consumed = 0
+        while True:
+            chunk = file_handle.read(chunk_size)
+            if not chunk:
+                break
+            # only search the part of the buffer which may contain a new separator
+            search_start = max(consumed, len(pending) - len(separator) + 1)
+            pending += chunk
+            end = pending.find(separator, search_start)
+            while end >= 0:
+                if end > consumed:
+                    yield bytes(pending[consumed:end])
+                consumed = end + len(separator)
+                end = pending.find(separator, consumed)
+            # discard consumed bytes once they make up most of the buffer (as PushParser does),
+            # rather than copying the remaining bytes after every chunk
+            if consumed >= len(pending) // 2:
+                del pending[:consumed]
+                consumed = 0
+        if consumed < len(pending):
+            yield bytes(pending[consumed:])
+
+    @staticmethod
+    def parse_record(r: bin) -> dict:
+        """
+        Parses a single raw mdb-export record into a raw symbol
+        :param r: raw record
+        :return: raw symbol, ready for parsing
+        """
+        res = r.split(Extractor.__DELIMITER)
+        if len(res) == 5:
+            symbol_id, name, category, blob, tags = res
+        elif len(res) == 4:
+            symbol_id, name, category, blob = res
+            tags = None
+        else:
+            assert False, 'Error reading style table'
+
+        def remove_quote(val):
+            """
+            Removes the custom quotation character from start/end of values
+            """
+            if val[:len(Extractor.__QUOTE)] == Extractor.__QUOTE:
+                val = val[len(Extractor.__QUOTE):]
+            if val[-len(Extractor.__QUOTE):] == Extractor.__QUOTE:
+                val = val[:-len(Extractor.__QUOTE)]
+            return val
+
+        def extract_text(val):
+            """
+            Extracts a text component from a binary part
+            :param val: binary field value
+            :return: str value
+            """
+            val = remove_quote(val)
+            val = val.decode('UTF-8')
+            return val
+
+        # need to strip __QUOTE from blob too
+        blob = remove_quote(blob)
+
+        # on windows, mdbtools does a weird thing and replaces all 0a bytes with 0a0d. Wonderful wonderful
+        # Windows new endings come round to bite us again
+        blob = blob.replace(b'\r\n', b'\n')
+
+        return {
+            Extractor.NAME: extract_text(name),
+            Extractor.CATEGORY: extract_text(category),
+            Extractor.TAGS: extract_text(tags) if tags else '',
+            Extractor.ID: extract_text(symbol_id),
+            Extractor.BLOB: blob
+        }
@@ -6,12 +6,13 @@ Scans a binary blob for interesting looking bits, which may give clues to revers
 
 import string
 from struct import unpack
-import binascii
 from colorama import Fore
 
 from slyr.parser.stream import Stream
 from slyr.parser.object_registry import REGISTRY
 from slyr.parser.objects.colors import Color
+from slyr.parser.parse_tree import ParseTree, ParseNode
+from slyr.parser.trace import TraceEvent
 
 
 class ObjectScan:
@@ -148,14 +149,13 @@ class GuidCodeScan(ObjectScan):
 
     def check_handle(self, file_handle):
         try:
-            guid_bin = binascii.hexlify(file_handle.read(16))
-            guid = REGISTRY.hex_to_guid(guid_bin)
+            clsid = file_handle.read(16)
 
             # check first in unimplemented types
-            if guid in REGISTRY.NOT_IMPLEMENTED_GUIDS:
-                return GuidCodeMatch(file_handle.tell() - 16, 16, REGISTRY.NOT_IMPLEMENTED_GUIDS[guid])
+            if clsid in REGISTRY.not_implemented_clsids:
+                return GuidCodeMatch(file_handle.tell() - 16, 16, REGISTRY.not_implemented_clsids[clsid])
 
-            obj = REGISTRY.create_object(guid)
+            obj = REGISTRY.create_object_from_clsid(clsid)
             if obj is None:
                 return None
             return GuidCodeMatch(file_handle.tell() - 16, 16, str(obj.__class__.__name__))
@@ -323,5 +323,54 @@ class PersistentScan(ObjectScan):
         return None
 
 
+class StructMatch(ObjectMatch):
+    """
+    Match for a run of fields read in a single struct call
+    """
+
+    def __init__(self, match_start, match_length, found_values):
+        super().__init__(match_start, match_length)
+        self.found_values = found_values
+
+    @staticmethod
+    def precedence():
+        return 30
+
+    @staticmethod
+    def color():
+        return Fore.LIGHTGREEN_EX
+
+    def value(self):
+        return ','.join(str(v) for v in self.found_values)
+
+
 SCANNERS = [StringScan(), GuidCodeScan(), DoubleScan(), IntScan(),
             ColorScan(), PersistentScan()]
+
+INT_KINDS = (TraceEvent.UCHAR, TraceEvent.INT, TraceEvent.UINT, TraceEvent.ULONG, TraceEvent.USHORT)
+
+
+def matches_from_parse_tree(tree: ParseTree):
+    """
+    Creates scan matches from the byte spans recorded while parsing a blob, as an
+    alternative to brute force scanning every offset with SCANNERS.
+    Object nodes must have been recorded with keep_objects=True in order for color
+    matches to be created.
+    """
+    res = []
+    for node in tree.root.walk():
+        if node.kind == ParseNode.OBJECT:
+            res.append(GuidCodeMatch(node.start, 16, node.class_name))
+            if isinstance(node.obj, Color):
+                res.append(ColorMatch(node.start + 16, node.size - 16, node.obj.model, node.obj.to_dict()))
+        elif node.kind == TraceEvent.GUID:
+            res.append(GuidCodeMatch(node.start, node.size, node.value))
+        elif node.kind == TraceEvent.STRING:
+            res.append(StringMatch(node.start, node.size, node.value))
+        elif node.kind == TraceEvent.DOUBLE:
+            res.append(DoubleMatch(node.start, node.size, node.value))
+        elif node.kind in INT_KINDS:
+            res.append(IntMatch(node.start, node.size, node.value))
+        elif node.kind == TraceEvent.STRUCT and node.size:
+            res.append(StructMatch(node.start, node.size, node.value))
+    return res
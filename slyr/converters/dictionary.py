@@ -380,7 +380,7 @@ class DictionaryConverter(Converter):  # pylint: disable=too-many-public-methods
         """
         out = {
             'pattern_interval': template.pattern_interval,
-            'pattern_parts': template.pattern_parts
+            'pattern_parts': [list(p) for p in template.pattern_parts]
         }
         return out
 
@@ -3,7 +3,35 @@
 Extracts colors from a persistent stream binary
 """
 
-from slyr.parser.color_lut import COLOR_LUT
+from functools import lru_cache
+from struct import Struct
+
+# the lookup table is memory mapped, so is only imported when first needed
+COLOR_LUT = None
+
+# Reference white D65
+
+# While 0.95047 is commonly used here, the actual REC709 standard
+# has a white point of xw = 0.3127, yw = 0.3290 (see https://en.wikipedia.org/wiki/Rec._709)
+# scaling this to the equivalent Yr of 1.0, we get an
+# Xr value of 0.3127 * 1 / 0.329 = 0.9504559270516716
+# and yes, this small variation does give a real difference in the
+# accuracy of the converted colors!!
+WHITE_X = 0.9504559270516716
+WHITE_Y = 1.00000
+# Scaling the standard value of 1.08883 to use the rec 709 white point
+# gives 1.08883 * 0.95047 * yw / xw = 1.0888461217873364
+WHITE_Z = 1.0888461217873364
+
+# CIE constants
+E = 0.008856
+K = 903.3
+
+# packed CIELAB values, as stored in persistent streams
+LAB = Struct('<3d')
+
+# number of packed CIELAB values for which the converted RGB value is cached
+LAB_CACHE_SIZE = 4096
 
 
 def xyz_to_rgb(x, y, z):
@@ -17,6 +45,17 @@ def xyz_to_rgb(x, y, z):
     return r, g, b
 
 
+def rgb_to_xyz(r, g, b):
+    """Translate linear RGB to XYZ, the inverse of xyz_to_rgb"""
+
+    # inverse of the AppleRGB XYZ to RGB matrix
+    x = 0.4497288 * r + 0.3162486 * g + 0.1844926 * b
+    y = 0.2446525 * r + 0.6720283 * g + 0.0833192 * b
+    z = 0.0251848 * r + 0.1411824 * g + 0.9224628 * b
+
+    return x, y, z
+
+
 def apply_gamma(r, g, b):
     """Apply gamma conversion"""
 
@@ -42,8 +81,8 @@ def cielab_to_xyz(l, a, b):
     fy = (l + 16) / 116.0
     fz = fy - (b / 200.0)
     fx = a / 500.0 + fy
-    e = 0.008856
-    k = 903.3
+    e = E
+    k = K
     if fx ** 3 > e:
         xr = fx ** 3
     else:
@@ -57,21 +96,31 @@ def cielab_to_xyz(l, a, b):
     else:
         zr = (116 * fz - 16) / k
 
-    # Reference white D65
+    return xr * WHITE_X, yr * WHITE_Y, zr * WHITE_Z
+
+
+def remove_gamma(r, g, b):
+    """Linearize gamma companded 0-1 values, the inverse of apply_gamma"""
+
+    return r ** 1.8, g ** 1.8, b ** 1.8
 
-    # While 0.95047 is commonly used here, the actual REC709 standard
-    # has a white point of xw = 0.3127, yw = 0.3290 (see https://en.wikipedia.org/wiki/Rec._709)
-    # scaling this to the equivalent Yr of 1.0, we get an
-    # Xr value of 0.3127 * 1 / 0.329 = 0.9504559270516716
-    # and yes, this small variation does give a real difference in the
-    # accuracy of the converted colors!!
-    Xr = 0.9504559270516716
-    Yr = 1.00000
-    # Scaling the standard value of 1.08883 to use the rec 709 white point
-    # gives 1.08883 * 0.95047 * yw / xw = 1.0888461217873364
-    Zr = 1.0888461217873364
 
-    return xr * Xr, yr * Yr, zr * Zr
+def xyz_to_cielab(x, y, z):
+    """Translate xyz color to lab, the inverse of cielab_to_xyz"""
+
+    def f(t):
+        """
+        CIELAB companding function
+        """
+        if t > E:
+            return t ** (1 / 3)
+        return (K * t + 16) / 116.0
+
+    fx = f(x / WHITE_X)
+    fy = f(y / WHITE_Y)
+    fz = f(z / WHITE_Z)
+
+    return 116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz)
 
 
 def scale_and_round(r, g, b):
@@ -96,19 +145,6 @@ def scale_and_round(r, g, b):
     return r, g, b
 
 
-def round_lab(l, a, b):
-    """
-    Rounds l/a/b values
-    """
-    def round_val(v):
-        """
-        Round a lab color component
-        """
-        return round(v * 10000) / 10000.0
-
-    return round_val(l), round_val(a), round_val(b)
-
-
 def lookup_lab(l, a, b):
     """
     Attempts to lookup an ESRI CIELAB in the manual lookup conversion table.
@@ -116,12 +152,26 @@ def lookup_lab(l, a, b):
     formula results in a color difference of more than 1 unit in the red, green
     or blue component when compared to ESRI's internal CIELAB -> RGB conversion.
     """
-    lut_l, lut_a, lut_b = round_lab(l, a, b)
-    if (lut_l, lut_a, lut_b) in COLOR_LUT:
-        (r, g, b) = COLOR_LUT[(lut_l, lut_a, lut_b)]
-        return r, g, b
+    global COLOR_LUT  # pylint: disable=global-statement
+    if COLOR_LUT is None:
+        from slyr.parser.color_lut import COLOR_LUT  # pylint: disable=redefined-outer-name,import-outside-toplevel
 
-    return None
+    return COLOR_LUT.lookup(l, a, b)
+
+
+def lookup_rgb(r, g, b):
+    """
+    Attempts to lookup the ESRI CIELAB value for a RGB value in the manual lookup
+    conversion table (see lookup_lab), using an inverted index of the table.
+    """
+    global COLOR_LUT  # pylint: disable=global-statement
+    if COLOR_LUT is None:
+        from slyr.parser.color_lut import COLOR_LUT  # pylint: disable=redefined-outer-name,import-outside-toplevel
+
+    index = COLOR_LUT.find_rgb(r, g, b)
+    if index is None:
+        return None
+    return COLOR_LUT.lab(index)
 
 
 def cielab_to_rgb(l, a, b):
@@ -134,3 +184,314 @@ def cielab_to_rgb(l, a, b):
 
     # lab value not present in lookup table, use standard conversion formula
     return scale_and_round(*apply_gamma(*xyz_to_rgb(*cielab_to_xyz(l, a, b))))
+
+
+@lru_cache(maxsize=LAB_CACHE_SIZE)
+def packed_cielab_to_rgb(lab: bytes):
+    """
+    Converts a packed ESRI CIELAB value (three little endian doubles) to a RGB value.
+    Style libraries repeat the same few colors many times, so results are cached
+    by the raw bytes of the value. See lab_cache_info() for the cache statistics.
+    """
+    return cielab_to_rgb(*LAB.unpack(lab))
+
+
+def lab_cache_info():
+    """
+    Returns the hits, misses, maxsize and currsize of the packed CIELAB conversion cache
+    """
+    return packed_cielab_to_rgb.cache_info()
+
+
+# tolerance for deciding whether a batch converted value may round differently to the scalar conversion
+BATCH_TOLERANCE = 1e-6
+
+
+def _cielab_to_xyz_batch(lab):
+    """
+    Translates an array of lab colors to x, y, z arrays, evaluated with the same operations
+    (and order of operations) as cielab_to_xyz(). Also returns a mask of the values which
+    lie too close to a branch of the formula for the batch result to be trusted (see
+    _formula_rgb_batch).
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    l, a, b = lab[:, 0], lab[:, 1], lab[:, 2]
+    fy = (l + 16) / 116.0
+    fz = fy - (b / 200.0)
+    fx = a / 500.0 + fy
+    fx3 = np.power(fx, 3)
+    fz3 = np.power(fz, 3)
+    xr = np.where(fx3 > E, fx3, (116 * fx - 16) / K)
+    yr = np.where(l > K * E, np.power((l + 16) / 116.0, 3), l / K)
+    zr = np.where(fz3 > E, fz3, (116 * fz - 16) / K)
+    recheck = (np.abs(fx3 - E) < BATCH_TOLERANCE * E) | (np.abs(fz3 - E) < BATCH_TOLERANCE * E)
+    return xr * WHITE_X, yr * WHITE_Y, zr * WHITE_Z, recheck
+
+
+def _formula_rgb_batch(lab):
+    """
+    Converts an array of CIELAB values to RGB values using the standard conversion formula,
+    evaluated with the same operations (and order of operations) as the scalar functions.
+    numpy's vectorised power() may differ from the C library pow() used by Python in the last
+    bit, so values which lie too close to a rounding boundary or branch for this difference to
+    be ignored are converted again using the scalar functions.
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    x, y, z, recheck = _cielab_to_xyz_batch(lab)
+    rgb = np.empty_like(lab)
+    rgb[:, 0] = 2.9515373 * x - 1.2894116 * y - 0.4738445 * z
+    rgb[:, 1] = -1.0851093 * x + 1.9908566 * y + 0.0372026 * z
+    rgb[:, 2] = 0.0854934 * x - 0.2694964 * y + 1.0912975 * z
+    rgb = np.power(np.maximum(rgb, 0), 1 / 1.8) * 255
+
+    recheck |= (np.abs(rgb - np.floor(rgb) - 0.5) < BATCH_TOLERANCE).any(axis=1)
+
+    # round half to even, matching round()
+    rgb = np.rint(rgb)
+    rgb[rgb < 5] = 0
+    res = np.clip(rgb, 0, 255).astype(np.uint8)
+    for row in np.flatnonzero(recheck):
+        res[row] = [min(c, 255) for c in scale_and_round(*apply_gamma(*xyz_to_rgb(*cielab_to_xyz(*lab[row]))))]
+    return res
+
+
+def _lut_rgb_batch(lab, res):
+    """
+    Replaces values in an array of converted RGB values with their lookup table overrides
+    (see lookup_lab), found by packing the quantised CIELAB values into table keys (see lab_key)
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+    from slyr.parser import color_lut  # pylint: disable=import-outside-toplevel
+    lut = color_lut.COLOR_LUT
+
+    quantised = np.rint(lab * color_lut.SCALE)
+    quantised[:, 1:] += color_lut.COMPONENT_OFFSET
+    valid = np.all((quantised >= 0) & (quantised <= color_lut.COMPONENT_MASK), axis=1)
+    quantised = quantised[valid].astype(np.int64)
+    keys = ((quantised[:, 0] << (2 * color_lut.COMPONENT_BITS)) | (quantised[:, 1] << color_lut.COMPONENT_BITS) |
+            quantised[:, 2])
+    table_keys = np.frombuffer(lut.keys, dtype=np.int64)
+    indices = np.minimum(np.searchsorted(table_keys, keys), len(table_keys) - 1)
+    found = table_keys[indices] == keys
+    res[np.flatnonzero(valid)[found]] = np.frombuffer(lut.values, dtype=np.uint8).reshape(-1, 3)[indices[found]]
+
+
+def cielab_to_rgb_batch(lab):
+    """
+    Converts an array of ESRI CIELAB values to RGB values, giving identical results to
+    cielab_to_rgb() for every value (except that out of gamut components are clipped to
+    0-255). Requires numpy.
+    :param lab: array-like of shape (N, 3) containing l, a, b values
+    :return: uint8 array of shape (N, 3) containing r, g, b values
+    """
+    # numpy is an optional dependency, only required for batch conversion
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    lab = np.asarray(lab, dtype=np.float64).reshape(-1, 3)
+    res = _formula_rgb_batch(lab)
+    _lut_rgb_batch(lab, res)
+    return res
+
+
+def rgb_to_cielab(r, g, b):
+    """
+    Converts a RGB value to an ESRI CIELAB value.
+
+    Values in the lookup conversion table give the (rounded) CIELAB value ESRI software
+    stores for the color. Other values are converted using the inverse of the standard
+    conversion formula, which is not necessarily identical to the value ESRI software
+    would store, but converts back to the same RGB value (except for very dark
+    components, which are read as 0 - see scale_and_round).
+    """
+    lut_result = lookup_rgb(r, g, b)
+    if lut_result is not None:
+        return lut_result
+
+    return xyz_to_cielab(*rgb_to_xyz(*remove_gamma(r / 255, g / 255, b / 255)))
+
+
+# inverted index of the lookup table for batch conversion, as sorted packed RGB
+# values and the matching CIELAB values
+_BATCH_RGB_INDEX = None
+
+
+def _remove_gamma_batch(rgb):
+    """
+    Linearizes an array of 0-255 RGB values, giving identical results to remove_gamma().
+    Components are linearized with the scalar pow(), as there are only a few distinct
+    component values (256 for integer values) to linearize.
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    # integer values are used as table indices, so must be checked before indexing
+    invalid = ~((rgb >= 0) & (rgb <= 255))
+    if invalid.any():
+        raise ValueError('RGB component {} is outside the range 0-255'.format(rgb[invalid][0]))
+
+    if np.issubdtype(rgb.dtype, np.integer):
+        components, inverse = np.arange(256) / 255, rgb
+    else:
+        components, inverse = np.unique(rgb / 255, return_inverse=True)
+    return np.array([c ** 1.8 for c in components.tolist()], dtype=np.float64)[inverse].reshape(rgb.shape)
+
+
+# 2 ** 27 + 1, for splitting a double into two halves whose products are exact
+SPLITTER = 134217729.0
+
+# number of values to take the cube root of at once, keeping the temporary arrays small
+CUBE_ROOT_BLOCK_SIZE = 16384
+
+# margin (in ulp) around a rounding boundary within which a vectorised cube root may not
+# match the C library pow(), which is assumed to be accurate to within 0.52 ulp
+CUBE_ROOT_MARGIN = 0.021
+
+
+def _split_batch(a):
+    """
+    Splits an array of doubles into high and low halves, each with at most 26 significant bits
+    (Veltkamp's algorithm)
+    """
+    c = SPLITTER * a
+    high = c - (c - a)
+    return high, a - high
+
+
+def _two_product_batch(a, b, a_split=None):
+    """
+    Returns the products of two arrays of doubles, and the exact rounding errors of these
+    products (Dekker's algorithm)
+    """
+    product = a * b
+    a_high, a_low = a_split if a_split is not None else _split_batch(a)
+    b_high, b_low = _split_batch(b)
+    error = ((a_high * b_high - product) + a_high * b_low + a_low * b_high) + a_low * b_low
+    return product, error
+
+
+def _cube_root_block(t):
+    """
+    Returns t ** (1 / 3) for an array of positive values, giving identical results to the
+    scalar power (see _cube_root_batch)
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    y = np.power(t, 1 / 3)
+
+    # the relative error u of y ** 3 against t, found using y ** 3 evaluated exactly
+    y_split = _split_batch(y)
+    square, square_error = _two_product_batch(y, y, y_split)
+    cube, cube_error = _two_product_batch(square, y, _split_batch(square))
+    cube_error += square_error * y
+    u = ((t - cube) - cube_error) / cube
+
+    # the difference (in ulp) between y and the exact value of t ** (1 / 3) as evaluated by
+    # pow(), remembering that 1 / 3 is rounded to 1 / 3 - 2 ** -54 / 3
+    d = y * (u * (1 / 3) - np.log(y) * 2.0 ** -54) / np.spacing(y)
+    res = np.where(d > 0.5, np.nextafter(y, np.inf), np.where(d < -0.5, np.nextafter(y, 0), y))
+
+    ambiguous = (np.abs(np.abs(d - np.rint(d)) - 0.5) < CUBE_ROOT_MARGIN) | (np.abs(d) > 1.5 - CUBE_ROOT_MARGIN)
+    # the ulp below a power of two is smaller than the ulp above it
+    ambiguous |= np.frexp(y)[0] == 0.5
+    for i in np.flatnonzero(ambiguous):
+        res[i] = float(t[i]) ** (1 / 3)
+    return res
+
+
+def _cube_root_batch(t):
+    """
+    Returns t ** (1 / 3) for an array of positive values, giving identical results to the
+    scalar power.
+
+    numpy's vectorised power() may differ from the C library pow() used by Python in the last
+    bit, so its results are corrected to the correctly rounded cube root (found by comparing
+    the cube of the result against t exactly). Values whose cube root lies too close to a
+    rounding boundary to know how pow() rounds them are evaluated with the scalar power.
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    res = np.empty_like(t)
+    for start in range(0, len(t), CUBE_ROOT_BLOCK_SIZE):
+        res[start:start + CUBE_ROOT_BLOCK_SIZE] = _cube_root_block(t[start:start + CUBE_ROOT_BLOCK_SIZE])
+    return res
+
+
+def _formula_lab_batch(rgb):
+    """
+    Converts an array of RGB values to CIELAB values using the inverse of the standard
+    conversion formula, evaluated with the same operations (and order of operations) as
+    the scalar functions
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    linear = _remove_gamma_batch(rgb)
+    r, g, b = linear[:, 0], linear[:, 1], linear[:, 2]
+    x = 0.4497288 * r + 0.3162486 * g + 0.1844926 * b
+    y = 0.2446525 * r + 0.6720283 * g + 0.0833192 * b
+    z = 0.0251848 * r + 0.1411824 * g + 0.9224628 * b
+
+    def f(t):
+        """
+        CIELAB companding function
+        """
+        res = (K * t + 16) / 116.0
+        above = t > E
+        res[above] = _cube_root_batch(t[above])
+        return res
+
+    fx = f(x / WHITE_X)
+    fy = f(y / WHITE_Y)
+    fz = f(z / WHITE_Z)
+
+    res = np.empty(rgb.shape, dtype=np.float64)
+    res[:, 0] = 116 * fy - 16
+    res[:, 1] = 500 * (fx - fy)
+    res[:, 2] = 200 * (fy - fz)
+    return res
+
+
+def _lut_lab_batch(rgb, res):
+    """
+    Replaces values in an array of converted CIELAB values with the values stored by ESRI
+    software from the lookup table (see lookup_rgb)
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+    from slyr.parser import color_lut  # pylint: disable=import-outside-toplevel
+    lut = color_lut.COLOR_LUT
+
+    global _BATCH_RGB_INDEX  # pylint: disable=global-statement
+    if _BATCH_RGB_INDEX is None:
+        values = np.frombuffer(lut.values, dtype=np.uint8).reshape(-1, 3).astype(np.int64)
+        packed = (values[:, 0] << 16) | (values[:, 1] << 8) | values[:, 2]
+        order = np.argsort(packed, kind='stable')
+        keys = np.frombuffer(lut.keys, dtype=np.int64)[order]
+        labs = np.stack([keys >> (2 * color_lut.COMPONENT_BITS),
+                         ((keys >> color_lut.COMPONENT_BITS) & color_lut.COMPONENT_MASK) - color_lut.COMPONENT_OFFSET,
+                         (keys & color_lut.COMPONENT_MASK) - color_lut.COMPONENT_OFFSET], axis=1) / color_lut.SCALE
+        _BATCH_RGB_INDEX = (packed[order], labs)
+    index_rgb, index_lab = _BATCH_RGB_INDEX
+
+    if len(index_rgb):
+        packed = rgb.astype(np.int64)
+        packed = (packed[:, 0] << 16) | (packed[:, 1] << 8) | packed[:, 2]
+        indices = np.minimum(np.searchsorted(index_rgb, packed), len(index_rgb) - 1)
+        found = index_rgb[indices] == packed
+        res[found] = index_lab[indices[found]]
+
+
+def rgb_to_cielab_batch(rgb):
+    """
+    Converts an array of RGB values to ESRI CIELAB values, giving identical results to
+    rgb_to_cielab() for every value. Components outside 0-255 raise a ValueError.
+    Requires numpy.
+    :param rgb: array-like of shape (N, 3) containing r, g, b values from 0-255
+    :return: float64 array of shape (N, 3) containing l, a, b values
+    """
+    # numpy is an optional dependency, only required for batch conversion
+    import numpy as np  # pylint: disable=import-outside-toplevel
+
+    rgb = np.asarray(rgb).reshape(-1, 3)
+    res = _formula_lab_batch(rgb)
+    _lut_lab_batch(rgb, res)
+    return res
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+"""
+Parser contexts, which own the registry, options and statistics used for parsing
+"""
+
+import threading
+import time
+from typing import Iterable, Iterator, Optional
+from slyr.parser.object import Object
+from slyr.parser.object_registry import ObjectRegistry, REGISTRY
+from slyr.parser.stream import Stream, BufferStream, ParseLimits, DEFAULT_LIMITS
+from slyr.parser.intern import InternTable
+from slyr.parser.symbol_parser import (read_symbol,
+                                       read_symbols,
+                                       sniff_symbol,
+                                       SymbolResult,
+                                       SymbolSummary,
+                                       PARSE_EXCEPTIONS)
+
+
+class ParseStatistics:
+    """
+    Thread-safe counters for the blobs parsed through a ParserContext
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.symbols = 0
+        self.errors = 0
+        self.bytes = 0
+        self.elapsed = 0.0
+
+    def record(self, size: int, elapsed: float, ok: bool = True):
+        """
+        Records the result of parsing a single blob
+        :param size: size of blob in bytes
+        :param elapsed: time in seconds spent parsing the blob
+        :param ok: False if the blob could not be parsed
+        """
+        with self._lock:
+            if ok:
+                self.symbols += 1
+            else:
+                self.errors += 1
+            self.bytes += size
+            self.elapsed += elapsed
+
+    def snapshot(self) -> dict:
+        """
+        Returns a consistent copy of the current counters as a dictionary
+        """
+        with self._lock:
+            return {'symbols': self.symbols,
+                    'errors': self.errors,
+                    'bytes': self.bytes,
+                    'elapsed': self.elapsed}
+
+    def reset(self):
+        """
+        Resets all counters to zero
+        """
+        with self._lock:
+            self.symbols = 0
+            self.errors = 0
+            self.bytes = 0
+            self.elapsed = 0.0
+
+
+class ParserContext:
+    """
+    An explicit context for parsing, owning the object registry, parse options and
+    statistics used.
+
+    A single context may be shared between threads (e.g. the workers of a
+    ThreadPoolExecutor). Every call creates its own stream, so no mutable parse
+    state is shared between calls, and lazily registered object classes are loaded
+    under a lock by the registry. Tracers are not synchronised, so a context
+    constructed with a tracer should only be used from a single thread.
+
+    E.g.
+
+        context = ParserContext()
+        with ThreadPoolExecutor() as executor:
+            symbols = list(executor.map(context.read_symbol, blobs))
+        print(context.stats.snapshot())
+    """
+
+    def __init__(self, registry: Optional[ObjectRegistry] = None, debug: bool = False, tracer=None,
+                 intern_table: Optional[InternTable] = None, limits: Optional[ParseLimits] = None,  # pylint: disable=too-many-arguments
+                 lazy: bool = False):
+        """
+        Constructor for ParserContext
+        :param registry: registry used to create objects. Defaults to the REGISTRY singleton.
+        :param debug: true if debugging output should be printed during object read
+        :param tracer: optional tracer to receive structured parse events
+        :param intern_table: optional table for sharing immutable instances of repeated
+        leaf objects, such as colors, between all symbols parsed with the context
+        :param limits: resource limits for parsing each blob. Defaults to DEFAULT_LIMITS.
+        :param lazy: if True, heavy child objects such as pictures are only decoded when
+        first accessed
+        """
+        self.registry = registry if registry is not None else REGISTRY
+        self.debug = debug
+        self.tracer = tracer
+        self.intern_table = intern_table
+        self.limits = limits if limits is not None else DEFAULT_LIMITS
+        self.lazy = lazy
+        self.stats = ParseStatistics()
+
+    def stream(self, blob) -> BufferStream:
+        """
+        Creates a new stream over a blob, using the options of this context
+        """
+        stream = BufferStream(blob, self.debug, self.tracer, self.registry)
+        stream.intern_table = self.intern_table
+        stream.limits = self.limits
+        stream.lazy = self.lazy
+        return stream
+
+    def stream_from_path(self, path: str) -> BufferStream:
+        """
+        Creates a new stream over a memory mapped file, using the options of this context
+        """
+        stream = Stream.from_path(path, self.debug, self.tracer, self.registry)
+        stream.intern_table = self.intern_table
+        stream.limits = self.limits
+        stream.lazy = self.lazy
+        return stream
+
+    def read_symbol(self, blob) -> Object:
+        """
+        Reads a symbol from a binary blob
+        """
+        start = time.perf_counter()
+        try:
+            symbol = read_symbol(self.stream(blob))
+        except PARSE_EXCEPTIONS:
+            self.stats.record(len(blob), time.perf_counter() - start, False)
+            raise
+        self.stats.record(len(blob), time.perf_counter() - start)
+        return symbol
+
+    def read_symbols(self, blobs: Iterable[bin], on_error: str = 'collect') -> Iterator[SymbolResult]:
+        """
+        Parses an iterable of binary blobs, reusing a single stream for all blobs.
+        See symbol_parser.read_symbols() for details.
+        """
+        if on_error not in ('collect', 'skip', 'raise'):
+            raise ValueError('Unknown on_error action {}'.format(on_error))
+
+        sizes = []
+
+        def measured():
+            """
+            Records the size of each blob as it is consumed
+            """
+            for blob in blobs:
+                sizes.append(len(blob))
+                yield blob
+
+        # errors are always collected, so that skipped and raised errors are also counted
+        for result in read_symbols(measured(), 'collect', self.debug, self.registry, self.intern_table,
+                                   self.limits, self.lazy):
+            self.stats.record(sizes[result.index], result.elapsed, result.ok)
+            if not result.ok:
+                if on_error == 'raise':
+                    raise result.error
+                if on_error == 'skip':
+                    continue
+            yield result
+
+    def sniff_symbol(self, blob) -> SymbolSummary:
+        """
+        Performs a shallow parse of a symbol blob. See symbol_parser.sniff_symbol() for details.
+        """
+        return sniff_symbol(self.stream(blob))
@@ -52,3 +52,37 @@ class UnreadablePictureException(Exception):
     Thrown on encountering an unreadable picture
     """
     pass
+
+
+class TruncatedStreamException(UnreadableSymbolException):
+    """
+    Thrown when reading past the end of an in-memory stream
+    """
+
+    def __init__(self, message: str = '', required: int = 0):
+        """
+        Constructor for TruncatedStreamException
+        :param message: exception message
+        :param required: total number of bytes which the stream must contain
+        for the read to succeed
+        """
+        super().__init__(message)
+        self.required = required
+
+
+class ParseLimitException(UnreadableSymbolException):
+    """
+    Thrown when a blob exceeds one of the resource limits set for parsing (see
+    ParseLimits), e.g. because it is corrupt or hostile
+    """
+
+    def __init__(self, message: str = '', limit: str = '', value: int = 0):
+        """
+        Constructor for ParseLimitException
+        :param message: exception message
+        :param limit: name of the exceeded limit, e.g. 'max_allocation'
+        :param value: value which exceeded the limit
+        """
+        super().__init__(message)
+        self.limit = limit
+        self.value = value
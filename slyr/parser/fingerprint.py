@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+"""
+Structural fingerprints of parsed objects, for detecting identical symbols
+"""
+
+import hashlib
+from array import array
+from struct import Struct
+from typing import Iterable, Optional
+from slyr.parser.object import Object, attribute_names
+
+# attributes which only name or label an object, and are skipped by name insensitive fingerprints
+NAME_ATTRIBUTES = ('tags', 'ramp_name_type')
+
+DIGEST_SIZE = 16
+
+_DOUBLE = Struct('<d')
+_INT = Struct('<q')
+_LENGTH = Struct('<I')
+
+# type tags for the canonical encoding
+_NONE = b'N'
+_TRUE = b'T'
+_FALSE = b'F'
+_INTEGER = b'i'
+_BIG_INTEGER = b'I'
+_FLOAT = b'd'
+_STRING = b's'
+_BYTES = b'b'
+_SEQUENCE = b'['
+_OBJECT = b'{'
+
+_ATTRIBUTE_NAMES = {}
+
+
+def _attribute_names(object_class) -> tuple:
+    """
+    Returns the sorted names of all slotted attributes for an object class
+    """
+    try:
+        return _ATTRIBUTE_NAMES[object_class]
+    except KeyError:
+        pass
+    res = tuple(sorted(attribute_names(object_class)))
+    _ATTRIBUTE_NAMES[object_class] = res
+    return res
+
+
+class _Encoder:
+    """
+    Builds the canonical encoding of an object tree
+    """
+
+    def __init__(self, float_digits: Optional[int], ignored: frozenset):
+        self.float_digits = float_digits
+        self.ignored = ignored
+        self.buffer = bytearray()
+
+    def add_string(self, value: str):
+        """
+        Encodes a string
+        """
+        encoded = value.encode('utf-8')
+        self.buffer += _STRING
+        self.buffer += _LENGTH.pack(len(encoded))
+        self.buffer += encoded
+
+    def add_float(self, value: float):
+        """
+        Encodes a float, rounded to the encoder's precision
+        """
+        if self.float_digits is not None:
+            value = round(value, self.float_digits)
+        if value == 0:
+            # -0.0 and 0.0 are equivalent
+            value = 0.0
+        elif value != value:  # pylint: disable=comparison-with-itself
+            # all NaNs are equivalent
+            value = float('nan')
+        self.buffer += _FLOAT
+        self.buffer += _DOUBLE.pack(value)
+
+    def add(self, value):  # pylint: disable=too-many-branches
+        """
+        Encodes a value of any supported type
+        """
+        buffer = self.buffer
+        if value is None:
+            buffer += _NONE
+        elif value is True:
+            buffer += _TRUE
+        elif value is False:
+            buffer += _FALSE
+        elif isinstance(value, int):
+            if -2 ** 63 <= value < 2 ** 63:
+                buffer += _INTEGER
+                buffer += _INT.pack(value)
+            else:
+                digits = str(value).encode('ascii')
+                buffer += _BIG_INTEGER
+                buffer += _LENGTH.pack(len(digits))
+                buffer += digits
+        elif isinstance(value, float):
+            self.add_float(value)
+        elif isinstance(value, str):
+            self.add_string(value)
+        elif isinstance(value, (bytes, bytearray, memoryview)):
+            buffer += _BYTES
+            buffer += _LENGTH.pack(len(value))
+            buffer += value
+        elif isinstance(value, (list, tuple, array)):
+            buffer += _SEQUENCE
+            buffer += _LENGTH.pack(len(value))
+            for item in value:
+                self.add(item)
+        elif isinstance(value, Object):
+            self.add_object(value)
+        else:
+            raise TypeError('Cannot fingerprint values of type {}'.format(value.__class__.__name__))
+
+    def add_object(self, obj: Object):
+        """
+        Encodes an object, as its class name followed by its attributes in name order
+        """
+        self.buffer += _OBJECT
+        self.add_string(obj.__class__.__name__)
+        for name in _attribute_names(obj.__class__):
+            if name in self.ignored or not hasattr(obj, name):
+                continue
+            self.add_string(name)
+            self.add(getattr(obj, name))
+
+
+def canonical_encoding(obj: Object, float_digits: Optional[int] = None, ignore_names: bool = False,
+                       ignore: Iterable[str] = ()) -> bin:
+    """
+    Returns the canonical binary encoding of an object tree, from which fingerprints
+    are calculated. See fingerprint() for a description of the parameters.
+    """
+    ignored = set(ignore)
+    if ignore_names:
+        ignored.update(NAME_ATTRIBUTES)
+    encoder = _Encoder(float_digits, frozenset(ignored))
+    encoder.add(obj)
+    return bytes(encoder.buffer)
+
+
+def fingerprint(obj: Object, float_digits: Optional[int] = None, ignore_names: bool = False,
+                ignore: Iterable[str] = ()) -> bin:
+    """
+    Returns a stable 128 bit structural fingerprint for a parsed object tree, such as
+    a symbol. Objects with identical classes and attribute values have identical
+    fingerprints, regardless of the blob or style file they were read from, so
+    fingerprints can be used as dictionary keys for detecting duplicate symbols.
+
+    Fingerprints are stable across processes and versions of Python.
+
+    :param obj: object to fingerprint
+    :param float_digits: if set, floating point values are rounded to this many
+    decimal places before hashing, so that values differing only by rounding noise
+    give the same fingerprint
+    :param ignore_names: if True, attributes which only name or label objects
+    (see NAME_ATTRIBUTES) are ignored
+    :param ignore: names of additional attributes to ignore
+    :return: 16 byte digest
+    """
+    return hashlib.blake2b(canonical_encoding(obj, float_digits, ignore_names, ignore),
+                           digest_size=DIGEST_SIZE).digest()
@@ -3,87 +3,48 @@
 Registers all known objects with the registry singleton
 """
 
-from slyr.parser.object_registry import REGISTRY
+from slyr.parser.object_registry import ObjectRegistry, REGISTRY
 
-from slyr.parser.objects.line_template import LineTemplate
-from slyr.parser.objects.colors import (
-    CMYKColor,
-    RgbColor,
-    HSVColor,
-    HSLColor,
-    GrayColor
-)
-from slyr.parser.objects.decoration import (
-    LineDecoration,
-    SimpleLineDecoration)
-from slyr.parser.objects.line_symbol_layer import (
-    SimpleLineSymbolLayer,
-    CartographicLineSymbolLayer,
-    MarkerLineSymbolLayer,
-    HashLineSymbolLayer
-)
-from slyr.parser.objects.fill_symbol_layer import (
-    SimpleFillSymbolLayer,
-    ColorSymbol,
-    GradientFillSymbolLayer,
-    LineFillSymbolLayer,
-    MarkerFillSymbolLayer,
-    PictureFillSymbolLayer
-)
-from slyr.parser.objects.marker_symbol_layer import (
-    ArrowMarkerSymbolLayer,
-    CharacterMarkerSymbolLayer,
-    SimpleMarkerSymbolLayer,
-    PictureMarkerSymbolLayer
-)
-from slyr.parser.objects.font import Font
-from slyr.parser.symbol_parser import (
-    FillSymbol,
-    LineSymbol,
-    MarkerSymbol
-)
-from slyr.parser.objects.ramps import (
-    RandomColorRamp,
-    PresetColorRamp,
-    MultiPartColorRamp,
-    AlgorithmicColorRamp
-)
-from slyr.parser.objects.picture import StdPicture
+# GUID, module and class name of all known objects. Modules are only imported
+# once an object of a matching class is first encountered in a stream.
+KNOWN_OBJECTS = [
+    ('41093a71-cce1-11d0-bfaa-0080c7e24280', 'slyr.parser.objects.line_template', 'LineTemplate'),
+    ('7ee9c497-d123-11d0-8383-080009b996cc', 'slyr.parser.objects.colors', 'CMYKColor'),
+    ('7ee9c496-d123-11d0-8383-080009b996cc', 'slyr.parser.objects.colors', 'RgbColor'),
+    ('7ee9c492-d123-11d0-8383-080009b996cc', 'slyr.parser.objects.colors', 'HSVColor'),
+    ('7ee9c493-d123-11d0-8383-080009b996cc', 'slyr.parser.objects.colors', 'HSLColor'),
+    ('7ee9c495-d123-11d0-8383-080009b996cc', 'slyr.parser.objects.colors', 'GrayColor'),
+    ('533d88f5-0a1a-11d2-b27f-0000f878229e', 'slyr.parser.objects.decoration', 'LineDecoration'),
+    ('533d88f3-0a1a-11d2-b27f-0000f878229e', 'slyr.parser.objects.decoration', 'SimpleLineDecoration'),
+    ('7914e5f9-c892-11d0-8bb6-080009ee4e41', 'slyr.parser.objects.line_symbol_layer', 'SimpleLineSymbolLayer'),
+    ('7914e5fb-c892-11d0-8bb6-080009ee4e41', 'slyr.parser.objects.line_symbol_layer', 'CartographicLineSymbolLayer'),
+    ('7914e5fd-c892-11d0-8bb6-080009ee4e41', 'slyr.parser.objects.line_symbol_layer', 'MarkerLineSymbolLayer'),
+    ('7914e603-c892-11d0-8bb6-080009ee4e41', 'slyr.parser.objects.fill_symbol_layer', 'SimpleFillSymbolLayer'),
+    ('b81f9ae0-026e-11d3-9c1f-00c04f5aa6ed', 'slyr.parser.objects.fill_symbol_layer', 'ColorSymbol'),
+    ('88539431-e06e-11d1-b277-0000f878229e', 'slyr.parser.objects.marker_symbol_layer', 'ArrowMarkerSymbolLayer'),
+    ('7914e600-c892-11d0-8bb6-080009ee4e41', 'slyr.parser.objects.marker_symbol_layer', 'CharacterMarkerSymbolLayer'),
+    ('7914e5fe-c892-11d0-8bb6-080009ee4e41', 'slyr.parser.objects.marker_symbol_layer', 'SimpleMarkerSymbolLayer'),
+    ('0be35203-8f91-11ce-9de3-00aa004bb851', 'slyr.parser.objects.font', 'Font'),
+    ('7914e604-c892-11d0-8bb6-080009ee4e41', 'slyr.parser.symbol_parser', 'FillSymbol'),
+    ('7914e5fa-c892-11d0-8bb6-080009ee4e41', 'slyr.parser.symbol_parser', 'LineSymbol'),
+    ('7914e5ff-c892-11d0-8bb6-080009ee4e41', 'slyr.parser.symbol_parser', 'MarkerSymbol'),
+    ('beb87094-c0b4-11d0-8379-080009b996cc', 'slyr.parser.objects.ramps', 'RandomColorRamp'),
+    ('beb8709a-c0b4-11d0-8379-080009b996cc', 'slyr.parser.objects.ramps', 'PresetColorRamp'),
+    ('beb87099-c0b4-11d0-8379-080009b996cc', 'slyr.parser.objects.ramps', 'MultiPartColorRamp'),
+    ('beb8709b-c0b4-11d0-8379-080009b996cc', 'slyr.parser.objects.ramps', 'AlgorithmicColorRamp'),
+    ('7914e609-c892-11d0-8bb6-080009ee4e41', 'slyr.parser.objects.fill_symbol_layer', 'GradientFillSymbolLayer'),
+    ('7914e606-c892-11d0-8bb6-080009ee4e41', 'slyr.parser.objects.fill_symbol_layer', 'LineFillSymbolLayer'),
+    ('7914e608-c892-11d0-8bb6-080009ee4e41', 'slyr.parser.objects.fill_symbol_layer', 'MarkerFillSymbolLayer'),
+    ('7914e5fc-c892-11d0-8bb6-080009ee4e41', 'slyr.parser.objects.line_symbol_layer', 'HashLineSymbolLayer'),
+    ('7914e602-c892-11d0-8bb6-080009ee4e41', 'slyr.parser.objects.marker_symbol_layer', 'PictureMarkerSymbolLayer'),
+    ('d842b082-330c-11d2-9168-0000f87808ee', 'slyr.parser.objects.fill_symbol_layer', 'PictureFillSymbolLayer'),
+    ('0be35204-8f91-11ce-9de3-00aa004bb851', 'slyr.parser.objects.picture', 'StdPicture'),
+]
 
 
-def initialize_registry():
+def initialize_registry(registry: ObjectRegistry = REGISTRY):
     """
-    Registers all known objects with the registry singleton
+    Registers all known objects with a registry, defaulting to the registry singleton
     """
-
-    REGISTRY.register(LineTemplate)
-    REGISTRY.register(CMYKColor)
-    REGISTRY.register(RgbColor)
-    REGISTRY.register(HSVColor)
-    REGISTRY.register(HSLColor)
-    REGISTRY.register(GrayColor)
-    REGISTRY.register(LineDecoration)
-    REGISTRY.register(SimpleLineDecoration)
-    REGISTRY.register(SimpleLineSymbolLayer)
-    REGISTRY.register(CartographicLineSymbolLayer)
-    REGISTRY.register(MarkerLineSymbolLayer)
-    REGISTRY.register(SimpleFillSymbolLayer)
-    REGISTRY.register(ColorSymbol)
-    REGISTRY.register(ArrowMarkerSymbolLayer)
-    REGISTRY.register(CharacterMarkerSymbolLayer)
-    REGISTRY.register(SimpleMarkerSymbolLayer)
-    REGISTRY.register(Font)
-    REGISTRY.register(FillSymbol)
-    REGISTRY.register(LineSymbol)
-    REGISTRY.register(MarkerSymbol)
-    REGISTRY.register(RandomColorRamp)
-    REGISTRY.register(PresetColorRamp)
-    REGISTRY.register(MultiPartColorRamp)
-    REGISTRY.register(AlgorithmicColorRamp)
-    REGISTRY.register(GradientFillSymbolLayer)
-    REGISTRY.register(LineFillSymbolLayer)
-    REGISTRY.register(MarkerFillSymbolLayer)
-    REGISTRY.register(HashLineSymbolLayer)
-    REGISTRY.register(PictureMarkerSymbolLayer)
-    REGISTRY.register(PictureFillSymbolLayer)
-    REGISTRY.register(StdPicture)
+    for guid, module, class_name in KNOWN_OBJECTS:
+        registry.register_lazy(guid, module, class_name)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""
+Interning of small, frequently repeated leaf objects (such as colors) while parsing
+"""
+
+from typing import Optional
+from slyr.parser.object import Object, freeze
+
+
+class InternTable:
+    """
+    A table of shared, immutable instances of small leaf objects, keyed on their
+    raw serialized bytes.
+
+    When a stream has an intern table, objects whose classes implement
+    Object.intern_size() are looked up by their CLSID and content before being
+    decoded. Hits skip decoding entirely and return the shared instance, so
+    repeated colors, fonts and line templates are only decoded and stored once.
+    Interned objects are immutable (see slyr.parser.object.thaw() to obtain a modifiable copy), and
+    identical objects are identical by identity.
+
+    E.g.
+
+        table = InternTable()
+        stream = BufferStream(blob)
+        stream.intern_table = table
+        symbol = stream.read_object()
+
+    Tables may be shared between streams and threads.
+    """
+
+    def __init__(self, max_size: int = 65536):
+        """
+        Constructor for InternTable
+        :param max_size: maximum number of objects to intern. Once full, objects which
+        are not already in the table are decoded as normal.
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._objects = {}
+
+    def __len__(self):
+        return len(self._objects)
+
+    def clear(self):
+        """
+        Removes all objects from the table
+        """
+        self._objects.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, stream, clsid: bin, object_class) -> Optional[bin]:
+        """
+        Returns the intern key for the object of object_class at the current stream
+        position (directly after its CLSID), or None if the object cannot be interned.
+        The stream position is left unchanged.
+        """
+        size = object_class.intern_size(stream)
+        if size is None:
+            return None
+        content = stream.peek(size)
+        if len(content) < size:
+            return None
+        return clsid + bytes(content)
+
+    def get(self, key: bin) -> Optional[Object]:
+        """
+        Returns the interned object for a key, if any
+        """
+        obj = self._objects.get(key)
+        if obj is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return obj
+
+    def add(self, key: bin, obj: Object) -> Object:
+        """
+        Interns an object, returning the shared instance for its key
+        """
+        if len(self._objects) >= self.max_size:
+            return obj
+        return self._objects.setdefault(key, freeze(obj))
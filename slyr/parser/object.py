@@ -3,7 +3,15 @@
 Base class for persistent objects
 """
 
-from typing import List
+import pickle
+import threading
+from collections import deque, namedtuple
+from typing import List, Iterator
+from slyr.parser.exceptions import NotImplementedException
+from slyr.parser.schema import compile_schema
+
+# out-of-band pickle buffers are only available from Python 3.8
+PickleBuffer = getattr(pickle, 'PickleBuffer', None)
 
 
 class Object:
@@ -11,6 +19,23 @@ class Object:
     Base class for objects which can be read from a stream
     """
 
+    __slots__ = ()
+
+    # optional declarative layout, compiled into read(), write() and skip() when the class
+    # is created. See slyr.parser.schema
+    SCHEMA = None
+
+    # names of attributes holding child objects (or lists of child objects), in addition
+    # to those declared by base classes. See walk()
+    CHILD_ATTRIBUTES = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # compiled here rather than on registration, so that classes read and write
+        # correctly whether or not they have been through a registry
+        if cls.__dict__.get('SCHEMA') is not None:
+            compile_schema(cls)
+
     @staticmethod
     def guid() -> str:
         """
@@ -26,14 +51,343 @@ class Object:
         """
         return [1]
 
+    @staticmethod
+    def intern_size(stream):  # pylint: disable=unused-argument
+        """
+        Returns the number of bytes following the CLSID which make up the serialized
+        form of the object at the current stream position, or None if objects of this
+        type should not be interned. Implementations may peek at the stream, but must
+        not advance it.
+        """
+        return None
+
     def read(self, stream, version):
         """
         Reads the object from the given stream
         """
         pass
 
+    @classmethod
+    def skip(cls, stream, version):
+        """
+        Advances the stream past an object of this class, without decoding it. Classes
+        should override this with a faster implementation, as the default reads
+        and discards a complete object.
+        """
+        cls().read(stream, version)
+
+    def write(self, stream, version):  # pylint: disable=unused-argument
+        """
+        Writes the object to the given WriterStream, at the given version. The object's
+        CLSID and version are written by the stream. Raises a NotImplementedException
+        for classes which hold attributes but do not implement writing, rather than
+        silently dropping their content.
+        """
+        if attribute_names(self.__class__):
+            raise NotImplementedException('Writing {} objects is not supported'.format(
+                self.__class__.__name__))
+
     def children(self) -> List['slyr.parser.Object']:
         """
         Returns a list of all child objects referenced by this object
         """
-        return []
+        return list(self.iter_children())
+
+    def iter_children(self) -> Iterator['slyr.parser.Object']:
+        """
+        Iterates over all child objects referenced by this object
+        """
+        for _, child in _child_items(self):
+            yield child
+
+    def __reduce_ex__(self, protocol):
+        """
+        Pickles the object as its class and attribute values. Under pickle protocol 5,
+        binary attributes (such as picture content) are passed as PickleBuffers, so
+        they can be transferred out-of-band without copying.
+        """
+        object_class = self.__class__
+        frozen = object_class.__dict__.get('FROZEN', False)
+        if frozen:
+            # interned objects are pickled as their mutable class, and refrozen on load
+            object_class = object_class.__bases__[0]
+
+        state = {}
+        for name in attribute_names(object_class):
+            if not hasattr(self, name):
+                continue
+            value = getattr(self, name)
+            if isinstance(value, (bytes, bytearray, memoryview)):
+                if protocol >= 5 and PickleBuffer is not None:
+                    value = PickleBuffer(value)
+                elif not isinstance(value, bytes):
+                    value = bytes(value)
+            state[name] = value
+        return restore_object, (object_class, state, frozen)
+
+
+def restore_object(object_class, state: dict, frozen: bool = False) -> Object:
+    """
+    Recreates an object from its class and attribute values, as pickled by
+    Object.__reduce_ex__
+    """
+    obj = object_class()
+    for name, value in state.items():
+        if PickleBuffer is not None and isinstance(value, PickleBuffer):
+            value = value.raw()
+        setattr(obj, name, value)
+    if frozen:
+        freeze(obj)
+    return obj
+
+
+_FROZEN_CLASSES = {}
+_FROZEN_CLASSES_LOCK = threading.Lock()
+
+
+def _frozen_setattr(self, name, value):
+    """
+    Blocks attribute assignment on interned objects
+    """
+    raise AttributeError('Interned {} objects are immutable'.format(self.__class__.__name__))
+
+
+def _frozen_delattr(self, name):
+    """
+    Blocks attribute deletion on interned objects
+    """
+    raise AttributeError('Interned {} objects are immutable'.format(self.__class__.__name__))
+
+
+def frozen_class(object_class):
+    """
+    Returns an immutable variant of an object class. The variant shares the name
+    and slot layout of object_class, so instances can be switched to it in place.
+    """
+    with _FROZEN_CLASSES_LOCK:
+        try:
+            return _FROZEN_CLASSES[object_class]
+        except KeyError:
+            pass
+        frozen = type(object_class.__name__, (object_class,), {
+            '__slots__': (),
+            '__module__': object_class.__module__,
+            '__qualname__': object_class.__qualname__,
+            '__setattr__': _frozen_setattr,
+            '__delattr__': _frozen_delattr,
+            'FROZEN': True
+        })
+        _FROZEN_CLASSES[object_class] = frozen
+        return frozen
+
+
+def is_frozen(obj: Object) -> bool:
+    """
+    Returns True if an object is an immutable, interned instance
+    """
+    return obj.__class__.__dict__.get('FROZEN', False)
+
+
+def freeze(obj: Object) -> Object:
+    """
+    Makes an object immutable, in place
+    """
+    if not is_frozen(obj):
+        obj.__class__ = frozen_class(obj.__class__)
+    return obj
+
+
+def thaw(obj: Object) -> Object:
+    """
+    Returns a mutable copy of an interned object. Mutable objects are returned unchanged.
+    """
+    if not is_frozen(obj):
+        return obj
+    object_class = obj.__class__.__bases__[0]
+    res = object_class.__new__(object_class)
+    for cls in object_class.__mro__:
+        for name in cls.__dict__.get('__slots__', ()):
+            if hasattr(obj, name):
+                object.__setattr__(res, name, getattr(obj, name))
+    return res
+
+
+class LazyAttribute:
+    """
+    An attribute which may hold a handle to a lazily decoded child object (see
+    BufferStream.lazy), stored in a slot. Handles are decoded and replaced by
+    the object on first access. E.g.
+
+        class PictureFillSymbolLayer(FillSymbolLayer):
+
+            __slots__ = ('_picture',)
+            picture = LazyAttribute('_picture')
+    """
+
+    def __init__(self, slot: str):
+        """
+        Constructor for LazyAttribute
+        :param slot: name of the slot holding the attribute's value
+        """
+        self.slot = slot
+        self.name = None
+        self._member = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self._member = owner.__dict__[self.slot]
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        value = getattr(obj, self.slot)
+        if getattr(value, 'LAZY', False):
+            value = value.load()
+            self._member.__set__(obj, value)
+        return value
+
+    def __set__(self, obj, value):
+        self._member.__set__(obj, value)
+
+    def handle(self, obj):
+        """
+        Returns the undecoded handle held by the attribute of obj, or None if the
+        attribute holds a decoded object
+        """
+        value = getattr(obj, self.slot)
+        return value if getattr(value, 'LAZY', False) else None
+
+
+def lazy_handle(obj: Object, name: str):
+    """
+    Returns the handle of a lazily decoded child object without decoding it, or None if
+    the attribute has already been decoded (or is not lazy). Handles give the GUID and
+    size of the child object, e.g. for listing the pictures in a library without
+    decoding them.
+    """
+    attribute = getattr(obj.__class__, name, None)
+    if not isinstance(attribute, LazyAttribute):
+        return None
+    return attribute.handle(obj)
+
+
+_ATTRIBUTE_NAMES = {}
+
+
+def attribute_names(object_class) -> tuple:
+    """
+    Returns the names of all slotted attributes for an object class, with those
+    declared by base classes first. Slots backing lazy attributes are given by the
+    attribute name.
+    """
+    try:
+        return _ATTRIBUTE_NAMES[object_class]
+    except KeyError:
+        pass
+    lazy = {}
+    for cls in object_class.__mro__:
+        for name, value in cls.__dict__.items():
+            if isinstance(value, LazyAttribute):
+                lazy.setdefault(value.slot, name)
+    res = []
+    for cls in reversed(object_class.__mro__):
+        slots = cls.__dict__.get('__slots__', ())
+        for name in [slots] if isinstance(slots, str) else slots:
+            name = lazy.get(name, name)
+            if name not in res and name not in ('__dict__', '__weakref__'):
+                res.append(name)
+    res = tuple(res)
+    _ATTRIBUTE_NAMES[object_class] = res
+    return res
+
+
+_CHILD_ATTRIBUTES = {}
+
+
+def child_attributes(object_class) -> tuple:
+    """
+    Returns the names of all attributes holding child objects for an object class,
+    including those declared by base classes
+    """
+    try:
+        return _CHILD_ATTRIBUTES[object_class]
+    except KeyError:
+        pass
+    res = []
+    for cls in reversed(object_class.__mro__):
+        for name in cls.__dict__.get('CHILD_ATTRIBUTES', ()):
+            if name not in res:
+                res.append(name)
+    res = tuple(res)
+    _CHILD_ATTRIBUTES[object_class] = res
+    return res
+
+
+def _child_items(obj: Object):
+    """
+    Iterates over (path element, child) pairs for the children of an object. Path
+    elements are attribute names, or (attribute name, index) tuples for list items.
+    """
+    for name in child_attributes(obj.__class__):
+        value = getattr(obj, name, None)
+        if not value:
+            continue
+        if isinstance(value, (list, tuple)):
+            for i, item in enumerate(value):
+                if item:
+                    yield (name, i), item
+        else:
+            yield name, value
+
+
+WalkStep = namedtuple('WalkStep', ['obj', 'parent', 'path'])
+
+
+def walk(obj: Object, types=None, depth_first: bool = True,
+         include_root: bool = True) -> Iterator[WalkStep]:
+    """
+    Iterates over an object and all objects it references, without building
+    intermediate lists of children.
+
+    Each step yields the object, its parent (None for the root), and its path from the
+    root as a tuple of attribute names and (attribute name, index) pairs. E.g.
+
+        for child, parent, path in walk(symbol, types=Color):
+            ...
+
+    :param obj: root object
+    :param types: optional class or tuple of classes. If set, only objects of matching
+    types are yielded, but all objects are still traversed.
+    :param depth_first: if True, objects are visited depth first (pre-order), otherwise
+    breadth first
+    :param include_root: if False, the root object itself is not yielded
+    """
+    if obj is None:
+        return
+
+    if include_root and (types is None or isinstance(obj, types)):
+        yield WalkStep(obj, None, ())
+
+    if depth_first:
+        # stack of (parent, path, iterator over children of parent)
+        stack = [(obj, (), _child_items(obj))]
+        while stack:
+            parent, parent_path, children = stack[-1]
+            step = next(children, None)
+            if step is None:
+                stack.pop()
+                continue
+            element, child = step
+            path = parent_path + (element,)
+            if types is None or isinstance(child, types):
+                yield WalkStep(child, parent, path)
+            stack.append((child, path, _child_items(child)))
+    else:
+        queue = deque(((obj, ()),))
+        while queue:
+            parent, parent_path = queue.popleft()
+            for element, child in _child_items(parent):
+                path = parent_path + (element,)
+                if types is None or isinstance(child, types):
+                    yield WalkStep(child, parent, path)
+                queue.append((child, path))
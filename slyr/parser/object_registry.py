@@ -3,6 +3,9 @@
 A registry for all known objects which can be decoded from a Stream
 """
 
+import uuid
+import importlib
+import threading
 from slyr.parser.object import Object
 from slyr.parser.exceptions import (NotImplementedException,
                                     UnknownGuidException)
@@ -38,14 +41,59 @@ class ObjectRegistry:
         '50317369-bd70-11d3-9f79-00c04f6bc709': 'StackedChartSymbol',
     }
 
+    NULL_CLSID = bytes(16)
+
     def __init__(self):
         self.objects = {}
+        # parallel index of object classes, keyed by the raw 16 byte CLSID as stored in blobs
+        self.clsids = {}
+        # GUIDs of classes which have been registered by module and name. Entries are kept
+        # after the class is loaded, so that concurrent lookups never miss a class.
+        self.lazy_objects = {}
+        self.lazy_clsids = {}
+        self._load_lock = threading.Lock()
+        self.not_implemented_clsids = {ObjectRegistry.guid_to_bytes(guid): name
+                                       for guid, name in self.NOT_IMPLEMENTED_GUIDS.items()}
 
     def register(self, object_class: Object):
         """
-        Registers a new object class to the registry.
+        Registers a new object class to the registry
+        """
+        guid = object_class.guid()
+        self.objects[guid] = object_class
+        self.clsids[ObjectRegistry.guid_to_bytes(guid)] = object_class
+
+    def register_lazy(self, guid: str, module: str, class_name: str):
+        """
+        Registers an object class by module and class name. The module is only
+        imported when an object with the matching guid is first created.
         """
-        self.objects[object_class.guid()] = object_class
+        if guid in self.objects:
+            return
+        self.lazy_objects[guid] = (module, class_name)
+        self.lazy_clsids[ObjectRegistry.guid_to_bytes(guid)] = guid
+
+    def load(self, guid: str):
+        """
+        Imports and registers the lazily registered class associated with guid,
+        and returns it
+        """
+        with self._load_lock:
+            if guid in self.objects:
+                # loaded by another thread in the meantime
+                return self.objects[guid]
+            module, class_name = self.lazy_objects[guid]
+            object_class = getattr(importlib.import_module(module), class_name)
+            self.register(object_class)
+        return object_class
+
+    def load_all(self):
+        """
+        Imports and registers all lazily registered classes
+        """
+        for guid in list(self.lazy_objects):
+            if guid not in self.objects:
+                self.load(guid)
 
     def create_object(self, guid: str):
         """
@@ -53,12 +101,56 @@ class ObjectRegistry:
         """
         if guid == '00000000-0000-0000-0000-000000000000':
             return None
+        if guid not in self.objects and guid in self.lazy_objects:
+            return self.load(guid)()
         if guid in self.NOT_IMPLEMENTED_GUIDS:
             raise NotImplementedException('{} objects are not yet supported'.format(self.NOT_IMPLEMENTED_GUIDS[guid]))
         elif guid not in self.objects:
             raise UnknownGuidException('Unknown GUID: {}'.format(guid))
         return self.objects[guid]()
 
+    def class_from_clsid(self, clsid: bin):
+        """
+        Returns the object class associated with a raw 16 byte CLSID, as stored
+        in a blob, or None for the null CLSID
+        """
+        object_class = self.clsids.get(clsid)
+        if object_class is not None:
+            return object_class
+        if clsid == self.NULL_CLSID:
+            return None
+        if clsid in self.lazy_clsids:
+            return self.load(self.lazy_clsids[clsid])
+        if clsid in self.not_implemented_clsids:
+            raise NotImplementedException(
+                '{} objects are not yet supported'.format(self.not_implemented_clsids[clsid]))
+        raise UnknownGuidException('Unknown GUID: {}'.format(ObjectRegistry.bytes_to_guid(clsid)))
+
+    def create_object_from_clsid(self, clsid: bin):
+        """
+        Creates a new object of the type associated with a raw 16 byte CLSID,
+        as stored in a blob
+        """
+        object_class = self.class_from_clsid(clsid)
+        return object_class() if object_class is not None else None
+
+    @staticmethod
+    def guid_to_bytes(guid: str) -> bin:
+        """
+        Converts a string GUID to the raw 16 byte CLSID stored in a block
+        E.g.
+        '7914e603-c892-11d0-8bb6-080009ee4e41' to
+        b'\\x03\\xe6\\x14\\x79\\x92\\xc8\\xd0\\x11\\x8b\\xb6\\x08\\x00\\x09\\xee\\x4e\\x41'
+        """
+        return uuid.UUID(guid).bytes_le
+
+    @staticmethod
+    def bytes_to_guid(clsid: bin) -> str:
+        """
+        Converts a raw 16 byte CLSID to a string GUID
+        """
+        return str(uuid.UUID(bytes_le=bytes(clsid)))
+
     @staticmethod
     def guid_to_hex(guid: str):
         """
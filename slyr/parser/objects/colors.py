@@ -3,10 +3,9 @@
 Color objects
 """
 
-import binascii
 from slyr.parser.object import Object
 from slyr.parser.exceptions import InvalidColorException
-from slyr.parser.color_parser import cielab_to_rgb
+from slyr.parser.color_parser import cielab_to_rgb, rgb_to_cielab, packed_cielab_to_rgb, LAB
 
 
 class Color(Object):
@@ -14,6 +13,8 @@ class Color(Object):
     Base class for color objects
     """
 
+    __slots__ = ('model', 'dither', 'is_null')
+
     def __init__(self):
         self.model = ''
         self.dither = False
@@ -25,6 +26,12 @@ class Color(Object):
         """
         assert False
 
+    def write_color(self, stream):  # pylint: disable=unused-argument
+        """
+        Writes the color to the stream. Subclasses must implement this
+        """
+        assert False
+
     def to_dict(self) -> dict:
         """
         Returns a dictionary representation of the color
@@ -35,10 +42,26 @@ class Color(Object):
     def read(self, stream, version):
         self.read_color(stream)
 
-        self.dither = binascii.hexlify(stream.read(1)) == b'01'
-        self.is_null = binascii.hexlify(stream.read(1)) == b'ff'
+        dither, is_null = stream.read_struct('BB')
+        self.dither = dither == 1
+        self.is_null = is_null == 0xff
+
+        if stream.retained is not None:
+            stream.retain(2)
 
-        stream.log('Read color ({}) of {}'.format(self.model, self.to_dict()))
+        if stream.tracer is not None:
+            stream.log('Read color ({}) of {}', self.model, self.to_dict())
+
+    def write(self, stream, version):
+        self.write_color(stream)
+
+        dither = 1 if self.dither else 0
+        is_null = 0xff if self.is_null else 0
+        flags = stream.retained_value()
+        # other non-zero values are read as not dithered/not null
+        if flags is None or (flags[0] == 1) != self.dither or (flags[1] == 0xff) != self.is_null:
+            flags = bytes((dither, is_null))
+        stream.write(flags)
 
 
 class RgbColor(Color):
@@ -46,6 +69,8 @@ class RgbColor(Color):
     RGB Color
     """
 
+    __slots__ = ('red', 'green', 'blue')
+
     def __init__(self):
         super().__init__()
         self.model = 'rgb'
@@ -57,18 +82,27 @@ class RgbColor(Color):
     def guid():
         return '7ee9c496-d123-11d0-8383-080009b996cc'
 
-    def read_color(self, stream):
-        stream.log('Skipping 3 bytes')  # looks like 01 00 00 ?
-        stream.read(3)
+    @staticmethod
+    def intern_size(stream):
+        # version, lab and dither/null flags
+        return 2 + 27 + 2
 
-        lab_l = stream.read_double()
-        lab_a = stream.read_double()
-        lab_b = stream.read_double()
+    def read_color(self, stream):
+        # first 3 bytes skipped, looks like 01 00 00 ?
+        if stream.tracer is None:
+            lab, = stream.read_struct('3x24s')
+        else:
+            # unpack the values, so that they are included in trace events
+            lab = LAB.pack(*stream.read_struct('3x3d', 'lab'))
+        if stream.retained is not None:
+            stream.retain(27, 3)
+            stream.retain(24)
 
         try:
-            self.red, self.green, self.blue = cielab_to_rgb(lab_l, lab_a, lab_b)
-        except OverflowError:
-            raise InvalidColorException()
+            self.red, self.green, self.blue = packed_cielab_to_rgb(lab)
+        except (OverflowError, ValueError) as e:
+            # infinite or NaN components
+            raise InvalidColorException() from e
 
         if self.red > 255 or self.red < 0:
             raise InvalidColorException()
@@ -77,6 +111,15 @@ class RgbColor(Color):
         if self.green > 255 or self.green < 0:
             raise InvalidColorException()
 
+    def write_color(self, stream):
+        stream.write_retained(b'\x01\x00\x00')
+        rgb = (self.red, self.green, self.blue)
+        lab = stream.retained_value()
+        # the retained CIELAB value is only reused if the color is unchanged
+        if lab is None or tuple(cielab_to_rgb(*LAB.unpack(lab))) != rgb:
+            lab = LAB.pack(*rgb_to_cielab(*rgb))
+        stream.write(lab)
+
     def to_dict(self):
         return {'R': self.red, 'G': self.green, 'B': self.blue, 'dither': self.dither, 'is_null': self.is_null}
 
@@ -86,6 +129,8 @@ class CMYKColor(Color):
     CYMK Color
     """
 
+    __slots__ = ('cyan', 'magenta', 'yellow', 'black')
+
     def __init__(self):
         super().__init__()
         self.model = 'cmyk'
@@ -103,15 +148,21 @@ class CMYKColor(Color):
     def compatible_versions():
         return [4]
 
-    def read_color(self, stream):
-        stream.log('Skipping 2 bytes')
-        stream.read(2)
+    @staticmethod
+    def intern_size(stream):
+        # version, cmyk and dither/null flags
+        return 2 + 6 + 2
 
+    def read_color(self, stream):
+        # first 2 bytes skipped
         # CMYK is nice and easy - it's just direct char representations of the C/M/Y/K integer components!
-        self.cyan = stream.read_uchar()
-        self.magenta = stream.read_uchar()
-        self.yellow = stream.read_uchar()
-        self.black = stream.read_uchar()
+        self.cyan, self.magenta, self.yellow, self.black = stream.read_struct('2x4B', 'cmyk')
+        if stream.retained is not None:
+            stream.retain(6, 2)
+
+    def write_color(self, stream):
+        stream.write_retained(bytes(2))
+        stream.write_struct('4B', self.cyan, self.magenta, self.yellow, self.black)
 
     def to_dict(self):
         return {'C': self.cyan, 'M': self.magenta, 'Y': self.yellow, 'K': self.black, 'dither': self.dither,
@@ -123,6 +174,8 @@ class HSVColor(RgbColor):
     HSV Color
     """
 
+    __slots__ = ()
+
     def __init__(self):
         super().__init__()
         self.model = 'hsv'
@@ -137,6 +190,8 @@ class HSLColor(RgbColor):
     HSL Color, actually exposed in ArcGIS as a "named color" (I think)
     """
 
+    __slots__ = ()
+
     @staticmethod
     def guid():
         return '7ee9c493-d123-11d0-8383-080009b996cc'
@@ -147,6 +202,8 @@ class GrayColor(RgbColor):
     Grayscale Color
     """
 
+    __slots__ = ()
+
     @staticmethod
     def guid():
         return '7ee9c495-d123-11d0-8383-080009b996cc'
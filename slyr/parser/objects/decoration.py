@@ -4,7 +4,7 @@ Line decorations
 """
 
 from slyr.parser.object import Object
-from slyr.parser.stream import Stream
+from slyr.parser.schema import Field, Padding, ObjectField, Array, ObjectArray
 
 
 class LineDecoration(Object):
@@ -12,6 +12,13 @@ class LineDecoration(Object):
     Line decoration, consisting of a number of decoration elements
     """
 
+    __slots__ = ('decorations',)
+    CHILD_ATTRIBUTES = ('decorations',)
+
+    SCHEMA = [
+        ObjectArray('decorations', 'decoration element')
+    ]
+
     def __init__(self):
         super().__init__()
         self.decorations = []
@@ -20,27 +27,26 @@ class LineDecoration(Object):
     def guid():
         return '533d88f5-0a1a-11d2-b27f-0000f878229e'
 
-    def children(self):
-        res = super().children()
-        res.extend(self.decorations)
-        return res
-
-    def read(self, stream: Stream, version):
-        """
-        Reads the decoration information
-        """
-        # next bit is probably number of decorations?
-        count = stream.read_uint('count of decorations')
-        for i in range(count):
-            decoration = stream.read_object('decoration element {}/{}'.format(i, count))
-            self.decorations.append(decoration)
-
 
 class SimpleLineDecoration(Object):
     """
     ISimpleLineDecorationElement
     """
 
+    __slots__ = ('fixed_angle', 'flip_first', 'flip_all', 'marker', 'marker_positions')
+    CHILD_ATTRIBUTES = ('marker',)
+
+    SCHEMA = [
+        Field('fixed_angle', 'B', convert=lambda v: not v, notes='0 if fixed angle', revert=lambda v: int(not v)),
+        Field('flip_first', 'B', convert=bool),
+        Field('flip_all', 'B', convert=bool),
+        Padding(2, 'unknown -- maybe includes position as ratio?'),
+        ObjectField('marker'),
+        # maybe we can infer the positions from the number of positions alone.
+        # E.g. 2 positions = 0, 1. 3 positions = 0, 0.5, 1
+        Array('marker_positions', 'd')
+    ]
+
     def __init__(self):
         super().__init__()
         self.fixed_angle = False
@@ -52,33 +58,3 @@ class SimpleLineDecoration(Object):
     @staticmethod
     def guid():
         return '533d88f3-0a1a-11d2-b27f-0000f878229e'
-
-    def children(self):
-        res = super().children()
-        if self.marker:
-            res.append(self.marker)
-        return res
-
-    def read(self, stream: Stream, version):
-        """
-        Reads the decoration information
-        """
-        self.fixed_angle = not bool(stream.read_uchar())
-        stream.log('detected {}'.format('fixed angle' if self.fixed_angle else 'not fixed angle'))
-        self.flip_first = bool(stream.read_uchar())
-        stream.log('detected {}'.format('flip first' if self.flip_first else 'no flip first'))
-        self.flip_all = bool(stream.read_uchar())
-        stream.log('detected {}'.format('flip all' if self.flip_all else 'no flip all'))
-
-        stream.read(2)  # unknown -- maybe includes position as ratio?
-
-        self.marker = stream.read_object('marker')
-
-        # next bit is the number of doubles coming next
-        marker_number_positions = stream.read_uint('marker positions')
-
-        # next bit is the positions themselves -- maybe we can infer this from the number of positions
-        # alone. E.g. 2 positions = 0, 1. 3 positions = 0, 0.5, 1
-        for _ in range(marker_number_positions):
-            self.marker_positions.append(stream.read_double())
-        stream.log('marker positions are {}'.format(self.marker_positions))
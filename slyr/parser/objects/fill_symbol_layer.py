@@ -3,8 +3,10 @@
 Fill symbol layers
 """
 
+from slyr.parser.object import LazyAttribute
 from slyr.parser.objects.symbol_layer import SymbolLayer
 from slyr.parser.stream import Stream
+from slyr.parser.schema import Field, Padding, Terminator, ObjectField, PictureField, Method, When
 
 
 class FillSymbolLayer(SymbolLayer):
@@ -12,21 +14,42 @@ class FillSymbolLayer(SymbolLayer):
     Base class for fill symbol layers
     """
 
+    __slots__ = ('color', '_outline_layer', '_outline_symbol')
+    CHILD_ATTRIBUTES = ('color', 'outline_layer', 'outline_symbol')
+
+    outline_layer = LazyAttribute('_outline_layer')
+    outline_symbol = LazyAttribute('_outline_symbol')
+
     def __init__(self):
         super().__init__()
         self.color = None
         self.outline_layer = None
         self.outline_symbol = None
 
-    def children(self):
-        res = super().children()
-        if self.color:
-            res.append(self.color)
-        if self.outline_layer:
-            res.append(self.outline_layer)
-        if self.outline_symbol:
-            res.append(self.outline_symbol)
-        return res
+    def read_outline(self, stream: Stream):
+        """
+        Reads the layer outline, which is either an entire LineSymbol or just a LineSymbolLayer
+        """
+        outline = stream.read_lazy_object('outline')
+        if outline is not None:
+            outline_class = outline.object_class if getattr(outline, 'LAZY', False) else outline.__class__
+            if issubclass(outline_class, SymbolLayer):
+                self.outline_layer = outline
+            else:
+                self.outline_symbol = outline
+
+    @staticmethod
+    def skip_outline(stream: Stream):
+        """
+        Skips the layer outline
+        """
+        stream.skip_object()
+
+    def write_outline(self, stream):
+        """
+        Writes the layer outline
+        """
+        stream.write_object(self.outline_layer if self.outline_layer is not None else self.outline_symbol)
 
 
 class SimpleFillSymbolLayer(FillSymbolLayer):
@@ -34,43 +57,56 @@ class SimpleFillSymbolLayer(FillSymbolLayer):
     Simple fill symbol layer
     """
 
+    __slots__ = ()
+
+    SCHEMA = [
+        Method('read_outline', 'outline'),
+        ObjectField('color'),
+        Terminator(),
+        Field(None, 'L', 'unknown int')
+    ]
+
     @staticmethod
     def guid():
         return '7914e603-c892-11d0-8bb6-080009ee4e41'
 
-    def read(self, stream: Stream, version):
-        # first bit is either an entire LineSymbol or just a LineSymbolLayer
-        outline = stream.read_object('outline')
-        if outline is not None:
-            if issubclass(outline.__class__, SymbolLayer):
-                self.outline_layer = outline
-            else:
-                self.outline_symbol = outline
-
-        self.color = stream.read_object('color')
-        stream.read_0d_terminator()
-        _ = stream.read_int('unknown int')
-
 
 class ColorSymbol(FillSymbolLayer):
     """
     Officially 'ColorSymbol for raster rendering' -- but sometimes found in fill symbols!
     """
 
+    __slots__ = ()
+
+    SCHEMA = [
+        ObjectField('color'),
+        Terminator()
+    ]
+
     @staticmethod
     def guid():
         return 'b81f9ae0-026e-11d3-9c1f-00c04f5aa6ed'
 
-    def read(self, stream: Stream, version):
-        self.color = stream.read_object('color')
-        stream.read_0d_terminator()
-
 
 class GradientFillSymbolLayer(FillSymbolLayer):
     """
     Gradient fill symbol layer
     """
 
+    __slots__ = ('ramp', 'type', 'percent', 'intervals', 'angle')
+    CHILD_ATTRIBUTES = ('ramp',)
+
+    SCHEMA = [
+        ObjectField('ramp', 'color ramp'),
+        ObjectField(None, 'unused color'),
+        Method('read_outline', 'outline'),
+        Field('percent', 'd'),
+        Field('intervals', 'I'),
+        Field('angle', 'd'),
+        Field('type', 'I', 'gradient type', notes='0: linear, 1: rectangular, 2: circular, 3: buffered'),
+        Terminator()
+    ]
+
     LINEAR = 0
     RECTANGULAR = 1
     CIRCULAR = 2
@@ -88,37 +124,26 @@ class GradientFillSymbolLayer(FillSymbolLayer):
     def guid():
         return '7914e609-c892-11d0-8bb6-080009ee4e41'
 
-    def children(self):
-        res = super().children()
-        if self.ramp:
-            res.append(self.ramp)
-        return res
-
-    def read(self, stream: Stream, version):
-        self.ramp = stream.read_object('Color ramp')
-        _ = stream.read_object('unused color')
-
-        # either an entire LineSymbol or just a LineSymbolLayer
-        outline = stream.read_object('outline')
-        if outline is not None:
-            if issubclass(outline.__class__, SymbolLayer):
-                self.outline_layer = outline
-            else:
-                self.outline_symbol = outline
-
-        self.percent = stream.read_double('percent')
-        self.intervals = stream.read_uint('intervals')
-        self.angle = stream.read_double('angle')
-
-        self.type = stream.read_uint('Gradient type')
-        stream.read_0d_terminator()
-
 
 class LineFillSymbolLayer(FillSymbolLayer):
     """
     Line fill symbol layer
     """
 
+    __slots__ = ('angle', 'offset', 'line', 'separation')
+    CHILD_ATTRIBUTES = ('line',)
+
+    SCHEMA = [
+        Field(None, 'd', 'unused double'),
+        Field(None, 'd', 'unused double'),
+        ObjectField('line', 'pattern line'),
+        Method('read_outline', 'outline'),
+        Field('angle', 'd'),
+        Field('offset', 'd'),
+        Field('separation', 'd'),
+        Terminator()
+    ]
+
     def __init__(self):
         super().__init__()
         self.angle = 0
@@ -130,38 +155,31 @@ class LineFillSymbolLayer(FillSymbolLayer):
     def guid():
         return '7914e606-c892-11d0-8bb6-080009ee4e41'
 
-    def children(self):
-        res = super().children()
-        if self.line:
-            res.append(self.line)
-        return res
-
-    def read(self, stream: Stream, version):
-        _ = stream.read_double('unused double')
-        _ = stream.read_double('unused double')
-
-        self.line = stream.read_object('pattern line')
-
-        # either an entire LineSymbol or just a LineSymbolLayer
-        outline = stream.read_object('outline')
-        if outline is not None:
-            if issubclass(outline.__class__, SymbolLayer):
-                self.outline_layer = outline
-            else:
-                self.outline_symbol = outline
-
-        self.angle = stream.read_double('angle')
-        self.offset = stream.read_double('offset')
-        self.separation = stream.read_double('separation')
-
-        stream.read_0d_terminator()
-
 
 class MarkerFillSymbolLayer(FillSymbolLayer):
     """
     Marker fill symbol layer
     """
 
+    __slots__ = ('random', 'offset_x', 'offset_y', 'separation_x', 'separation_y', '_marker')
+    CHILD_ATTRIBUTES = ('marker',)
+
+    marker = LazyAttribute('_marker')
+
+    SCHEMA = [
+        Field('random', 'L', convert=bool),
+        Field('offset_x', 'd', 'offset x'),
+        Field('offset_y', 'd', 'offset y'),
+        Field('separation_x', 'd', 'separation x'),
+        Field('separation_y', 'd', 'separation y'),
+        Field(None, 'd', 'unused double'),
+        Field(None, 'd', 'unused double'),
+        ObjectField('marker', 'fill marker', lazy=True),
+        Method('read_outline', 'outline'),
+        Terminator(),
+        Field(None, 'd', 'unused double')
+    ]
+
     def __init__(self):
         super().__init__()
         self.random = False
@@ -175,41 +193,52 @@ class MarkerFillSymbolLayer(FillSymbolLayer):
     def guid():
         return '7914e608-c892-11d0-8bb6-080009ee4e41'
 
-    def children(self):
-        res = super().children()
-        if self.marker:
-            res.append(self.marker)
-        return res
-
-    def read(self, stream: Stream, version):
-        self.random = bool(stream.read_int('random'))
-        self.offset_x = stream.read_double('offset x')
-        self.offset_y = stream.read_double('offset y')
-        self.separation_x = stream.read_double('separation x')
-        self.separation_y = stream.read_double('separation y')
-        _ = stream.read_double('unused double')
-        _ = stream.read_double('unused double')
-
-        self.marker = stream.read_object('fill marker')
-
-        # either an entire LineSymbol or just a LineSymbolLayer
-        outline = stream.read_object('outline')
-        if outline is not None:
-            if issubclass(outline.__class__, SymbolLayer):
-                self.outline_layer = outline
-            else:
-                self.outline_symbol = outline
-
-        stream.read_0d_terminator()
-
-        _ = stream.read_double('unused double')
-
 
 class PictureFillSymbolLayer(FillSymbolLayer):
     """
     Picture fill symbol layer
     """
 
+    __slots__ = ('_picture', 'color_foreground', 'color_background', 'color_transparent', 'swap_fb_gb', 'angle',
+                 'scale_x', 'scale_y', 'offset_x', 'offset_y', 'separation_x', 'separation_y')
+    CHILD_ATTRIBUTES = ('picture', 'color_foreground', 'color_background', 'color_transparent')
+
+    picture = LazyAttribute('_picture')
+
+    SCHEMA = [
+        When('version == 4', [
+            ObjectField('picture', lazy=True)
+        ]),
+        When('version == 7', [
+            Field(None, 'H', 'pic version?'),
+            Field(None, 'I', 'picture type?'),
+            ObjectField('picture', lazy=True)
+        ]),
+        When('version == 8', [
+            PictureField('picture', lazy=True)
+        ]),
+        ObjectField('color_background', 'color bg'),
+        ObjectField('color_foreground', 'color fg'),
+        ObjectField('color_transparent', 'color trans'),
+        Method('read_outline', 'outline'),
+        Field('angle', 'd'),
+        Field('scale_x', 'd', 'scale x'),
+        Field('scale_y', 'd', 'scale y'),
+        Field('offset_x', 'd', 'offset x'),
+        Field('offset_y', 'd', 'offset y'),
+        Field('separation_x', 'd', 'separation x'),
+        Field('separation_y', 'd', 'separation y'),
+        Padding(16),
+        Terminator(),
+        Field('swap_fb_gb', 'B', 'swap fgbg', convert=bool),
+        When('version > 4', [
+            Padding(6),
+            When('version < 8', [
+                Padding(4)
+            ])
+        ])
+    ]
+
     def __init__(self):
         super().__init__()
         self.angle = 0
@@ -231,62 +260,6 @@ class PictureFillSymbolLayer(FillSymbolLayer):
     def guid():
         return 'd842b082-330c-11d2-9168-0000f87808ee'
 
-    def children(self):
-        res = super().children()
-        if self.picture:
-            res.append(self.picture)
-        if self.color_foreground:
-            res.append(self.color_foreground)
-        if self.color_background:
-            res.append(self.color_background)
-        if self.color_transparent:
-            res.append(self.color_transparent)
-        return res
-
     @staticmethod
     def compatible_versions():
         return [4, 7, 8]
-
-    def read(self, stream: Stream, version):
-        if version == 4:
-            self.picture = stream.read_object('picture')
-        elif version == 7:
-            _ = stream.read_ushort('pic version?')
-            _ = stream.read_uint('picture type?')
-            self.picture = stream.read_object('picture')
-        elif version == 8:
-            self.picture = stream.read_picture('picture')
-
-        self.color_background = stream.read_object('color bg')
-        self.color_foreground = stream.read_object('color fg')
-        self.color_transparent = stream.read_object('color trans')
-
-        # either an entire LineSymbol or just a LineSymbolLayer
-        outline = stream.read_object('outline')
-        if outline is not None:
-            if issubclass(outline.__class__, SymbolLayer):
-                self.outline_layer = outline
-            else:
-                self.outline_symbol = outline
-
-        self.angle = stream.read_double('angle')
-        self.scale_x = stream.read_double('scale_x')
-        self.scale_y = stream.read_double('scale_y')
-
-        self.offset_x = stream.read_double('offset x')
-        self.offset_y = stream.read_double('offset y')
-        self.separation_x = stream.read_double('separation x')
-        self.separation_y = stream.read_double('separation y')
-
-        stream.read(16)
-
-        stream.read_0d_terminator()
-
-        self.swap_fb_gb = bool(stream.read_uchar('swap fgbg'))
-
-        if version <= 4:
-            return
-
-        stream.read(6)
-        if version < 8:
-            stream.read(4)
@@ -6,7 +6,7 @@ std OLE Font
 import binascii
 from slyr.parser.object import Object
 from slyr.parser.stream import Stream
-from slyr.parser.exceptions import UnsupportedVersionException
+from slyr.parser.exceptions import UnsupportedVersionException, UnreadableSymbolException
 
 
 class Font(Object):
@@ -14,6 +14,8 @@ class Font(Object):
     A standard OLE font object
     """
 
+    __slots__ = ('charset', 'weight', 'size', 'font_name', 'italic', 'underline', 'strikethrough')
+
     NoAttributes = 0
     Italic = 2
     Underline = 4
@@ -37,24 +39,52 @@ class Font(Object):
     def compatible_versions():
         return None
 
+    @staticmethod
+    def intern_size(stream):
+        # version, fixed fields and the font name, whose length is the last fixed field
+        header = stream.peek(11)
+        if len(header) < 11:
+            return None
+        return 11 + header[10]
+
     def read(self, stream: Stream, version):
         version = binascii.hexlify(stream.read(1))
         if version != b'01':
             raise UnsupportedVersionException('Unsupported Font version {}'.format(version))
 
-        self.charset = stream.read_ushort('charset')
+        self.charset, attributes, self.weight, size, name_length = stream.read_struct(
+            'HBHLB', 'charset, attributes, weight, font size, font name size')
+        if stream.retained is not None:
+            # retain the raw attributes, which include flags that aren't read
+            stream.retain(8, 1)
 
         # Not exposed in ArcMap front end:
-        attributes = stream.read_uchar('attributes')
         self.italic = attributes & self.Italic
         self.underline = attributes & self.Underline
         self.strikethrough = attributes & self.Strikethrough
 
-        self.weight = stream.read_ushort('weight')
-
         # From https://docs.microsoft.com/en-us/windows/desktop/api/olectl/ns-olectl-tagfontdesc
         # Use the int64 member of the CY structure and scale your font size (in points) by 10000.
-        self.size = stream.read_int('font size') / 10000
+        self.size = size / 10000
+
+        try:
+            self.font_name = stream.read(name_length).decode()
+        except UnicodeDecodeError as e:
+            raise UnreadableSymbolException('Invalid font name at {}'.format(hex(stream.tell()))) from e
+
+    def write(self, stream, version):
+        stream.write(b'\x01')
+
+        flags = self.Italic | self.Underline | self.Strikethrough
+        attributes = stream.retained_value(b'\x00')[0] & ~flags
+        if self.italic:
+            attributes |= self.Italic
+        if self.underline:
+            attributes |= self.Underline
+        if self.strikethrough:
+            attributes |= self.Strikethrough
 
-        name_length = stream.read_uchar('font name size')
-        self.font_name = stream.read(name_length).decode()
+        name = self.font_name.encode()
+        stream.write_struct('HBHLB', self.charset or 0, attributes, self.weight or 0, round((self.size or 0) * 10000),
+                            len(name))
+        stream.write(name)
@@ -2,8 +2,9 @@
 """
 Line template
 """
+from array import array
 from slyr.parser.object import Object
-from slyr.parser.stream import Stream
+from slyr.parser.stream import Stream, UINT
 
 
 class LineTemplate(Object):
@@ -11,26 +12,56 @@ class LineTemplate(Object):
     Line pattern template
     """
 
+    __slots__ = ('pattern_interval', '_pattern')
+
     def __init__(self):
         super().__init__()
         self.pattern_interval = 0
-        self.pattern_parts = []
+        # flattened run of filled, empty, filled, empty... lengths
+        self._pattern = array('d')
+
+    @property
+    def pattern_parts(self) -> list:
+        """
+        Returns the pattern as a list of (filled squares, empty squares) tuples
+        """
+        pattern = self._pattern
+        return list(zip(pattern[0::2], pattern[1::2]))
+
+    @pattern_parts.setter
+    def pattern_parts(self, parts: list):
+        """
+        Sets the pattern from a list of (filled squares, empty squares) pairs
+        """
+        self._pattern = array('d', [length for part in parts for length in part])
 
     @staticmethod
     def guid():
         return '41093a71-cce1-11d0-bfaa-0080c7e24280'
 
+    @staticmethod
+    def intern_size(stream):
+        # version, interval and part count, followed by pairs of doubles
+        header = stream.peek(14)
+        if len(header) < 14:
+            return None
+        return 14 + 16 * UINT.unpack_from(header, 10)[0]
+
     def read(self, stream: Stream, version):
         self.pattern_interval = stream.read_double('pattern interval')
 
         pattern_part_count = stream.read_int('pattern parts')
-        self.pattern_parts = []
-        for p in range(pattern_part_count):
-            filled_squares = stream.read_double()
-            empty_squares = stream.read_double()
-            self.pattern_parts.append([filled_squares, empty_squares])
-
-        pattern = ''
-        for p in self.pattern_parts:
-            pattern += '-' * int(p[0]) + '.' * int(p[1])
-        stream.log('deciphered line pattern {} ending'.format(pattern))
+        stream.check_allocation(pattern_part_count * 16, 'pattern parts')
+        # pairs of filled squares, empty squares
+        self._pattern = array('d', stream.read_doubles(pattern_part_count * 2))
+
+        if stream.tracer is not None:
+            pattern = ''
+            for p in self.pattern_parts:
+                pattern += '-' * int(p[0]) + '.' * int(p[1])
+            stream.log('deciphered line pattern {} ending', pattern)
+
+    def write(self, stream, version):
+        stream.write_double(self.pattern_interval)
+        stream.write_int(len(self._pattern) // 2)
+        stream.write_doubles(self._pattern)
@@ -4,9 +4,17 @@ Marker symbol layers
 """
 
 import binascii
+from slyr.parser.object import LazyAttribute
 from slyr.parser.objects.symbol_layer import SymbolLayer
 from slyr.parser.stream import Stream
 from slyr.parser.exceptions import UnreadableSymbolException
+from slyr.parser.schema import Field, Enum, Constant, Padding, Terminator, ObjectField, PictureField, When
+
+MARKER_TYPES = {0: 'circle',
+                1: 'square',
+                2: 'cross',
+                3: 'x',
+                4: 'diamond'}
 
 
 class MarkerSymbolLayer(SymbolLayer):
@@ -14,6 +22,9 @@ class MarkerSymbolLayer(SymbolLayer):
     Base class for marker symbol layers
     """
 
+    __slots__ = ('color', 'outline_layer', 'outline_symbol')
+    CHILD_ATTRIBUTES = ('color', 'outline_layer', 'outline_symbol')
+
     def __init__(self):
         super().__init__()
         self.color = None
@@ -24,22 +35,30 @@ class MarkerSymbolLayer(SymbolLayer):
     def compatible_versions():
         return [2]
 
-    def children(self):
-        res = super().children()
-        if self.color:
-            res.append(self.color)
-        if self.outline_layer:
-            res.append(self.outline_layer)
-        if self.outline_symbol:
-            res.append(self.outline_symbol)
-        return res
-
 
 class SimpleMarkerSymbolLayer(MarkerSymbolLayer):
     """
     Simple marker symbol layer
     """
 
+    __slots__ = ('type', 'size', 'x_offset', 'y_offset', 'outline_enabled', 'outline_color', 'outline_width')
+    CHILD_ATTRIBUTES = ('outline_color',)
+
+    SCHEMA = [
+        ObjectField('color'),
+        Field('size', 'd'),
+        Enum('type', 'L', MARKER_TYPES, 'marker type'),
+        Terminator(required=True),
+        Field(None, 'd', 'unknown'),
+        Field('x_offset', 'd', 'x offset'),
+        Field('y_offset', 'd', 'y offset'),
+        Field('outline_enabled', 'B', 'has outline', convert=lambda v: v == 1, notes='1 if outline is enabled',
+              revert=int),
+        Field('outline_width', 'd', 'outline width'),
+        ObjectField('outline_color', 'outline color'),
+        Constant('H', 0xffff)
+    ]
+
     def __init__(self):
         super().__init__()
         self.type = None
@@ -54,50 +73,16 @@ class SimpleMarkerSymbolLayer(MarkerSymbolLayer):
     def guid():
         return '7914e5fe-c892-11d0-8bb6-080009ee4e41'
 
-    def read(self, stream: Stream, version):
-        self.color = stream.read_object('color')
-        self.size = stream.read_double('size')
-
-        type_code = stream.read_int()
-        type_dict = {
-            0: 'circle',
-            1: 'square',
-            2: 'cross',
-            3: 'x',
-            4: 'diamond'
-        }
-
-        if type_code not in type_dict:
-            raise UnreadableSymbolException(
-                'Unknown marker type at {}, got {}'.format(hex(stream.tell() - 4),
-                                                           type_code))
-        stream.log('found a {}'.format(type_dict[type_code]), 4)
-        self.type = type_dict[type_code]
-
-        if not stream.read_0d_terminator():
-            raise UnreadableSymbolException('Could not find 0d terminator at {}'.format(hex(stream.tell() - 8)))
-
-        stream.read_double('unknown')
-
-        self.x_offset = stream.read_double('x offset')
-        self.y_offset = stream.read_double('y offset')
-
-        has_outline = stream.read_uchar()
-        if has_outline == 1:
-            self.outline_enabled = True
-        self.outline_width = stream.read_double('outline width')
-        self.outline_color = stream.read_object('outline color')
-
-        check = binascii.hexlify(stream.read(2))
-        if check != b'ffff':
-            raise UnreadableSymbolException('Expected ffff at {}, got {}'.format(check, hex(stream.tell() - 2)))
-
 
 class CharacterMarkerSymbolLayer(MarkerSymbolLayer):
     """
     Character marker symbol layer
     """
 
+    __slots__ = ('font', 'std_font', 'unicode', 'type', 'size', 'angle', 'x_offset', 'y_offset',
+                 'outline_enabled', 'outline_color', 'outline_width')
+    CHILD_ATTRIBUTES = ('outline_color', 'std_font')
+
     def __init__(self):
         super().__init__()
         self.type = None
@@ -120,25 +105,15 @@ class CharacterMarkerSymbolLayer(MarkerSymbolLayer):
     def compatible_versions():
         return [2, 3, 4]
 
-    def children(self):
-        res = super().children()
-        if self.outline_color:
-            res.append(self.outline_color)
-        if self.std_font:
-            res.append(self.std_font)
-        return res
-
     def read(self, stream: Stream, version):
         self.color = stream.read_object('color')
 
-        self.unicode = stream.read_int('unicode')
-        self.angle = stream.read_double('angle')
-        self.size = stream.read_double('size')
-        self.x_offset = stream.read_double('x offset')
-        self.y_offset = stream.read_double('y offset')
-
-        stream.read_double('unknown 1')
-        stream.read_double('unknown 2')
+        (self.unicode,
+         self.angle, self.size,
+         self.x_offset, self.y_offset,
+         _, _) = stream.read_struct('L6d', 'unicode, angle, size, x/y offset, unknown 1/2')
+        if stream.retained is not None:
+            stream.retain(16)
 
         if version == 2:
             self.std_font = stream.read_object('font')
@@ -152,25 +127,72 @@ class CharacterMarkerSymbolLayer(MarkerSymbolLayer):
             self.font = stream.read_string('font name')
 
             # lot of unknown stuff
-            stream.read_double('unknown 3')  # or object?
-            stream.read_double('unknown 4')  # or object?
-
-            stream.read_uchar('unknown')
-            stream.read_uchar('unknown')
+            stream.read_struct('ddBB', 'unknown 3/4 (or objects?), unknown chars')
 
             stream.read(4)
             stream.read(6)
+            if stream.retained is not None:
+                stream.retain(28)
 
             if version >= 4:
                 # std OLE font .. maybe contains useful stuff like bold/etc, but these aren't exposed in ArcGIS anyway..
                 self.std_font = stream.read_object('font')
 
+    @classmethod
+    def skip(cls, stream: Stream, version):
+        stream.skip_object()
+        stream.skip(52)
+        if version == 2:
+            stream.skip_object()
+
+        stream.read_0d_terminator()
+        if binascii.hexlify(stream.read(2)) != b'ffff':
+            raise UnreadableSymbolException('Expected ffff')
+
+        if version >= 3:
+            stream.skip_string()
+            stream.skip(28)
+            if version >= 4:
+                stream.skip_object()
+
+    def write(self, stream, version):
+        stream.write_object(self.color)
+        stream.write_struct('L4d', self.unicode, self.angle, self.size, self.x_offset, self.y_offset)
+        stream.write_retained(bytes(16))
+
+        if version == 2:
+            stream.write_object(self.std_font)
+
+        stream.write_0d_terminator()
+        stream.write(b'\xff\xff')
+
+        if version >= 3:
+            stream.write_string(self.font or '')
+            stream.write_retained(bytes(28))
+
+            if version >= 4:
+                stream.write_object(self.std_font)
+
 
 class ArrowMarkerSymbolLayer(MarkerSymbolLayer):
     """
     Arrow marker symbol layer
     """
 
+    __slots__ = ('type', 'size', 'width', 'angle', 'x_offset', 'y_offset')
+
+    SCHEMA = [
+        ObjectField('color'),
+        Field('size', 'd'),
+        Field('width', 'd'),
+        Field('angle', 'd'),
+        Field(None, 'I', 'unknown'),
+        Terminator(),
+        Field('x_offset', 'd', 'x offset'),
+        Field('y_offset', 'd', 'y offset'),
+        Constant('H', 0xffff)
+    ]
+
     def __init__(self):
         super().__init__()
         self.type = None
@@ -188,32 +210,55 @@ class ArrowMarkerSymbolLayer(MarkerSymbolLayer):
     def compatible_versions():
         return [2]
 
-    def read(self, stream: Stream, version):
-        self.color = stream.read_object('color')
-
-        self.size = stream.read_double('size')
-        self.width = stream.read_double('width')
-        self.angle = stream.read_double('angle')
-
-        # 12 bytes unknown purpose
-        stream.log('skipping 12 unknown bytes')
-
-        _ = stream.read_uint('unknown')
-        stream.read_0d_terminator()
-
-        self.x_offset = stream.read_double('x offset')
-        self.y_offset = stream.read_double('y offset')
-
-        check = binascii.hexlify(stream.read(2))
-        if check != b'ffff':
-            raise UnreadableSymbolException('Expected ffff at {}, got {}'.format(check, hex(stream.tell() - 2)))
-
 
 class PictureMarkerSymbolLayer(MarkerSymbolLayer):
     """
     Picture marker symbol layer
     """
 
+    __slots__ = ('_picture', 'color_foreground', 'color_background', 'color_transparent', 'swap_fb_gb', 'size',
+                 'angle', 'x_offset', 'y_offset')
+    CHILD_ATTRIBUTES = ('picture', 'color_foreground', 'color_background', 'color_transparent')
+
+    picture = LazyAttribute('_picture')
+
+    SCHEMA = [
+        When('version in (4, 5)', [
+            ObjectField('picture', lazy=True)
+        ]),
+        When('version == 8', [
+            Field(None, 'H', 'pic version?'),
+            Field(None, 'I', 'picture type?'),
+            ObjectField('picture', lazy=True)
+        ]),
+        When('version == 9', [
+            PictureField('picture', lazy=True)
+        ]),
+        When('version <= 8', [
+            ObjectField(None, 'unknown object')
+        ]),
+        ObjectField('color_foreground', 'color 1'),
+        ObjectField('color_background', 'color 2'),
+        When('version >= 9', [
+            ObjectField('color_transparent', 'color 3')
+        ]),
+        Field('angle', 'd'),
+        Field('size', 'd'),
+        Field('x_offset', 'd', 'x offset'),
+        Field('y_offset', 'd', 'y offset'),
+        Field(None, 'd', 'unknown'),
+        Field(None, 'd', 'unknown'),
+        Terminator(),
+        Field('swap_fb_gb', 'B', 'swap fgbg', convert=bool),
+        Constant('H', 0xffff),
+        When('version >= 6', [
+            Padding(6),
+            When('version <= 8', [
+                Padding(4)
+            ])
+        ])
+    ]
+
     def __init__(self):
         super().__init__()
         self.size = 0
@@ -235,56 +280,3 @@ class PictureMarkerSymbolLayer(MarkerSymbolLayer):
     @staticmethod
     def compatible_versions():
         return [4, 5, 8, 9]
-
-    def children(self):
-        res = super().children()
-        if self.picture:
-            res.append(self.picture)
-        if self.color_foreground:
-            res.append(self.color_foreground)
-        if self.color_background:
-            res.append(self.color_background)
-        if self.color_transparent:
-            res.append(self.color_transparent)
-        return res
-
-    def read(self, stream: Stream, version):
-        if version in (4, 5):
-            self.picture = stream.read_object('picture')
-        elif version == 8:
-            _ = stream.read_ushort('pic version?')
-            _ = stream.read_uint('picture type?')
-            self.picture = stream.read_object('picture')
-        elif version == 9:
-            self.picture = stream.read_picture('picture')
-
-        if version <= 8:
-            _ = stream.read_object()
-
-        self.color_foreground = stream.read_object('color 1')
-        self.color_background = stream.read_object('color 2')
-
-        if version >= 9:
-            self.color_transparent = stream.read_object('color 3')
-
-        self.angle = stream.read_double('angle')
-        self.size = stream.read_double('size')
-        self.x_offset = stream.read_double('x offset')
-        self.y_offset = stream.read_double('y offset')
-
-        stream.read_double('unknown')
-        stream.read_double('unknown')
-
-        stream.read_0d_terminator()
-        self.swap_fb_gb = bool(stream.read_uchar('swap fgbg'))
-
-        check = binascii.hexlify(stream.read(2))
-        if check != b'ffff':
-            raise UnreadableSymbolException('Expected ffff at {}, got {}'.format(check, hex(stream.tell() - 2)))
-
-        if version < 6:
-            return
-
-        stream.read(6)
-        if version <= 8:
-            stream.read(4)
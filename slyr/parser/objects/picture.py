@@ -16,9 +16,29 @@ class Picture(Object):
     and cannot be automatically read from a stream!
     """
 
+    __slots__ = ('_content',)
+
     def __init__(self):
         super().__init__()
-        self.content = None
+        self._content = None
+
+    @property
+    def content(self) -> bin:
+        """
+        Returns the binary content of the picture. Pictures read from in-memory
+        streams (or unpickled from out-of-band buffers) keep a view of the original
+        buffer until the content is first requested.
+        """
+        if self._content is not None and not isinstance(self._content, bytes):
+            self._content = bytes(self._content)
+        return self._content
+
+    @content.setter
+    def content(self, content: bin):
+        """
+        Sets the binary content of the picture
+        """
+        self._content = content
 
     @staticmethod
     def create_from_bytes(content: bin) -> 'Picture':
@@ -46,6 +66,8 @@ class Picture(Object):
         """
         version = stream.read_uint('version')
         pic_type = stream.read_uint('pic_type')
+        if stream.retained is not None:
+            stream.retain(8)
 
         if version == 2:
             if pic_type == 0:
@@ -62,12 +84,68 @@ class Picture(Object):
             raise UnreadablePictureException('Unknown picture version {}'.format(version))
         return pic
 
+    @staticmethod
+    def skip_from_stream(stream):
+        """
+        Advances the stream past a picture without decoding it, returning the
+        picture's class
+        """
+        version = stream.read_uint('version')
+        pic_type = stream.read_uint('pic_type')
+
+        if version == 2:
+            if pic_type == 0:
+                picture_class = EmfPicture
+            elif pic_type in (1, 2):
+                picture_class = BmpPicture
+            else:
+                raise UnknownPictureTypeException('Unknown picture type {}'.format(pic_type))
+            stream.skip(stream.read_uint('size'))
+        elif version == 3:
+            picture_class = stream.skip_object()
+        else:
+            raise UnreadablePictureException('Unknown picture version {}'.format(version))
+        return picture_class
+
+    @staticmethod
+    def write_to_stream(stream, picture: Object):
+        """
+        Writes a picture to the stream, in the form read by create_from_stream()
+        """
+        header = stream.retained_value()
+        if header is not None:
+            version, pic_type = struct.unpack('<II', header)
+        else:
+            version, pic_type = 3, 0
+        # pictures are embedded directly in version 2, and as persistent objects in version 3
+        if (version == 2) != isinstance(picture, Picture):
+            version = 2 if isinstance(picture, Picture) else 3
+        if version == 2 and (pic_type == 0) != isinstance(picture, EmfPicture):
+            pic_type = 0 if isinstance(picture, EmfPicture) else 1
+        stream.write_struct('II', version, pic_type)
+
+        if version == 2:
+            picture.write(stream, 1)
+        else:
+            stream.write_object(picture)
+
+    def write(self, stream, version):
+        """
+        Writes the picture content to the given stream
+        """
+        content = self._content if self._content is not None else b''
+        stream.write_uint(len(content))
+        stream.write(content)
+
 
 class StdPicture(Object):
     """
     Standard OLE picture
     """
 
+    __slots__ = ('picture',)
+    CHILD_ATTRIBUTES = ('picture',)
+
     def __init__(self):
         super().__init__()
         self.picture = None
@@ -80,36 +158,45 @@ class StdPicture(Object):
     def compatible_versions():
         return None
 
-    def children(self):
-        res = super().children()
-        if self.picture:
-            res.append(self.picture)
-        return res
-
     def read(self, stream, version):
         constant = stream.read_ulong()
         if constant != 0x0000746C:
             raise UnreadablePictureException('Could not read StdPicture constant, got {}'.format(hex(constant)))
         size = stream.read_ulong('size')
+        stream.check_allocation(size, 'picture')
 
         # next bit is the picture
-        content = stream.read(size)
+        content = stream.read_view(size)
         self.picture = Picture.create_from_bytes(content)
 
+    @classmethod
+    def skip(cls, stream, version):
+        stream.read_ulong()
+        stream.skip(stream.read_ulong('size'))
+
+    def write(self, stream, version):
+        content = self.picture.content if self.picture is not None else b''
+        stream.write_ulong(0x0000746C)
+        stream.write_ulong(len(content))
+        stream.write(content)
+
 
 class BmpPicture(Picture):
     """
     A standard windows BMP picture
     """
 
+    __slots__ = ()
+
     def read(self, stream, _):
         """
         Reads the object from the given stream
         """
         stream.log('Reading BMP file')
         size = stream.read_uint('BMP size')
+        stream.check_allocation(size, 'BMP')
 
-        content = stream.read(size)
+        content = stream.read_view(size)
         self.read_binary(content)
 
     def read_binary(self, content: bin):
@@ -122,6 +209,8 @@ class BmpPicture(Picture):
         if check == b'424d':
             # BMP file
             # next bit should be size again
+            if len(content) < 6:
+                raise UnreadablePictureException('Truncated bitmap header')
             size2 = struct.unpack("<I", content[2:6])[0]
             if len(content) != size2:
                 raise UnreadablePictureException(
@@ -133,7 +222,7 @@ class BmpPicture(Picture):
             raise UnreadablePictureException('Expected 424d (\'BM\'), got {}'.format(check))
 
         # all good! rewind and store bitmap
-        self.content = content
+        self._content = content
 
 
 class EmfPicture(Picture):
@@ -141,14 +230,17 @@ class EmfPicture(Picture):
     An EMF/WMF picture
     """
 
+    __slots__ = ()
+
     def read(self, stream, _):
         """
         Reads the object from the given stream
         """
         stream.log('Reading EMF file')
         size = stream.read_uint('EMF size')
+        stream.check_allocation(size, 'EMF')
 
-        content = stream.read(size)
+        content = stream.read_view(size)
         self.read_binary(content)
 
     def read_binary(self, content: bin):
@@ -162,4 +254,4 @@ class EmfPicture(Picture):
             raise UnreadablePictureException('Expected EMF header 010000000, got {}'.format(check))
 
         # all good! rewind and store bitmap
-        self.content = content
+        self._content = content
@@ -5,6 +5,8 @@ Color ramps
 
 from slyr.parser.object import Object
 from slyr.parser.stream import Stream
+from slyr.parser.exceptions import UnreadableSymbolException
+from slyr.parser.schema import Field, Padding, ObjectField, ObjectArray, Method
 
 
 class ColorRamp(Object):
@@ -12,6 +14,8 @@ class ColorRamp(Object):
     Base class for color ramps
     """
 
+    __slots__ = ('ramp_name_type',)
+
     def __init__(self):
         super().__init__()
         self.ramp_name_type = ''
@@ -21,10 +25,32 @@ class ColorRamp(Object):
         Reads the ramp name type from a stream
         """
         name_length = stream.read_int('name size')
-        self.ramp_name_type = stream.read(name_length * 2).decode('utf-16')
-        stream.log('Ramp name \'{}\''.format(self.ramp_name_type), name_length * 2)
+        stream.check_allocation(name_length * 2, 'ramp name')
+        try:
+            self.ramp_name_type = stream.read(name_length * 2).decode('utf-16')
+        except UnicodeDecodeError as e:
+            raise UnreadableSymbolException('Invalid ramp name at {}'.format(hex(stream.tell()))) from e
+        stream.log('Ramp name \'{}\'', self.ramp_name_type, offset=name_length * 2)
 
         stream.read(2)
+        if stream.retained is not None:
+            stream.retain(2)
+
+    @staticmethod
+    def skip_ramp_name_type(stream: Stream):
+        """
+        Skips the ramp name type
+        """
+        stream.skip(stream.read_int('name size') * 2 + 2)
+
+    def write_ramp_name_type(self, stream):
+        """
+        Writes the ramp name type to a stream
+        """
+        name = self.ramp_name_type.encode('utf-16-le')
+        stream.write_int(len(name) // 2)
+        stream.write(name)
+        stream.write_retained(bytes(2))
 
     def to_dict(self) -> dict:
         """
@@ -39,6 +65,21 @@ class RandomColorRamp(ColorRamp):
     Random color ramp
     """
 
+    __slots__ = ('same_everywhere', 'val_min', 'val_max', 'sat_min', 'sat_max', 'hue_min', 'hue_max')
+
+    SCHEMA = [
+        Method('read_ramp_name_type', 'ramp name type'),
+        Padding(4),
+        Field('same_everywhere', 'H', convert=bool),
+        Padding(4),
+        Field('val_min', 'H', 'value min'),
+        Field('val_max', 'H', 'value max'),
+        Field('sat_min', 'H', 'saturation min'),
+        Field('sat_max', 'H', 'saturation max'),
+        Field('hue_min', 'H', 'hue min'),
+        Field('hue_max', 'H', 'hue max')
+    ]
+
     def __init__(self):
         super().__init__()
         self.same_everywhere = False
@@ -53,19 +94,6 @@ class RandomColorRamp(ColorRamp):
     def guid():
         return 'beb87094-c0b4-11d0-8379-080009b996cc'
 
-    def read(self, stream, version):
-        self.read_ramp_name_type(stream)
-
-        stream.read(4)
-        self.same_everywhere = bool(stream.read_ushort('Same everywhere'))
-        stream.read(4)
-        self.val_min = stream.read_ushort('val min')
-        self.val_max = stream.read_ushort('val max')
-        self.sat_min = stream.read_ushort('sat min')
-        self.sat_max = stream.read_ushort('sat max')
-        self.hue_min = stream.read_ushort('hue min')
-        self.hue_max = stream.read_ushort('hue max')
-
     def to_dict(self):
         return {'value_range': [self.val_min, self.val_max], 'saturation_range': [self.sat_min, self.sat_max],
                 'hue_range': [self.hue_min, self.hue_max], 'same_everywhere': self.same_everywhere,
@@ -77,6 +105,15 @@ class PresetColorRamp(ColorRamp):
     Preset color ramp
     """
 
+    __slots__ = ('colors',)
+    CHILD_ATTRIBUTES = ('colors',)
+
+    SCHEMA = [
+        Method('read_ramp_name_type', 'ramp name type'),
+        Padding(4),
+        ObjectArray('colors', 'color')
+    ]
+
     def __init__(self):
         super().__init__()
         self.ramp_name_type = ''
@@ -86,20 +123,6 @@ class PresetColorRamp(ColorRamp):
     def guid():
         return 'beb8709a-c0b4-11d0-8379-080009b996cc'
 
-    def children(self):
-        res = super().children()
-        res.extend(self.colors)
-        return res
-
-    def read(self, stream, version):
-        self.read_ramp_name_type(stream)
-
-        stream.read(4)
-
-        color_count = stream.read_uint('Number of colors')
-        for i in range(color_count):
-            self.colors.append(stream.read_object('Color {}'.format(i + 1)))
-
     def to_dict(self):
         return {'colors': [c.to_dict() for c in self.colors],
                 'ramp_name_type': self.ramp_name_type}
@@ -110,6 +133,9 @@ class MultiPartColorRamp(ColorRamp):
     Multi-part color ramp
     """
 
+    __slots__ = ('parts', 'part_lengths')
+    CHILD_ATTRIBUTES = ('parts',)
+
     def __init__(self):
         super().__init__()
         self.parts = []
@@ -123,20 +149,29 @@ class MultiPartColorRamp(ColorRamp):
     def compatible_versions():
         return [2]
 
-    def children(self):
-        res = super().children()
-        for p in self.parts:
-            if p:
-                res.append(p)
-        return res
-
     def read(self, stream, version):
         self.read_ramp_name_type(stream)
         count = stream.read_uint('Number of parts')
+        stream.check_object_count(count, 'ramp parts')
+        stream.check_allocation(count * 8, 'part lengths')
         for i in range(count):
-            self.parts.append(stream.read_object('Part {}'.format(i + 1)))
-        for i in range(count):
-            self.part_lengths.append(stream.read_double('Length {}'.format(i + 1)))
+            self.parts.append(stream.read_object('Part {}', (i + 1,)))
+        self.part_lengths = list(stream.read_doubles(count, 'part lengths'))
+
+    @classmethod
+    def skip(cls, stream, version):
+        cls.skip_ramp_name_type(stream)
+        count = stream.read_uint('Number of parts')
+        for _ in range(count):
+            stream.skip_object()
+        stream.skip(count * 8)
+
+    def write(self, stream, version):
+        self.write_ramp_name_type(stream)
+        stream.write_uint(len(self.parts))
+        for part in self.parts:
+            stream.write_object(part)
+        stream.write_doubles(self.part_lengths)
 
     def to_dict(self):
         return {'parts': [p.to_dict() for p in self.parts],
@@ -149,6 +184,16 @@ class AlgorithmicColorRamp(ColorRamp):
     Algorithmic color ramp
     """
 
+    __slots__ = ('algorithm', 'color1', 'color2')
+    CHILD_ATTRIBUTES = ('color1', 'color2')
+
+    SCHEMA = [
+        Method('read_ramp_name_type', 'ramp name type'),
+        Field('algorithm', 'I', notes='0: HSV, 1: CIELAB, 2: LAB LCH'),
+        ObjectField('color1', 'color 1'),
+        ObjectField('color2', 'color 2')
+    ]
+
     ALGORITHM_CIELAB = 1
     ALGORITHM_HSV = 0
     ALGORITHM_LABLCH = 2
@@ -168,20 +213,6 @@ class AlgorithmicColorRamp(ColorRamp):
     def compatible_versions():
         return [1]
 
-    def children(self):
-        res = super().children()
-        if self.color1:
-            res.append(self.color1)
-        if self.color2:
-            res.append(self.color2)
-        return res
-
-    def read(self, stream, version):
-        self.read_ramp_name_type(stream)
-        self.algorithm = stream.read_uint('Algorithm')
-        self.color1 = stream.read_object('Color 1')
-        self.color2 = stream.read_object('Color 2')
-
     def to_dict(self):
         return {'color1': self.color1.to_dict(),
                 'color2': self.color2.to_dict(),
@@ -12,6 +12,8 @@ class SymbolLayer(Object):
     Base class for symbol layers
     """
 
+    __slots__ = ('locked', 'enabled', 'tags')
+
     def __init__(self):
         self.locked = False
         self.enabled = True
@@ -23,7 +25,9 @@ class SymbolLayer(Object):
         """
         enabled = stream.read_uint()
         self.enabled = enabled == 1
-        stream.log('read enabled ({})'.format(self.enabled), 4)
+        if stream.retained is not None:
+            stream.retain_value(enabled)
+        stream.log('read enabled ({})', self.enabled, offset=4)
 
     def read_locked(self, stream: Stream):
         """
@@ -32,7 +36,9 @@ class SymbolLayer(Object):
         """
         locked = stream.read_uint()
         self.locked = locked == 1
-        stream.log('read layer locked ({})'.format(self.locked), 4)
+        if stream.retained is not None:
+            stream.retain_value(locked)
+        stream.log('read layer locked ({})', self.locked, offset=4)
 
     def read_tags(self, stream: Stream):
         """
@@ -40,3 +46,32 @@ class SymbolLayer(Object):
 
         """
         self.tags = stream.read_string('layer tags')
+
+    @staticmethod
+    def _state_value(stream, state: bool) -> int:
+        """
+        Returns the raw value to write for a layer state. Only a value of 1 is read as
+        True, so any other retained value is reused as long as the state is unchanged.
+        """
+        value = stream.retained_value()
+        if value is None or (value == 1) != state:
+            value = 1 if state else 0
+        return value
+
+    def write_enabled(self, stream):
+        """
+        Writes the layer 'enabled' state
+        """
+        stream.write_uint(self._state_value(stream, self.enabled))
+
+    def write_locked(self, stream):
+        """
+        Writes the layer 'locked' state
+        """
+        stream.write_uint(self._state_value(stream, self.locked))
+
+    def write_tags(self, stream):
+        """
+        Writes the layer tags
+        """
+        stream.write_string(self.tags)
@@ -0,0 +1,362 @@
+#!/usr/bin/env python
+"""
+Records the byte spans of parsed objects and fields as a tree
+"""
+
+import json
+import time
+from struct import Struct
+from typing import List, Optional
+from slyr.parser.trace import Tracer, TraceEvent
+
+
+class ParseNode:
+    """
+    A node in a parse tree, representing either a persistent object or a single
+    field read from the stream
+    """
+
+    __slots__ = ('kind', 'label', 'start', 'end', 'guid', 'class_name', 'version', 'value', 'attribute',
+                 'elapsed', 'children', 'obj')
+
+    # node kinds, in addition to the field kinds from TraceEvent
+    ROOT = 'root'
+    OBJECT = 'object'
+    NULL_OBJECT = 'null'
+    RAW = 'raw'
+
+    def __init__(self, kind: str, start: int = 0, end: int = 0, label: str = ''):
+        """
+        Constructor for ParseNode
+        :param kind: node kind, e.g. ParseNode.OBJECT or TraceEvent.DOUBLE
+        :param start: start offset of node
+        :param end: end offset of node
+        :param label: debug label for node
+        """
+        self.kind = kind
+        self.label = label
+        self.start = start
+        self.end = end
+        self.guid = None
+        self.class_name = None
+        self.version = None
+        self.value = None
+        self.attribute = None
+        self.elapsed = 0.0
+        self.children = []
+        self.obj = None
+
+    def __repr__(self):
+        return '<ParseNode {} {}:{}>'.format(self.class_name or self.kind, hex(self.start), hex(self.end))
+
+    @property
+    def size(self) -> int:
+        """
+        Returns the number of bytes covered by the node
+        """
+        return self.end - self.start
+
+    def walk(self):
+        """
+        Iterates over this node and all descendants, depth first
+        """
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
+
+    def to_dict(self) -> dict:
+        """
+        Returns a dictionary representation of the node and its children, suitable
+        for JSON export
+        """
+        res = {'kind': self.kind,
+               'start': self.start,
+               'end': self.end}
+        if self.label:
+            res['label'] = self.label
+        if self.attribute is not None:
+            res['attribute'] = self.attribute
+        if self.kind == ParseNode.OBJECT:
+            res['guid'] = self.guid
+            res['class'] = self.class_name
+            res['version'] = self.version
+            res['elapsed'] = self.elapsed
+        elif self.value is not None:
+            res['value'] = list(self.value) if isinstance(self.value, tuple) else self.value
+        if self.children:
+            res['children'] = [c.to_dict() for c in self.children]
+        return res
+
+
+class ParseTree:
+    """
+    A tree of byte spans, recorded from parsing a stream
+    """
+
+    MAGIC = b'SLPT'
+    FORMAT_VERSION = 1
+
+    HEADER = Struct('<4sBI')
+    STRING_LENGTH = Struct('<H')
+    NODE = Struct('<BIIhiiiifI')
+
+    KINDS = [ParseNode.ROOT, ParseNode.OBJECT, ParseNode.NULL_OBJECT, ParseNode.RAW,
+             TraceEvent.UCHAR, TraceEvent.DOUBLE, TraceEvent.INT, TraceEvent.UINT, TraceEvent.ULONG,
+             TraceEvent.USHORT, TraceEvent.STRUCT, TraceEvent.STRING, TraceEvent.GUID, TraceEvent.BINARY]
+
+    def __init__(self, root: ParseNode):
+        """
+        Constructor for ParseTree
+        :param root: root node
+        """
+        self.root = root
+
+    def objects(self) -> List[ParseNode]:
+        """
+        Returns a list of all object nodes in the tree
+        """
+        return [n for n in self.root.walk() if n.kind == ParseNode.OBJECT]
+
+    def class_statistics(self) -> dict:
+        """
+        Returns a dictionary of object class name to a dictionary of 'count', 'bytes' and 'time'
+        consumed by objects of that class. Bytes and time include any child objects.
+        """
+        res = {}
+        for node in self.objects():
+            stats = res.setdefault(node.class_name, {'count': 0, 'bytes': 0, 'time': 0.0})
+            stats['count'] += 1
+            stats['bytes'] += node.size
+            stats['time'] += node.elapsed
+        return res
+
+    def to_json(self, **kwargs) -> str:
+        """
+        Exports the tree to JSON. Keyword arguments are passed to json.dumps.
+        """
+        return json.dumps(self.root.to_dict(), **kwargs)
+
+    def to_bytes(self) -> bin:
+        """
+        Exports the tree to a compact binary representation. Field values are
+        not included.
+        """
+        strings = {}
+
+        def string_index(value: Optional[str]) -> int:
+            """
+            Returns the index of a string in the string table, or -1 for None
+            """
+            if value is None:
+                return -1
+            return strings.setdefault(value, len(strings))
+
+        nodes = []
+        for node in self.root.walk():
+            nodes.append(self.NODE.pack(self.KINDS.index(node.kind),
+                                        node.start,
+                                        node.end,
+                                        node.version if node.version is not None else -1,
+                                        string_index(node.label or None),
+                                        string_index(node.class_name),
+                                        string_index(node.guid),
+                                        string_index(node.attribute if isinstance(node.attribute, str) else None),
+                                        node.elapsed,
+                                        len(node.children)))
+
+        res = [self.HEADER.pack(self.MAGIC, self.FORMAT_VERSION, len(strings))]
+        for value in strings:
+            encoded = value.encode('utf-8')
+            res.append(self.STRING_LENGTH.pack(len(encoded)))
+            res.append(encoded)
+        res.extend(nodes)
+        return b''.join(res)
+
+    @staticmethod
+    def from_bytes(content: bin) -> 'ParseTree':
+        """
+        Reads a tree from the compact binary representation created by to_bytes()
+        """
+        magic, version, string_count = ParseTree.HEADER.unpack_from(content, 0)
+        if magic != ParseTree.MAGIC or version != ParseTree.FORMAT_VERSION:
+            raise ValueError('Not a parse tree')
+        offset = ParseTree.HEADER.size
+
+        strings = []
+        for _ in range(string_count):
+            length = ParseTree.STRING_LENGTH.unpack_from(content, offset)[0]
+            offset += ParseTree.STRING_LENGTH.size
+            strings.append(bytes(content[offset:offset + length]).decode('utf-8'))
+            offset += length
+
+        def string_value(index: int) -> Optional[str]:
+            """
+            Returns the string at index in the string table
+            """
+            return strings[index] if index >= 0 else None
+
+        def read_node():
+            """
+            Reads a node and its children
+            """
+            nonlocal offset
+            kind, start, end, version, label, class_name, guid, attribute, elapsed, child_count = \
+                ParseTree.NODE.unpack_from(content, offset)
+            offset += ParseTree.NODE.size
+            node = ParseNode(ParseTree.KINDS[kind], start, end, string_value(label) or '')
+            node.version = version if version >= 0 else None
+            node.class_name = string_value(class_name)
+            node.guid = string_value(guid)
+            node.attribute = string_value(attribute)
+            node.elapsed = elapsed
+            for _ in range(child_count):
+                node.children.append(read_node())
+            return node
+
+        return ParseTree(read_node())
+
+
+def object_attributes(obj) -> List[str]:
+    """
+    Returns the names of all instance attributes of an object
+    """
+    names = list(getattr(obj, '__dict__', {}))
+    for cls in obj.__class__.__mro__:
+        for name in getattr(cls, '__slots__', ()):
+            if name not in names and name != '__dict__' and hasattr(obj, name):
+                names.append(name)
+    return names
+
+
+def _identity_trackable(value) -> bool:
+    """
+    Returns True if a value can be matched to the attribute it was stored in by
+    identity. Small integers and booleans are shared by the interpreter, so
+    cannot be.
+    """
+    if value is None or isinstance(value, bool):
+        return False
+    if isinstance(value, int):
+        return not -5 <= value <= 256
+    return True
+
+
+class ParseTreeRecorder(Tracer):
+    """
+    A stream tracer which records the byte span of every object and primitive
+    field read from the stream as a ParseTree.
+
+    E.g.
+
+        recorder = ParseTreeRecorder()
+        stream = BufferStream(blob, tracer=recorder)
+        stream.read_object()
+        print(recorder.tree.to_json())
+    """
+
+    def __init__(self, keep_objects: bool = False):
+        """
+        Constructor for ParseTreeRecorder
+        :param keep_objects: if True, all object nodes will keep a reference to the parsed
+        object. Otherwise only top level object nodes do.
+        """
+        self.keep_objects = keep_objects
+        self.tree = ParseTree(ParseNode(ParseNode.ROOT))
+        self._stack = [self.tree.root]
+        self._start_times = []
+
+    def event(self, event: TraceEvent):
+        parent = self._stack[-1]
+        kind = event.kind
+        if kind == TraceEvent.OBJECT_START:
+            guid = None
+            if parent.children and parent.children[-1].kind == TraceEvent.GUID \
+                    and parent.children[-1].start == event.offset:
+                guid = parent.children.pop().value
+
+            if event.value is None:
+                parent.children.append(ParseNode(ParseNode.NULL_OBJECT, event.offset, event.end, event.label))
+                return
+
+            node = ParseNode(ParseNode.OBJECT, event.offset, event.end, event.label)
+            node.guid = guid
+            node.class_name = event.value.__class__.__name__
+            parent.children.append(node)
+            self._stack.append(node)
+            self._start_times.append(time.perf_counter())
+        elif kind == TraceEvent.OBJECT_END:
+            node = self._stack.pop()
+            node.elapsed = time.perf_counter() - self._start_times.pop()
+            node.end = event.offset
+            node.obj = event.value
+            self._fill_gaps(node)
+            self._resolve_attributes(node, event.value)
+            if not self.keep_objects:
+                for child in node.children:
+                    child.obj = None
+            self.tree.root.end = max(self.tree.root.end, node.end)
+        elif kind == TraceEvent.VERSION:
+            parent.version = event.value
+        elif kind != TraceEvent.MESSAGE:
+            node = ParseNode(kind, event.offset, event.end, event.label)
+            node.value = event.value
+            parent.children.append(node)
+            self.tree.root.end = max(self.tree.root.end, node.end)
+
+    @staticmethod
+    def _fill_gaps(node: ParseNode):
+        """
+        Adds RAW nodes covering bytes within an object which were consumed
+        without being recorded as a field
+        """
+        # skip the GUID and version header
+        position = node.start + 16 + (2 if node.version is not None else 0)
+        children = []
+        for child in node.children:
+            if child.start > position:
+                children.append(ParseNode(ParseNode.RAW, position, child.start))
+            children.append(child)
+            position = max(position, child.end)
+        if node.end > position:
+            children.append(ParseNode(ParseNode.RAW, position, node.end))
+        node.children = children
+
+    @staticmethod
+    def _resolve_attributes(node: ParseNode, obj):
+        """
+        Matches child objects and field values to the attributes of obj they ended
+        up in. This is done by identity, so is only possible for values which were
+        stored unmodified.
+        """
+        by_id = {}
+        for name in object_attributes(obj):
+            value = getattr(obj, name)
+            if isinstance(value, (list, tuple)):
+                for i, item in enumerate(value):
+                    if _identity_trackable(item):
+                        by_id.setdefault(id(item), []).append('{}[{}]'.format(name, i))
+            if _identity_trackable(value):
+                by_id.setdefault(id(value), []).append(name)
+
+        def attribute_for(value) -> Optional[str]:
+            """
+            Returns the unique attribute holding value, if any
+            """
+            if not _identity_trackable(value):
+                return None
+            candidates = by_id.get(id(value))
+            if candidates and len(candidates) == 1:
+                return candidates[0]
+            return None
+
+        for child in node.children:
+            if child.kind == ParseNode.OBJECT:
+                child.attribute = attribute_for(child.obj) if child.obj is not None else None
+            elif child.kind == TraceEvent.STRUCT:
+                attributes = [attribute_for(v) for v in child.value]
+                if any(attributes):
+                    child.attribute = attributes
+            elif child.kind != ParseNode.RAW:
+                child.attribute = attribute_for(child.value)
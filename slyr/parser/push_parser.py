@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+"""
+Incremental parsing of objects from byte chunks, as they arrive
+"""
+
+from typing import List, Optional
+from slyr.parser.object import Object
+from slyr.parser.stream import BufferStream
+from slyr.parser.trace import Tracer
+from slyr.parser.exceptions import TruncatedStreamException, UnreadableSymbolException
+
+
+class ChunkStream(BufferStream):
+    """
+    A BufferStream over a partially received buffer. Unlike BufferStream, reads past
+    the end of the buffer raise a TruncatedStreamException instead of returning
+    short results, so that parsing can be retried once more data is available.
+    """
+
+    def read(self, length: int) -> bin:
+        return self.read_view(length).tobytes()
+
+    def read_view(self, length: int) -> memoryview:
+        start = self._offset
+        if length < 0:
+            raise UnreadableSymbolException('Negative read length {} at {}'.format(length, hex(start)))
+        end = start + length
+        if end > self._length:
+            raise TruncatedStreamException('Truncated stream at {}'.format(hex(start)), end)
+        self._offset = end
+        return self._buffer[start:end]
+
+
+class PushParser:
+    """
+    A resumable parser, which accepts input as a series of byte chunks and returns
+    top level objects as soon as all of their bytes have been received.
+
+    E.g.
+
+        parser = PushParser()
+        for chunk in chunks:
+            for obj in parser.feed(chunk):
+                ...
+        parser.close()
+
+    Objects are reparsed from their start whenever a previous attempt ran out of
+    data, but only once enough bytes have arrived to satisfy the read which
+    previously failed. Null objects are skipped.
+    """
+
+    def __init__(self, debug: bool = False, tracer: Optional[Tracer] = None):
+        """
+        Constructor for PushParser
+        :param debug: true if debugging output should be printed during object read
+        :param tracer: optional tracer to receive structured parse events. Event
+        offsets are relative to the start of each object.
+        """
+        self.debug = debug
+        self.tracer = tracer
+        self._buffer = bytearray()
+        # offset of the first byte in the buffer not yet consumed by a completed object
+        self._consumed = 0
+        self._required = 0
+        self._closed = False
+
+    @property
+    def buffered(self) -> int:
+        """
+        Returns the number of received bytes which have not yet been consumed
+        by a completed object
+        """
+        return len(self._buffer) - self._consumed
+
+    def feed(self, data: bin) -> List[Object]:
+        """
+        Adds a chunk of data to the parser, and returns a list of all objects
+        completed by the chunk
+        """
+        if self._closed:
+            raise ValueError('Cannot feed a closed parser')
+        try:
+            self._buffer += data
+        except BufferError:
+            # completed objects (or a previous attempt) still hold views into the buffer, so
+            # it cannot be resized. Move the remaining bytes to a new buffer instead.
+            self._buffer = self._buffer[self._consumed:] + data
+            self._consumed = 0
+
+        res = []
+        while self.buffered and self.buffered >= self._required:
+            obj = self._read_next()
+            if obj is None:
+                break
+            res.append(obj)
+        return res
+
+    def close(self):
+        """
+        Signals the end of input. Raises a TruncatedStreamException if a partially
+        received object remains.
+        """
+        self._closed = True
+        if self.buffered:
+            raise TruncatedStreamException('{} bytes remaining at end of stream'.format(self.buffered),
+                                           self._required)
+
+    def _read_next(self) -> Optional[Object]:
+        """
+        Tries to read the next object from the buffer, returning None if not enough
+        data is available yet
+        """
+        obj = None
+        while obj is None and self.buffered:
+            with memoryview(self._buffer) as view:
+                stream = ChunkStream(view[self._consumed:], self.debug, self.tracer)
+                try:
+                    obj = stream.read_object()
+                except TruncatedStreamException as e:
+                    self._required = e.required
+                    return None
+                finally:
+                    stream.close()
+            # null objects are consumed and skipped
+            self._consumed += stream.tell()
+
+        self._required = 0
+        self._compact()
+        return obj
+
+    def _compact(self):
+        """
+        Discards consumed bytes from the start of the buffer, once they make up most of it.
+        Consumed bytes are not discarded after every object, as this would copy the
+        remaining buffer each time.
+        """
+        if self._consumed < len(self._buffer) // 2:
+            return
+        try:
+            del self._buffer[:self._consumed]
+        except BufferError:
+            # completed objects hold views into the buffer, so it cannot be resized
+            self._buffer = self._buffer[self._consumed:]
+        self._consumed = 0
+
+
+def iter_objects(file_handle, chunk_size: int = 65536, debug: bool = False, tracer: Optional[Tracer] = None):
+    """
+    Parses a sequence of top level objects from a non-seekable file handle, such
+    as a pipe, yielding each object as soon as it has been received.
+    """
+    parser = PushParser(debug, tracer)
+    while True:
+        chunk = file_handle.read(chunk_size)
+        if not chunk:
+            break
+        yield from parser.feed(chunk)
+    parser.close()
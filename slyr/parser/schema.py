@@ -0,0 +1,728 @@
+#!/usr/bin/env python
+"""
+Declarative layouts for persistent objects, compiled into reader functions.
+
+An object class can describe its binary layout by setting a SCHEMA class attribute
+to a list of fields, instead of implementing read() and write(). When the class is
+registered with the object registry the schema is compiled into specialised read(),
+write() and skip() functions, with each contiguous run of fixed size fields unpacked
+by a single struct call.
+
+E.g.
+
+    class ArrowMarkerSymbolLayer(MarkerSymbolLayer):
+
+        SCHEMA = [
+            ObjectField('color'),
+            Field('size', 'd'),
+            Field('width', 'd'),
+            Field('angle', 'd'),
+            Padding(4),
+            Terminator(),
+            Field('x_offset', 'd', 'x offset'),
+            Field('y_offset', 'd', 'y offset'),
+            Constant('H', 0xffff)
+        ]
+
+Schemas also double as format documentation, see schema_to_markdown().
+"""
+
+import struct
+from typing import List, Optional
+from slyr.parser.exceptions import UnreadableSymbolException
+
+
+class SchemaField:
+    """
+    Base class for fields in an object schema
+    """
+
+    # struct format for fixed size fields, or None for variable sized fields
+    fmt = None
+
+    def __init__(self, name: Optional[str] = None, description: str = ''):
+        """
+        Constructor for SchemaField
+        :param name: attribute name to store the field's value in, or None if
+        the value is discarded
+        :param description: description of field, for debug output and documentation
+        """
+        self.name = name
+        self.description = description or (name.replace('_', ' ') if name else 'unknown')
+
+    @property
+    def value_count(self) -> int:
+        """
+        Returns the number of values unpacked by fixed size fields
+        """
+        return 1
+
+    def type_description(self) -> str:
+        """
+        Returns a description of the field's binary type, for documentation
+        """
+        return ''
+
+    def notes(self) -> str:
+        """
+        Returns notes on the field's interpretation, for documentation
+        """
+        return ''
+
+
+class Field(SchemaField):
+    """
+    A fixed size primitive field
+    """
+
+    def __init__(self, name: Optional[str], fmt: str, description: str = '',  # pylint: disable=too-many-arguments
+                 convert=None, notes: str = '', revert=None):
+        """
+        Constructor for Field
+        :param name: attribute name, or None if the value is discarded
+        :param fmt: struct format character(s) for the field, e.g. 'd'
+        :param description: description of field
+        :param convert: optional callable to convert the raw value before storing
+        :param notes: notes on the field's interpretation, for documentation
+        :param revert: callable to convert a stored value back to its raw value
+        for writing. Required if convert is set, unless convert is bool.
+        """
+        super().__init__(name, description)
+        self.fmt = fmt
+        self.convert = convert
+        self._notes = notes
+        if revert is None and convert is not None:
+            if convert is not bool:
+                raise ValueError('Field {} requires a revert function'.format(name))
+            revert = int
+        self.revert = revert
+
+    def type_description(self):
+        return type_name(self.fmt)
+
+    def notes(self):
+        if not self._notes and self.convert is bool:
+            return 'boolean'
+        return self._notes
+
+
+class Enum(SchemaField):
+    """
+    A fixed size field which maps to one of a set of known values. Unknown values
+    raise an UnreadableSymbolException.
+    """
+
+    def __init__(self, name: str, fmt: str, choices: dict, description: str = ''):
+        """
+        Constructor for Enum
+        :param name: attribute name
+        :param fmt: struct format character for the field, e.g. 'B'
+        :param choices: dictionary of raw value to stored value
+        :param description: description of field
+        """
+        super().__init__(name, description)
+        self.fmt = fmt
+        self.choices = choices
+
+    def type_description(self):
+        return type_name(self.fmt)
+
+    def notes(self):
+        return ', '.join('{}: {}'.format(k, v) for k, v in self.choices.items())
+
+
+class Constant(SchemaField):
+    """
+    A fixed size field which must always contain the same value
+    """
+
+    def __init__(self, fmt: str, value, description: str = '', exception=UnreadableSymbolException):
+        """
+        Constructor for Constant
+        :param fmt: struct format for the field, e.g. 'H'
+        :param value: expected value
+        :param description: description of field
+        :param exception: exception class to raise when the value differs
+        """
+        super().__init__(None, description or 'constant')
+        self.fmt = fmt
+        self.value = value
+        self.exception = exception
+
+    def type_description(self):
+        return type_name(self.fmt)
+
+    def notes(self):
+        return 'always {}'.format(self.hex_value())
+
+    def hex_value(self) -> str:
+        """
+        Returns the expected value in hex form
+        """
+        if isinstance(self.value, bytes):
+            return self.value.hex()
+        return hex(self.value)
+
+
+class Padding(SchemaField):
+    """
+    Bytes of unknown purpose, which are skipped
+    """
+
+    def __init__(self, size: int, description: str = ''):
+        """
+        Constructor for Padding
+        :param size: number of bytes to skip
+        :param description: description of field
+        """
+        super().__init__(None, description or 'unknown')
+        self.size = size
+        self.fmt = '{}x'.format(size)
+
+    @property
+    def value_count(self):
+        return 0
+
+    def type_description(self):
+        return '{} bytes'.format(self.size)
+
+
+class Terminator(SchemaField):
+    """
+    The standard 0d00000000000000 terminator
+    """
+
+    def __init__(self, required: bool = False):
+        """
+        Constructor for Terminator
+        :param required: if True, an UnreadableSymbolException is raised when the
+        terminator is not found. Otherwise the 8 bytes are skipped.
+        """
+        super().__init__(None, '0d terminator')
+        self.required = required
+        self.fmt = 'I4x' if required else '8x'
+
+    @property
+    def value_count(self):
+        return 1 if self.required else 0
+
+    def type_description(self):
+        return '8 bytes'
+
+    def notes(self):
+        return '0d00000000000000' + (' (required)' if self.required else '')
+
+
+class ObjectField(SchemaField):
+    """
+    A child persistent object
+    """
+
+    def __init__(self, name: Optional[str] = None, description: str = '', lazy: bool = False):
+        """
+        Constructor for ObjectField
+        :param name: attribute name, or None if the object is discarded
+        :param description: description of field
+        :param lazy: if True, the object may be skipped by lazy streams and decoded on first
+        access. The attribute must be a LazyAttribute.
+        """
+        super().__init__(name, description)
+        self.lazy = lazy
+
+    def type_description(self):
+        return 'object'
+
+
+class StringField(SchemaField):
+    """
+    A length prefixed UTF-16 string
+    """
+
+    def type_description(self):
+        return 'string'
+
+
+class PictureField(ObjectField):
+    """
+    An embedded picture
+    """
+
+    def type_description(self):
+        return 'picture'
+
+
+class Array(SchemaField):
+    """
+    A uint32 count, followed by that number of fixed size values
+    """
+
+    def __init__(self, name: str, fmt: str, description: str = ''):
+        """
+        Constructor for Array
+        :param name: attribute name. Values are stored as a list.
+        :param fmt: struct format character for each value, e.g. 'd'
+        :param description: description of field
+        """
+        super().__init__(name, description)
+        self.item_fmt = fmt
+
+    def type_description(self):
+        return 'uint32 count + {}[count]'.format(type_name(self.item_fmt))
+
+
+class ObjectArray(SchemaField):
+    """
+    A uint32 count, followed by that number of child objects
+    """
+
+    def type_description(self):
+        return 'uint32 count + object[count]'
+
+
+class Method(SchemaField):
+    """
+    A part of the layout which is read by a method on the object, for structures
+    which can't be described declaratively. The method is called with the stream.
+    """
+
+    def __init__(self, method: str, description: str = '', writer: Optional[str] = None,
+                 skipper: Optional[str] = None):
+        """
+        Constructor for Method
+        :param method: name of method to call
+        :param description: description of the structure read by the method
+        :param writer: name of method to call when writing. Defaults to method with 'read'
+        replaced by 'write', e.g. write_outline for read_outline.
+        :param skipper: name of static or class method to call when skipping. Defaults to
+        method with 'read' replaced by 'skip', e.g. skip_outline for read_outline.
+        """
+        super().__init__(None, description or method.replace('_', ' '))
+        self.method = method
+        self.writer = writer or method.replace('read', 'write', 1)
+        self.skipper = skipper or method.replace('read', 'skip', 1)
+
+    def type_description(self):
+        return 'see {}()'.format(self.method)
+
+
+class When(SchemaField):
+    """
+    A block of fields which is only present for some object versions
+    """
+
+    def __init__(self, condition: str, fields: List[SchemaField]):
+        """
+        Constructor for When
+        :param condition: Python expression in terms of version, e.g. 'version >= 3'
+        :param fields: fields present when the condition is met
+        """
+        super().__init__(None, 'if {}'.format(condition))
+        self.condition = condition
+        self.fields = fields
+
+
+TYPE_NAMES = {
+    'B': 'uint8',
+    'H': 'uint16',
+    'I': 'uint32',
+    'L': 'uint32',
+    'l': 'int32',
+    'd': 'double',
+}
+
+
+def type_name(fmt: str) -> str:
+    """
+    Returns a readable name for a struct format, for documentation
+    """
+    if fmt in TYPE_NAMES:
+        return TYPE_NAMES[fmt]
+    return '{} bytes'.format(struct.calcsize('<' + fmt))
+
+
+class _ReaderBuilder:
+    """
+    Generates the source of a reader function from a schema
+    """
+
+    def __init__(self, class_name: str):
+        self.class_name = class_name
+        self.lines = []
+        self.namespace = {'UnreadableSymbolException': UnreadableSymbolException}
+        self.counter = 0
+
+    def name(self, prefix: str) -> str:
+        """
+        Returns a unique local variable name
+        """
+        self.counter += 1
+        return '_{}{}'.format(prefix, self.counter)
+
+    def constant(self, value) -> str:
+        """
+        Stores a value in the function namespace, returning its name
+        """
+        name = self.name('c')
+        self.namespace[name] = value
+        return name
+
+    def emit(self, indent: int, line: str):
+        """
+        Adds a source line
+        """
+        self.lines.append('    ' * indent + line)
+
+    def build(self, fields: List[SchemaField], indent: int):
+        """
+        Generates source for a list of fields
+        """
+        run = []
+        for field in fields:
+            if field.fmt is not None:
+                run.append(field)
+                continue
+            self.build_run(run, indent)
+            run = []
+            self.build_field(field, indent)
+        self.build_run(run, indent)
+
+    def build_run(self, run: List[SchemaField], indent: int):
+        """
+        Generates source for a run of fixed size fields, read using a single struct
+        """
+        if not run:
+            return
+
+        fmt = ''.join(f.fmt for f in run)
+        label = ', '.join(f.description for f in run if not isinstance(f, Padding))
+        if all(f.value_count == 0 for f in run):
+            self.emit(indent, 'stream.skip({})'.format(struct.calcsize('<' + fmt)))
+            self.build_retain(run, indent)
+            return
+
+        targets = []
+        checks = []
+        for field in run:
+            if field.value_count == 0:
+                continue
+            if isinstance(field, Field) and field.name and field.convert is None:
+                targets.append('self.{}'.format(field.name))
+                continue
+
+            value = self.name('v')
+            targets.append(value)
+            if isinstance(field, Field):
+                if field.name:
+                    checks.append('self.{} = {}({})'.format(field.name, self.constant(field.convert), value))
+            elif isinstance(field, Enum):
+                choices = self.constant(field.choices)
+                checks.append('if {} not in {}:'.format(value, choices))
+                checks.append('    raise UnreadableSymbolException(\'Unknown {} {{}} at {{}}\'.format({}, '
+                              'hex(stream.tell())))'.format(field.description, value))
+                checks.append('self.{} = {}[{}]'.format(field.name, choices, value))
+            elif isinstance(field, Constant):
+                checks.append('if {} != {}:'.format(value, repr(field.value)))
+                checks.append('    raise {}(\'Expected {} of {}, got {{}}\'.format({}))'.format(
+                    self.constant(field.exception), field.description, field.hex_value(), value))
+            elif isinstance(field, Terminator) and field.required:
+                checks.append('if {} != 0x0d:'.format(value))
+                checks.append('    raise UnreadableSymbolException(\'Could not find 0d terminator at {}\''
+                              '.format(hex(stream.tell() - 8)))')
+
+        if len(targets) == 1:
+            self.emit(indent, '{}, = stream.read_struct({}, {})'.format(targets[0], repr(fmt), repr(label)))
+        else:
+            self.emit(indent, '{} = stream.read_struct({}, {})'.format(', '.join(targets), repr(fmt), repr(label)))
+        for line in checks:
+            self.emit(indent, line)
+        self.build_retain(run, indent)
+
+    def build_retain(self, run: List[SchemaField], indent: int):
+        """
+        Generates source to retain the raw bytes of skipped fields in a run, for writing
+        """
+        size = struct.calcsize('<' + ''.join(f.fmt for f in run))
+        offset = 0
+        retained = []
+        for field in run:
+            field_size = struct.calcsize('<' + field.fmt)
+            if is_skipped(field):
+                retained.append('stream.retain({}, {})'.format(size - offset, field_size))
+            offset += field_size
+        if retained:
+            self.emit(indent, 'if stream.retained is not None:')
+            for line in retained:
+                self.emit(indent + 1, line)
+
+    def build_field(self, field: SchemaField, indent: int):
+        """
+        Generates source for a variable size field
+        """
+        target = 'self.{}'.format(field.name) if field.name else '_'
+        if isinstance(field, PictureField):
+            self.emit(indent, '{} = stream.{}({})'.format(
+                target, 'read_lazy_picture' if field.lazy else 'read_picture', repr(field.description)))
+        elif isinstance(field, ObjectField):
+            self.emit(indent, '{} = stream.{}({})'.format(
+                target, 'read_lazy_object' if field.lazy else 'read_object', repr(field.description)))
+            if not field.name:
+                self.emit(indent, 'if stream.retained is not None:')
+                self.emit(indent + 1, 'stream.retain_value(_)')
+        elif isinstance(field, StringField):
+            self.emit(indent, '{} = stream.read_string({})'.format(target, repr(field.description)))
+        elif isinstance(field, Array):
+            count = self.name('n')
+            self.emit(indent, '{} = stream.read_uint({})'.format(count, repr(field.description + ' count')))
+            self.emit(indent, 'stream.check_allocation({} * {}, {})'.format(
+                count, struct.calcsize('<' + field.item_fmt), repr(field.description)))
+            self.emit(indent, '{} = list(stream.read_struct(str({}) + {}, {}))'.format(
+                target, count, repr(field.item_fmt), repr(field.description)))
+        elif isinstance(field, ObjectArray):
+            count = self.name('n')
+            index = self.name('i')
+            self.emit(indent, '{} = stream.read_uint({})'.format(count, repr(field.description + ' count')))
+            self.emit(indent, 'stream.check_object_count({}, {})'.format(count, repr(field.description)))
+            self.emit(indent, '{} = []'.format(target))
+            self.emit(indent, 'for {} in range({}):'.format(index, count))
+            self.emit(indent + 1, '{}.append(stream.read_object({}, ({} + 1, {})))'.format(
+                target, repr(field.description + ' {}/{}'), index, count))
+        elif isinstance(field, Method):
+            self.emit(indent, 'self.{}(stream)'.format(field.method))
+        elif isinstance(field, When):
+            self.emit(indent, 'if {}:'.format(field.condition))
+            start = len(self.lines)
+            self.build(field.fields, indent + 1)
+            if len(self.lines) == start:
+                self.emit(indent + 1, 'pass')
+        else:
+            raise TypeError('Unknown schema field {}'.format(field.__class__.__name__))
+
+
+def is_skipped(field: SchemaField) -> bool:
+    """
+    Returns True if a fixed size field's value is skipped when reading, so must be
+    retained to be written back unchanged
+    """
+    return isinstance(field, (Padding, Terminator)) or (isinstance(field, Field) and not field.name)
+
+
+def default_bytes(field: SchemaField) -> bin:
+    """
+    Returns the bytes written for a skipped field when no value was retained
+    """
+    if isinstance(field, Terminator):
+        return b'\x0d' + bytes(7)
+    return bytes(struct.calcsize('<' + field.fmt))
+
+
+class _WriterBuilder(_ReaderBuilder):
+    """
+    Generates the source of a writer function from a schema
+    """
+
+    def build(self, fields: List[SchemaField], indent: int):
+        """
+        Generates source for a list of fields
+        """
+        for field in fields:
+            self.build_field(field, indent)
+
+    def build_field(self, field: SchemaField, indent: int):  # pylint: disable=too-many-branches
+        """
+        Generates source for a single field
+        """
+        value = 'self.{}'.format(field.name) if field.name else None
+        if is_skipped(field):
+            self.emit(indent, 'stream.write_retained({})'.format(repr(default_bytes(field))))
+        elif isinstance(field, Field):
+            if field.revert is not None:
+                value = '{}({})'.format(self.constant(field.revert), value)
+            self.emit(indent, 'stream.write_struct({}, {})'.format(repr(field.fmt), value))
+        elif isinstance(field, Enum):
+            values = self.constant({v: k for k, v in field.choices.items()})
+            self.emit(indent, 'stream.write_struct({}, {}[{}])'.format(repr(field.fmt), values, value))
+        elif isinstance(field, Constant):
+            self.emit(indent, 'stream.write_struct({}, {})'.format(repr(field.fmt), repr(field.value)))
+        elif isinstance(field, PictureField):
+            self.emit(indent, 'stream.write_picture({})'.format(value))
+        elif isinstance(field, ObjectField):
+            if value is None:
+                value = 'stream.retained_value()'
+            self.emit(indent, 'stream.write_object({})'.format(value))
+        elif isinstance(field, StringField):
+            self.emit(indent, 'stream.write_string({})'.format(value))
+        elif isinstance(field, Array):
+            self.emit(indent, 'stream.write_uint(len({}))'.format(value))
+            self.emit(indent, 'stream.write_struct(str(len({0})) + {1}, *{0})'.format(value, repr(field.item_fmt)))
+        elif isinstance(field, ObjectArray):
+            item = self.name('o')
+            self.emit(indent, 'stream.write_uint(len({}))'.format(value))
+            self.emit(indent, 'for {} in {}:'.format(item, value))
+            self.emit(indent + 1, 'stream.write_object({})'.format(item))
+        elif isinstance(field, Method):
+            self.emit(indent, 'self.{}(stream)'.format(field.writer))
+        elif isinstance(field, When):
+            self.emit(indent, 'if {}:'.format(field.condition))
+            start = len(self.lines)
+            self.build(field.fields, indent + 1)
+            if len(self.lines) == start:
+                self.emit(indent + 1, 'pass')
+        else:
+            raise TypeError('Unknown schema field {}'.format(field.__class__.__name__))
+
+
+class _SkipperBuilder(_ReaderBuilder):
+    """
+    Generates the source of a skip function from a schema. Fixed size fields are
+    skipped without unpacking, except for fields which validate the layout
+    (constants, enums and required terminators).
+    """
+
+    def build_run(self, run: List[SchemaField], indent: int):
+        """
+        Generates source for a run of fixed size fields
+        """
+        if not run:
+            return
+
+        fmt = ''.join(f.fmt for f in run)
+        checked = [f for f in run if isinstance(f, (Constant, Enum)) or (isinstance(f, Terminator) and f.required)]
+        if not checked:
+            self.emit(indent, 'stream.skip({})'.format(struct.calcsize('<' + fmt)))
+            return
+
+        targets = []
+        checks = []
+        for field in run:
+            if field.value_count == 0:
+                continue
+            if field not in checked:
+                targets.append('_')
+                continue
+            value = self.name('v')
+            targets.append(value)
+            if isinstance(field, Enum):
+                checks.append('if {} not in {}:'.format(value, self.constant(field.choices)))
+                checks.append('    raise UnreadableSymbolException(\'Unknown {} {{}} at {{}}\'.format({}, '
+                              'hex(stream.tell())))'.format(field.description, value))
+            elif isinstance(field, Constant):
+                checks.append('if {} != {}:'.format(value, repr(field.value)))
+                checks.append('    raise {}(\'Expected {} of {}, got {{}}\'.format({}))'.format(
+                    self.constant(field.exception), field.description, field.hex_value(), value))
+            else:
+                checks.append('if {} != 0x0d:'.format(value))
+                checks.append('    raise UnreadableSymbolException(\'Could not find 0d terminator at {}\''
+                              '.format(hex(stream.tell() - 8)))')
+
+        self.emit(indent, '{}{} = stream.read_struct({})'.format(
+            ', '.join(targets), ',' if len(targets) == 1 else '', repr(fmt)))
+        for line in checks:
+            self.emit(indent, line)
+
+    def build_field(self, field: SchemaField, indent: int):
+        """
+        Generates source for a variable size field
+        """
+        if isinstance(field, PictureField):
+            self.emit(indent, 'stream.skip_picture()')
+        elif isinstance(field, ObjectField):
+            self.emit(indent, 'stream.skip_object()')
+        elif isinstance(field, StringField):
+            self.emit(indent, 'stream.skip_string()')
+        elif isinstance(field, Array):
+            self.emit(indent, 'stream.skip(stream.read_uint() * {})'.format(struct.calcsize('<' + field.item_fmt)))
+        elif isinstance(field, ObjectArray):
+            index = self.name('i')
+            self.emit(indent, 'for {} in range(stream.read_uint()):'.format(index))
+            self.emit(indent + 1, 'stream.skip_object()')
+        elif isinstance(field, Method):
+            self.emit(indent, 'cls.{}(stream)'.format(field.skipper))
+        else:
+            super().build_field(field, indent)
+
+
+def reader_source(object_class) -> (str, dict):
+    """
+    Returns the generated source for an object class' schema reader, along with the
+    namespace required to execute it
+    """
+    builder = _ReaderBuilder(object_class.__name__)
+    builder.emit(0, 'def read(self, stream, version):')
+    builder.build(object_class.SCHEMA, 1)
+    if len(builder.lines) == 1:
+        builder.emit(1, 'pass')
+    return '\n'.join(builder.lines) + '\n', builder.namespace
+
+
+def writer_source(object_class) -> (str, dict):
+    """
+    Returns the generated source for an object class' schema writer, along with the
+    namespace required to execute it
+    """
+    builder = _WriterBuilder(object_class.__name__)
+    builder.emit(0, 'def write(self, stream, version):')
+    builder.build(object_class.SCHEMA, 1)
+    if len(builder.lines) == 1:
+        builder.emit(1, 'pass')
+    return '\n'.join(builder.lines) + '\n', builder.namespace
+
+
+def skipper_source(object_class) -> (str, dict):
+    """
+    Returns the generated source for an object class' schema skip function, along with
+    the namespace required to execute it
+    """
+    builder = _SkipperBuilder(object_class.__name__)
+    builder.emit(0, 'def skip(cls, stream, version):')
+    builder.build(object_class.SCHEMA, 1)
+    if len(builder.lines) == 1:
+        builder.emit(1, 'pass')
+    return '\n'.join(builder.lines) + '\n', builder.namespace
+
+
+def compile_schema(object_class):
+    """
+    Compiles the SCHEMA of an object class into reader, writer and skip functions, and
+    installs them as the class' read() and write() methods and skip() class method
+    """
+    for name, source_function, doc in (('read', reader_source, 'Reads a {} from the stream'),
+                                       ('write', writer_source, 'Writes a {} to the stream'),
+                                       ('skip', skipper_source, 'Advances the stream past a {}')):
+        source, namespace = source_function(object_class)
+        code = compile(source, '<schema {}>'.format(object_class.__name__), 'exec')
+        exec(code, namespace)  # pylint: disable=exec-used
+        function = namespace[name]
+        function.__doc__ = (doc + ', as described by its SCHEMA').format(object_class.__name__)
+        function.__qualname__ = '{}.{}'.format(object_class.__name__, name)
+        setattr(object_class, name, classmethod(function) if name == 'skip' else function)
+
+
+def schema_to_markdown(object_class) -> str:
+    """
+    Returns a markdown table documenting the binary layout of an object class
+    """
+    header = 'GUID: `{}`'.format(object_class.guid())
+    versions = object_class.compatible_versions()
+    if versions:
+        header += ', versions: {}'.format(', '.join(str(v) for v in versions))
+    lines = ['### {}'.format(object_class.__name__),
+             '',
+             header]
+    lines.extend(['',
+                  '| Field | Type | Attribute | Notes |',
+                  '|---|---|---|---|'])
+
+    def add_fields(fields: List[SchemaField], prefix: str):
+        """
+        Adds table rows for a list of fields
+        """
+        for field in fields:
+            if isinstance(field, When):
+                lines.append('| {}*{}* | | | |'.format(prefix, field.description))
+                add_fields(field.fields, prefix + '&nbsp;&nbsp;')
+                continue
+            lines.append('| {}{} | {} | {} | {} |'.format(prefix, field.description, field.type_description(),
+                                                          field.name or '', field.notes()))
+
+    add_fields(object_class.SCHEMA, '')
+    return '\n'.join(lines) + '\n'
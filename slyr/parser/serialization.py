@@ -0,0 +1,350 @@
+#!/usr/bin/env python
+"""
+Compact, versioned binary serialization of parsed object trees
+"""
+
+import importlib
+from array import array
+from struct import Struct
+from typing import List, Optional
+from slyr.parser.object import Object, attribute_names, freeze
+
+MAGIC = b'SLYO'
+FORMAT_VERSION = 1
+
+_HEADER = Struct('<4sB')
+_DOUBLE = Struct('<d')
+_INT8 = Struct('<b')
+_INT32 = Struct('<i')
+_INT64 = Struct('<q')
+
+# value tags
+_NONE = 0
+_TRUE = 1
+_FALSE = 2
+_INT8_VALUE = 3
+_INT32_VALUE = 4
+_INT64_VALUE = 5
+_BIG_INT = 6
+_FLOAT = 7
+_STRING = 8
+_BYTES = 9
+_BUFFER = 10
+_LIST = 11
+_TUPLE = 12
+_DOUBLE_ARRAY = 13
+_CLASS = 14
+_OBJECT = 15
+_FROZEN_OBJECT = 16
+_REFERENCE = 17
+
+# class layouts, keyed on their serialized definition
+_CLASS_LAYOUTS = {}
+
+
+class _Writer:
+    """
+    Encodes an object tree
+    """
+
+    def __init__(self, buffers: Optional[list]):
+        self.buffer = bytearray(_HEADER.pack(MAGIC, FORMAT_VERSION))
+        self.buffers = buffers
+        self.classes = {}
+        self.objects = {}
+        # serialized objects, kept alive so that their ids cannot be reused within the tree
+        self.serialized = []
+
+    def add_size(self, value: int):
+        """
+        Encodes an unsigned integer as a variable length integer
+        """
+        buffer = self.buffer
+        while value >= 0x80:
+            buffer.append((value & 0x7f) | 0x80)
+            value >>= 7
+        buffer.append(value)
+
+    def add_string(self, value: str):
+        """
+        Encodes the length and content of a string, without a tag
+        """
+        encoded = value.encode('utf-8')
+        self.add_size(len(encoded))
+        self.buffer += encoded
+
+    def add(self, value):  # pylint: disable=too-many-branches,too-many-statements
+        """
+        Encodes a tagged value
+        """
+        buffer = self.buffer
+        if value is None:
+            buffer.append(_NONE)
+        elif value is True:
+            buffer.append(_TRUE)
+        elif value is False:
+            buffer.append(_FALSE)
+        elif isinstance(value, int):
+            if -0x80 <= value < 0x80:
+                buffer.append(_INT8_VALUE)
+                buffer += _INT8.pack(value)
+            elif -0x80000000 <= value < 0x80000000:
+                buffer.append(_INT32_VALUE)
+                buffer += _INT32.pack(value)
+            elif -2 ** 63 <= value < 2 ** 63:
+                buffer.append(_INT64_VALUE)
+                buffer += _INT64.pack(value)
+            else:
+                buffer.append(_BIG_INT)
+                self.add_string(str(value))
+        elif isinstance(value, float):
+            buffer.append(_FLOAT)
+            buffer += _DOUBLE.pack(value)
+        elif isinstance(value, str):
+            buffer.append(_STRING)
+            self.add_string(value)
+        elif isinstance(value, (bytes, bytearray, memoryview)):
+            if self.buffers is not None:
+                buffer.append(_BUFFER)
+                self.add_size(len(self.buffers))
+                self.buffers.append(value)
+            else:
+                buffer.append(_BYTES)
+                self.add_size(len(value))
+                buffer += value
+        elif isinstance(value, array) and value.typecode == 'd':
+            buffer.append(_DOUBLE_ARRAY)
+            self.add_size(len(value))
+            buffer += Struct('<{}d'.format(len(value))).pack(*value)
+        elif isinstance(value, (list, tuple)):
+            buffer.append(_LIST if isinstance(value, list) else _TUPLE)
+            self.add_size(len(value))
+            for item in value:
+                self.add(item)
+        elif isinstance(value, Object):
+            self.add_object(value)
+        else:
+            raise TypeError('Cannot serialize values of type {}'.format(value.__class__.__name__))
+
+    def add_object(self, obj: Object):
+        """
+        Encodes an object. Objects which occur more than once in the tree (such as
+        interned colors) are only encoded once, and later occurrences refer back to them.
+        """
+        index = self.objects.get(id(obj))
+        if index is not None:
+            self.buffer.append(_REFERENCE)
+            self.add_size(index)
+            return
+
+        object_class = obj.__class__
+        frozen = object_class.__dict__.get('FROZEN', False)
+        if frozen:
+            object_class = object_class.__bases__[0]
+
+        names = attribute_names(object_class)
+        class_index = self.classes.get(object_class)
+        if class_index is None:
+            # first object of this class, so define the class and its attribute layout
+            class_index = len(self.classes)
+            self.classes[object_class] = class_index
+            self.buffer.append(_CLASS)
+            definition = _Writer(None)
+            definition.buffer = bytearray()
+            definition.add_string(object_class.__module__)
+            definition.add_string(object_class.__qualname__)
+            definition.add_size(len(names))
+            for name in names:
+                definition.add_string(name)
+            self.add_size(len(definition.buffer))
+            self.buffer += definition.buffer
+
+        self.objects[id(obj)] = len(self.serialized)
+        self.serialized.append(obj)
+
+        self.buffer.append(_FROZEN_OBJECT if frozen else _OBJECT)
+        self.add_size(class_index)
+        for name in names:
+            self.add(getattr(obj, name, None))
+
+
+class _Reader:
+    """
+    Decodes an object tree
+    """
+
+    def __init__(self, data, buffers: Optional[list]):
+        self.data = memoryview(data)
+        self.buffers = buffers
+        magic, version = _HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError('Not a serialized object tree')
+        if version != FORMAT_VERSION:
+            raise ValueError('Unsupported serialization format version {}'.format(version))
+        self.offset = _HEADER.size
+        self.classes = []
+        self.objects = []
+
+    def read_size(self) -> int:
+        """
+        Decodes a variable length unsigned integer
+        """
+        res = 0
+        shift = 0
+        while True:
+            byte = self.data[self.offset]
+            self.offset += 1
+            res |= (byte & 0x7f) << shift
+            if byte < 0x80:
+                return res
+            shift += 7
+
+    def read_view(self, length: int) -> memoryview:
+        """
+        Returns a view of the next length bytes
+        """
+        if self.offset + length > len(self.data):
+            raise ValueError('Truncated serialized object tree')
+        res = self.data[self.offset:self.offset + length]
+        self.offset += length
+        return res
+
+    def read_string(self) -> str:
+        """
+        Decodes an untagged string
+        """
+        return str(self.read_view(self.read_size()), 'utf-8')
+
+    def read_struct(self, fmt: Struct):
+        """
+        Decodes a single value from a struct
+        """
+        res = fmt.unpack_from(self.data, self.offset)[0]
+        self.offset += fmt.size
+        return res
+
+    def read(self):  # pylint: disable=too-many-return-statements,too-many-branches
+        """
+        Decodes a tagged value
+        """
+        data = self.data
+        tag = data[self.offset]
+        self.offset += 1
+        # most frequent tags first
+        if tag == _FLOAT:
+            return self.read_struct(_DOUBLE)
+        if tag == _INT8_VALUE:
+            return self.read_struct(_INT8)
+        if tag == _NONE:
+            return None
+        if tag == _TRUE:
+            return True
+        if tag == _FALSE:
+            return False
+        if tag == _STRING:
+            return self.read_string()
+        if tag == _OBJECT:
+            return self.read_object(False)
+        if tag == _REFERENCE:
+            return self.objects[self.read_size()]
+        if tag in (_LIST, _TUPLE):
+            count = self.read_size()
+            items = [self.read() for _ in range(count)]
+            return items if tag == _LIST else tuple(items)
+        if tag == _CLASS:
+            self.read_class()
+            return self.read()
+        if tag == _FROZEN_OBJECT:
+            return self.read_object(True)
+        if tag == _INT32_VALUE:
+            return self.read_struct(_INT32)
+        if tag == _INT64_VALUE:
+            return self.read_struct(_INT64)
+        if tag == _BIG_INT:
+            return int(self.read_string())
+        if tag == _DOUBLE_ARRAY:
+            count = self.read_size()
+            values = Struct('<{}d'.format(count)).unpack_from(data, self.offset)
+            self.offset += count * 8
+            return array('d', values)
+        if tag == _BYTES:
+            # a view of the serialized data, which pictures only copy when their content is requested
+            return self.read_view(self.read_size())
+        if tag == _BUFFER:
+            if self.buffers is None:
+                raise ValueError('Serialized object tree requires out-of-band buffers')
+            return memoryview(self.buffers[self.read_size()])
+        raise ValueError('Unknown tag {} at {}'.format(tag, self.offset - 1))
+
+    def read_class(self):
+        """
+        Decodes a class definition. Definitions are cached, so that each class is only
+        resolved once per process.
+        """
+        length = self.read_size()
+        start = self.offset
+        definition = bytes(self.read_view(length))
+        layout = _CLASS_LAYOUTS.get(definition)
+        if layout is None:
+            self.offset = start
+            module = self.read_string()
+            name = self.read_string()
+            attribute_count = self.read_size()
+            attributes = [self.read_string() for _ in range(attribute_count)]
+
+            # only slyr object classes may be instantiated
+            if module != 'slyr' and not module.startswith('slyr.'):
+                raise ValueError('Cannot deserialize class {}.{}'.format(module, name))
+            object_class = getattr(importlib.import_module(module), name, None)
+            if not isinstance(object_class, type) or not issubclass(object_class, Object):
+                raise ValueError('Cannot deserialize class {}.{}'.format(module, name))
+
+            # attributes which no longer exist are skipped. If the class has gained attributes
+            # since serialization, objects are constructed normally so that they take default values
+            known = attribute_names(object_class)
+            complete = set(known).issubset(attributes)
+            layout = (object_class, tuple(a if a in known else None for a in attributes), complete)
+            _CLASS_LAYOUTS[definition] = layout
+            self.offset = start + length
+        self.classes.append(layout)
+
+    def read_object(self, frozen: bool) -> Object:
+        """
+        Decodes an object
+        """
+        object_class, attributes, complete = self.classes[self.read_size()]
+        obj = object_class.__new__(object_class) if complete else object_class()
+        self.objects.append(obj)
+        for name in attributes:
+            value = self.read()
+            if name is not None:
+                setattr(obj, name, value)
+        if frozen:
+            freeze(obj)
+        return obj
+
+
+def dumps(obj: Object, buffers: Optional[list] = None) -> bin:
+    """
+    Serializes an object tree to a compact binary representation.
+
+    Class layouts are stored once per class, and objects which are referenced more
+    than once (e.g. interned colors) are stored once and shared again when loaded.
+    :param obj: object to serialize
+    :param buffers: optional list. If set, binary values such as picture content are
+    appended to the list as out-of-band buffers instead of being copied into the
+    result, and the same list must be passed to loads().
+    """
+    writer = _Writer(buffers)
+    writer.add(obj)
+    return bytes(writer.buffer)
+
+
+def loads(data, buffers: Optional[List] = None) -> Object:
+    """
+    Deserializes an object tree created by dumps(). Binary values (such as picture
+    content) are views of data or the out-of-band buffers, and are not copied.
+    :param data: serialized data, as a bytes-like object
+    :param buffers: list of out-of-band buffers, if passed to dumps()
+    """
+    return _Reader(data, buffers).read()
@@ -3,13 +3,127 @@
 Binary stream representing persistent objects
 """
 
-from struct import unpack, error
+from struct import Struct, error
 import binascii
+import mmap
 from typing import Optional
 from slyr.parser.object_registry import ObjectRegistry, REGISTRY
 from slyr.parser.object import Object
-from slyr.parser.exceptions import UnsupportedVersionException, UnreadableSymbolException
+from slyr.parser.exceptions import (UnsupportedVersionException,
+                                    UnreadableSymbolException,
+                                    TruncatedStreamException,
+                                    ParseLimitException)
 from slyr.parser.objects.picture import Picture
+from slyr.parser.trace import TraceEvent, Tracer, PrintTracer
+
+UCHAR = Struct('<B')
+USHORT = Struct('<H')
+# note that read_int() reads unsigned values, and read_ulong() signed values
+UINT = Struct('<I')
+LONG = Struct('<l')
+DOUBLE = Struct('<d')
+
+# the standard layer terminator
+TERMINATOR = b'\x0d' + bytes(7)
+
+_STRUCT_CACHE = {}
+
+
+def compiled_struct(fmt: str) -> Struct:
+    """
+    Returns a cached, precompiled Struct for the given format string.
+    Formats are little-endian unless they explicitly specify otherwise.
+    """
+    try:
+        return _STRUCT_CACHE[fmt]
+    except KeyError:
+        pass
+    compiled = Struct(fmt if fmt[:1] in '<>!=@' else '<' + fmt)
+    _STRUCT_CACHE[fmt] = compiled
+    return compiled
+
+
+class ParseLimits:
+    """
+    Resource limits for parsing, which protect against corrupt or hostile blobs.
+
+    Lengths and counts read from blobs are checked against these limits before
+    any memory is allocated for them, and a ParseLimitException is raised if a
+    limit is exceeded. E.g.
+
+        stream = BufferStream(blob)
+        stream.limits = ParseLimits(max_allocation=1024 * 1024)
+    """
+
+    def __init__(self, max_allocation: int = 64 * 1024 * 1024, max_depth: int = 64, max_objects: int = 100000):
+        """
+        Constructor for ParseLimits
+        :param max_allocation: maximum size in bytes of any single variable length
+        value, such as a string, embedded picture or array
+        :param max_depth: maximum nesting depth of objects
+        :param max_objects: maximum number of objects read from a stream. BufferStreams
+        reset the count whenever they are repointed at a new blob.
+        """
+        self.max_allocation = max_allocation
+        self.max_depth = max_depth
+        self.max_objects = max_objects
+
+
+# limits used by streams unless otherwise specified
+DEFAULT_LIMITS = ParseLimits()
+
+
+class RetainedFields:
+    """
+    The raw values of fields which are skipped or only lossily decoded when objects
+    are read (such as padding, unknown values and CIELAB colors), along with the
+    version each object was read from.
+
+    Retaining these values allows parsed objects to be written back to a
+    byte-identical blob with a WriterStream, e.g.
+
+        retained = RetainedFields()
+        stream = BufferStream(blob)
+        stream.retained = retained
+        symbol = stream.read_object()
+
+        writer = WriterStream(retained)
+        writer.write_object(symbol)
+        assert writer.getvalue() == blob
+
+    Values are kept in a table alongside the objects, so objects read without
+    retention carry no extra memory. The table keeps its objects alive.
+    """
+
+    def __init__(self):
+        self._objects = {}
+
+    def __len__(self):
+        return len(self._objects)
+
+    def clear(self):
+        """
+        Removes all objects from the table
+        """
+        self._objects.clear()
+
+    def add(self, obj: Object, version: int) -> list:
+        """
+        Adds an object to the table, returning the list to append its retained values to
+        """
+        values = []
+        self._objects[id(obj)] = (obj, version, values)
+        return values
+
+    def get(self, obj: Object) -> Optional[tuple]:
+        """
+        Returns the version and list of retained values for an object, or None if
+        the object was not read with this table
+        """
+        entry = self._objects.get(id(obj))
+        if entry is None or entry[0] is not obj:
+            return None
+        return entry[1], entry[2]
 
 
 class Stream:
@@ -17,16 +131,70 @@ class Stream:
     An input stream for object parsing
     """
 
-    def __init__(self, io_stream, debug: bool = False):
+    def __init__(self, io_stream, debug: bool = False, tracer: Optional[Tracer] = None,
+                 registry: Optional[ObjectRegistry] = None):
         """
         Constructor for Streams
         :param io_stream: input stream, usually a file handle
-        :param debug: true if debugging output should be created during object read
+        :param debug: true if debugging output should be printed during object read
+        :param tracer: optional tracer to receive structured parse events. If debug is
+        set and no tracer is specified, events will be printed to the console.
+        :param registry: registry used to create objects. Defaults to the REGISTRY singleton.
         """
         self._io_stream = io_stream
-        self.debug = debug
+        self.registry = registry if registry is not None else REGISTRY
+        # optional InternTable, used to share instances of repeated leaf objects
+        self.intern_table = None
+        # optional RetainedFields, used to keep skipped values for writing objects back
+        self.retained = None
+        self._retaining = []
+        # resource limits, checked before reading lengths and counts from the stream
+        self.limits = DEFAULT_LIMITS
+        self.object_count = 0
+        self.tracer = tracer if tracer is not None or not debug else PrintTracer()
+        # console tracer created for debug output, which is removed when debug is disabled
+        self._debug_tracer = self.tracer if tracer is None else None
         self.debug_depth = 0
 
+    @property
+    def debug(self) -> bool:
+        """
+        Returns True if parse events are being traced
+        """
+        return self.tracer is not None
+
+    @debug.setter
+    def debug(self, debug: bool):
+        """
+        Sets whether parse events should be printed to the console. Disabling debug
+        output only removes the console tracer, so tracers attached by the caller are kept.
+        """
+        if not debug:
+            if self.tracer is not None and self.tracer is self._debug_tracer:
+                self.tracer = None
+            self._debug_tracer = None
+        elif self.tracer is None:
+            self.tracer = self._debug_tracer = PrintTracer()
+
+    @staticmethod
+    def from_path(path: str, debug: bool = False, tracer: Optional[Tracer] = None,
+                  registry: Optional[ObjectRegistry] = None) -> 'BufferStream':
+        """
+        Creates a stream which parses directly over a read-only memory mapping
+        of the file at path, so that the file content is never copied into
+        memory. The stream should be closed when no longer required, e.g.
+
+            with Stream.from_path('symbol.bin') as stream:
+                symbol = stream.read_object()
+        """
+        with open(path, 'rb') as f:
+            try:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # empty files cannot be mapped
+                mapping = b''
+        return BufferStream(mapping, debug, tracer, registry)
+
     def tell(self) -> int:
         """
         Returns the current position within the stream.
@@ -38,8 +206,27 @@ class Stream:
         Reads the from the stream for the given length and returns
         the binary result.
         """
+        if length < 0:
+            raise UnreadableSymbolException('Negative read length {} at {}'.format(length, hex(self.tell())))
         return self._io_stream.read(length)
 
+    def read_view(self, length: int):
+        """
+        Reads from the stream for the given length, returning an object supporting
+        the buffer protocol. Streams over in-memory buffers return a memoryview
+        slice of the buffer instead of copying the content.
+        """
+        return self.read(length)
+
+    def peek(self, length: int):
+        """
+        Returns up to length bytes from the current position, without advancing the stream
+        """
+        start = self.tell()
+        res = self.read_view(length)
+        self.seek(start)
+        return res
+
     def seek(self, offset: int):
         """
         Seeks for the given offset.
@@ -52,21 +239,100 @@ class Stream:
         """
         self._io_stream.seek(self._io_stream.tell() - length)
 
-    def log(self, message: str, offset: int = 0):
+    def skip(self, length: int):
+        """
+        Advances the stream by the given length
+        """
+        if length < 0:
+            raise UnreadableSymbolException('Negative skip length {} at {}'.format(length, hex(self.tell())))
+        self.seek(self.tell() + length)
+
+    def retain(self, back: int, size: Optional[int] = None):
+        """
+        Retains the raw bytes of a field which was skipped or lossily decoded, so
+        that it can be reproduced when the object currently being read is written.
+        The field starts back bytes before the current position, and is size bytes
+        long (by default, the field ends at the current position).
+
+        Does nothing unless the stream has a RetainedFields table.
+        """
+        if self.retained is None or not self._retaining:
+            return
+        end = self.tell()
+        self.seek(end - back)
+        value = self.read(back if size is None else size)
+        self.seek(end)
+        self._retaining[-1].append(value)
+
+    def retain_value(self, value):
+        """
+        Retains a decoded value (such as an unused child object) which was read but
+        not stored, so that it can be reproduced when the object currently being read
+        is written.
+
+        Does nothing unless the stream has a RetainedFields table.
+        """
+        if self.retained is not None and self._retaining:
+            self._retaining[-1].append(value)
+
+    def check_allocation(self, size: int, debug_string: str = ''):
+        """
+        Checks that a variable length value of size bytes may be read, raising a
+        ParseLimitException if it exceeds the stream's limits. Must be called before
+        reading values whose length is read from the stream. Negative sizes (from
+        corrupt signed lengths) raise an UnreadableSymbolException.
+        """
+        if size < 0:
+            raise UnreadableSymbolException('{} has negative length {} at {}'.format(
+                debug_string or 'Value', size, hex(self.tell())))
+        if size > self.limits.max_allocation:
+            message = '{} of {} bytes at {} exceeds the maximum allocation of {} bytes'.format(
+                debug_string or 'Value', size, hex(self.tell()), self.limits.max_allocation)
+            raise ParseLimitException(message, 'max_allocation', size)
+
+    def check_object_count(self, count: int, debug_string: str = ''):
         """
-        Logs a debug message
+        Checks that count further objects may be read, raising a ParseLimitException
+        if this exceeds the stream's limits. Should be called before reading an
+        array of objects whose length is read from the stream.
         """
-        if self.debug:
-            print('{}{} at {}'.format('   ' * self.debug_depth, message, hex(self._io_stream.tell() - offset)))
+        if self.object_count + count > self.limits.max_objects:
+            message = '{} {} at {} exceeds the maximum of {} objects'.format(
+                count, debug_string or 'objects', hex(self.tell()), self.limits.max_objects)
+            raise ParseLimitException(message, 'max_objects', self.object_count + count)
+
+    def _unpack(self, fmt: Struct) -> tuple:
+        """
+        Reads and unpacks a precompiled struct from the stream
+        """
+        return fmt.unpack(self._io_stream.read(fmt.size))
+
+    def trace(self, kind: str, template: str, args: tuple = (), size: int = 0, value=None):  # pylint: disable=too-many-arguments
+        """
+        Emits a structured parse event to the attached tracer. The event covers
+        the size bytes preceding the current stream position.
+
+        Callers should check that a tracer is attached before calling this, to
+        avoid the overhead of building events which will be thrown away.
+        """
+        self.tracer.event(TraceEvent(kind, template, args, self.tell() - size, size, value, self.debug_depth))
+
+    def log(self, message: str, *args, offset: int = 0):
+        """
+        Logs a debug message. The message is only formatted (using args) if a tracer
+        is attached.
+        """
+        if self.tracer is not None:
+            self.trace(TraceEvent.MESSAGE, message, args, offset)
 
     def read_uchar(self, debug_string: str = '') -> int:
         """
         Reads a uchar from the stream.
         :return:
         """
-        res = unpack("<B", self._io_stream.read(1))[0]
-        if debug_string:
-            self.log('read uchar {} of {}'.format(debug_string, res), 1)
+        res = self._unpack(UCHAR)[0]
+        if self.tracer is not None:
+            self.trace(TraceEvent.UCHAR, debug_string, (), 1, res)
         return res
 
     def read_double(self, debug_string: str = '') -> float:
@@ -74,9 +340,9 @@ class Stream:
         Reads a double from the stream.
         :return:
         """
-        res = unpack("<d", self._io_stream.read(8))[0]
-        if debug_string:
-            self.log('read double {} of {}'.format(debug_string, res), 8)
+        res = self._unpack(DOUBLE)[0]
+        if self.tracer is not None:
+            self.trace(TraceEvent.DOUBLE, debug_string, (), 8, res)
         return res
 
     def read_int(self, debug_string: str = '') -> int:
@@ -85,12 +351,12 @@ class Stream:
         :return:
         """
         try:
-            res = unpack("<L", self._io_stream.read(4))[0]
-        except error:  # struct.error
-            raise UnreadableSymbolException('Truncated integer')
+            res = self._unpack(UINT)[0]
+        except error as e:  # struct.error
+            raise UnreadableSymbolException('Truncated integer') from e
 
-        if debug_string:
-            self.log('read int {} of {}'.format(debug_string, res), 4)
+        if self.tracer is not None:
+            self.trace(TraceEvent.INT, debug_string, (), 4, res)
         return res
 
     def read_uint(self, debug_string: str = '') -> int:
@@ -98,9 +364,9 @@ class Stream:
         Reads an uint from the stream.
         :return:
         """
-        res = unpack("<I", self._io_stream.read(4))[0]
-        if debug_string:
-            self.log('read uint {} of {}'.format(debug_string, res), 4)
+        res = self._unpack(UINT)[0]
+        if self.tracer is not None:
+            self.trace(TraceEvent.UINT, debug_string, (), 4, res)
         return res
 
     def read_ulong(self, debug_string: str = '') -> int:
@@ -108,9 +374,9 @@ class Stream:
         Reads an ulong from the stream.
         :return:
         """
-        res = unpack("<l", self._io_stream.read(4))[0]
-        if debug_string:
-            self.log('read ulong {} of {}'.format(debug_string, res), 4)
+        res = self._unpack(LONG)[0]
+        if self.tracer is not None:
+            self.trace(TraceEvent.ULONG, debug_string, (), 4, res)
         return res
 
     def read_ushort(self, debug_string: str = '') -> int:
@@ -118,21 +384,58 @@ class Stream:
         Reads an unsigned short from the stream.
         :return:
         """
-        res = unpack("<H", self._io_stream.read(2))[0]
-        if debug_string:
-            self.log('read ushort {} of {}'.format(debug_string, res), 2)
+        res = self._unpack(USHORT)[0]
+        if self.tracer is not None:
+            self.trace(TraceEvent.USHORT, debug_string, (), 2, res)
+        return res
+
+    def read_struct(self, fmt: str, debug_string: str = '') -> tuple:
+        """
+        Reads a run of fields described by a struct format string in a single call,
+        e.g. read_struct('dLd') for a double, an int and another double.
+        :return: tuple of unpacked values
+        """
+        compiled = compiled_struct(fmt)
+        try:
+            res = self._unpack(compiled)
+        except error as e:  # struct.error
+            raise UnreadableSymbolException('Truncated {}'.format(debug_string or 'struct')) from e
+        if self.tracer is not None:
+            self.trace(TraceEvent.STRUCT, debug_string, (), compiled.size, res)
         return res
 
-    def read_guid(self, debug_string: str = '') -> str:
+    def read_doubles(self, count: int, debug_string: str = '') -> tuple:
+        """
+        Reads a run of count doubles from the stream.
+        :return: tuple of doubles
+        """
+        return self.read_struct('{}d'.format(count), debug_string)
+
+    def read_double_pairs(self, count: int, debug_string: str = '') -> list:
+        """
+        Reads a run of count pairs of doubles from the stream.
+        :return: list of (double, double) tuples
+        """
+        values = self.read_struct('{}d'.format(count * 2), debug_string)
+        return list(zip(values[0::2], values[1::2]))
+
+    def read_guid(self, debug_string: str = '', debug_args: tuple = ()) -> str:
         """
         Reads a GUID from the stream
         """
-        guid_bin = binascii.hexlify(self._io_stream.read(16))
+        return ObjectRegistry.bytes_to_guid(self.read_clsid(debug_string, debug_args))
 
-        guid = ObjectRegistry.hex_to_guid(guid_bin)
-        if guid != '00000000-0000-0000-0000-000000000000':
-            self.log('Found {} guid of {}'.format(debug_string, guid), 16)
-        return guid
+    def read_clsid(self, debug_string: str = '', debug_args: tuple = ()) -> bin:
+        """
+        Reads a GUID from the stream, returning the raw 16 byte CLSID. The string
+        form of the GUID is only created if the stream is being traced.
+        """
+        clsid = self.read(16)
+        if len(clsid) != 16:
+            raise TruncatedStreamException('Truncated GUID', self.tell() + 16 - len(clsid))
+        if self.tracer is not None and clsid != ObjectRegistry.NULL_CLSID:
+            self.trace(TraceEvent.GUID, debug_string, debug_args, 16, ObjectRegistry.bytes_to_guid(clsid))
+        return clsid
 
     def read_string(self, debug_string: str = '') -> str:
         """
@@ -142,73 +445,550 @@ class Stream:
         a four-byte unsigned integer, and then writes that many characters
         to the stream'
         """
-        if debug_string:
-            self.log('start {}'.format(debug_string))
-
-        length = unpack("<I", self._io_stream.read(4))[0]
-        self.log('string of length {}'.format(int(length / 2 - 1)), 4)
-        buffer = self._io_stream.read(length - 2)
-        string = buffer.decode('utf-16')
-        terminator = binascii.hexlify(self._io_stream.read(2))
-        assert terminator == b'0000'
-        self.log('found string "{}"'.format(string))
+        length = self._unpack(UINT)[0]
+        if length < 2:
+            raise UnreadableSymbolException('Invalid string length {} at {}'.format(length, hex(self.tell() - 4)))
+        self.check_allocation(length, debug_string or 'string')
+        buffer = self.read(length - 2)
+        try:
+            string = buffer.decode('utf-16')
+        except UnicodeDecodeError as e:
+            raise UnreadableSymbolException('Invalid string at {}'.format(hex(self.tell() - length + 2))) from e
+        terminator = self.read(2)
+        if terminator != b'\x00\x00':
+            raise UnreadableSymbolException('Expected string terminator at {}, got {}'.format(
+                hex(self.tell() - 2), binascii.hexlify(terminator)))
+        if self.tracer is not None:
+            self.trace(TraceEvent.STRING, debug_string, (), length + 4, string)
         return string
 
-    def read_object(self, debug_string: str = '') -> Optional[Object]:
+    def read_version(self, obj) -> int:
         """
-        Creates and reads a new object from the stream
+        Reads the version of a persistent object (or object class) from the stream, raising an
+        UnsupportedVersionException if the version is not compatible with the object.
+        Objects without versioning are always treated as version 1.
         """
-        guid = self.read_guid(debug_string)
-        res = REGISTRY.create_object(guid)
-        if res is not None:
-            self.log('** {} **'.format(res.__class__.__name__), 16)
-        else:
-            self.log('{} not found'.format(debug_string), 16)
+        compatible_versions = obj.compatible_versions()
+        if compatible_versions is None:
+            return 1
+
+        version = self._unpack(USHORT)[0]
+        if self.tracer is not None:
+            self.trace(TraceEvent.VERSION, 'version', (), 2, version)
+        if version not in compatible_versions:
+            supported_versions = ','.join([str(v) for v in compatible_versions])
+            raise UnsupportedVersionException(
+                'Cannot read {} version {}, only support version(s): {}'.format(
+                    obj.__name__ if isinstance(obj, type) else obj.__class__.__name__, version, supported_versions))
+        return version
+
+    def read_object(self, debug_string: str = '', debug_args: tuple = ()) -> Optional[Object]:
+        """
+        Creates and reads a new object from the stream.
+
+        The debug_string is treated as a template, which is formatted using debug_args
+        only when the stream is being traced.
+        """
+        clsid = self.read_clsid(debug_string, debug_args)
+        object_class = self.registry.class_from_clsid(clsid)
+
+        intern_key = None
+        # interned objects are not decoded, so cannot be traced
+        if self.intern_table is not None and self.tracer is None and object_class is not None:
+            intern_key = self.intern_table.key(self, clsid, object_class)
+            if intern_key is not None:
+                interned = self.intern_table.get(intern_key)
+                if interned is not None:
+                    self.seek(self.tell() + len(intern_key) - 16)
+                    return interned
+
+        res = object_class() if object_class is not None else None
+        if self.tracer is not None:
+            self.trace(TraceEvent.OBJECT_START, debug_string, debug_args, 16, res)
 
         if res is not None:
+            self.object_count += 1
+            if self.object_count > self.limits.max_objects:
+                raise ParseLimitException('Object at {} exceeds the maximum of {} objects'.format(
+                    hex(self.tell() - 16), self.limits.max_objects), 'max_objects', self.object_count)
+            if self.debug_depth >= self.limits.max_depth:
+                raise ParseLimitException('Object at {} exceeds the maximum nesting depth of {}'.format(
+                    hex(self.tell() - 16), self.limits.max_depth), 'max_depth', self.debug_depth + 1)
             self.debug_depth += 1
+            try:
+                version = self.read_version(res)
+                if self.retained is not None:
+                    self._retaining.append(self.retained.add(res, version))
+                    try:
+                        res.read(self, version)
+                    finally:
+                        self._retaining.pop()
+                else:
+                    res.read(self, version)
+                if self.tracer is not None:
+                    self.trace(TraceEvent.OBJECT_END, debug_string, debug_args, 0, res)
+            finally:
+                self.debug_depth -= 1
 
-            version = 1
-            compatible_versions = res.compatible_versions()
-            if compatible_versions is not None:
-                version = self.read_ushort('version')
-                if version not in res.compatible_versions():
-                    supported_versions = ','.join([str(v) for v in res.compatible_versions()])
-                    raise UnsupportedVersionException(
-                        'Cannot read {} version {}, only support version(s): {}'.format(
-                            res.__class__.__name__, version, supported_versions))
-
-            res.read(self, version)
-            self.log('ended {}'.format(res.__class__.__name__))
-            if self.debug:
-                print('')
-            self.debug_depth -= 1
+            if intern_key is not None:
+                res = self.intern_table.add(intern_key, res)
 
         return res
 
+    def read_lazy_object(self, debug_string: str = '', debug_args: tuple = ()) -> Optional[Object]:
+        """
+        Reads an object which may be decoded lazily. Streams which don't support
+        lazy decoding read the object immediately, see BufferStream.lazy.
+        """
+        return self.read_object(debug_string, debug_args)
+
+    def skip_object(self):
+        """
+        Advances the stream past an object without decoding it, returning the
+        object's class (or None for null objects)
+        """
+        clsid = self.read_clsid()
+        object_class = self.registry.class_from_clsid(clsid)
+        if object_class is None:
+            return None
+
+        self.object_count += 1
+        if self.object_count > self.limits.max_objects:
+            raise ParseLimitException('Object at {} exceeds the maximum of {} objects'.format(
+                hex(self.tell() - 16), self.limits.max_objects), 'max_objects', self.object_count)
+
+        # objects which can be interned have a known size
+        size = object_class.intern_size(self)
+        if size is not None:
+            self.skip(size)
+            return object_class
+
+        if self.debug_depth >= self.limits.max_depth:
+            raise ParseLimitException('Object at {} exceeds the maximum nesting depth of {}'.format(
+                hex(self.tell() - 16), self.limits.max_depth), 'max_depth', self.debug_depth + 1)
+        self.debug_depth += 1
+        try:
+            object_class.skip(self, self.read_version(object_class))
+        finally:
+            self.debug_depth -= 1
+        return object_class
+
+    def skip_string(self):
+        """
+        Advances the stream past a string without decoding it
+        """
+        self.skip(self._unpack(UINT)[0])
+
     def read_0d_terminator(self) -> bool:
         """
         Tries the read the standard 0d00000000000000 layer terminator,
         and returns True if it's found.
         """
         check = binascii.hexlify(self.read(8))
+        if self.retained is not None:
+            self.retain(8)
         return check[:8] == b'0d000000'
 
     def read_embedded_file(self, debug_string: str = '') -> bin:
         """
-        Reads an embedded file stored within the stream.
+        Reads an embedded file stored within the stream. For streams over
+        in-memory buffers the content is returned as a memoryview slice.
         """
         embedded_file_length = self.read_int('binary length')
-        self.log('Found embedded file {} of length {}'.format(debug_string, embedded_file_length))
+        self.check_allocation(embedded_file_length, debug_string or 'embedded file')
         try:
-            return self.read(embedded_file_length)
-        except error:  # struct.error
-            raise UnreadableSymbolException('Truncated file binary')
+            content = self.read_view(embedded_file_length)
+        except error as e:  # struct.error
+            raise UnreadableSymbolException('Truncated file binary') from e
+        if self.tracer is not None:
+            self.trace(TraceEvent.BINARY, debug_string, (), embedded_file_length, embedded_file_length)
+        return content
 
     def read_picture(self, debug_string: str = '') -> Picture:
         """
         Reads an embedded picture from the stream and returns it
         """
-        self.log('Reading picture {}'.format(debug_string))
+        self.log('Reading picture {}', debug_string)
         pic = Picture.create_from_stream(self)
         return pic
+
+    def read_lazy_picture(self, debug_string: str = '') -> Picture:
+        """
+        Reads an embedded picture which may be decoded lazily. Streams which don't
+        support lazy decoding read the picture immediately, see BufferStream.lazy.
+        """
+        return self.read_picture(debug_string)
+
+    def skip_picture(self):
+        """
+        Advances the stream past an embedded picture without decoding it, returning
+        the picture's class
+        """
+        return Picture.skip_from_stream(self)
+
+
+class BufferStream(Stream):
+    """
+    An input stream which parses directly over an in-memory buffer (bytes,
+    bytearray, memoryview or mmap), tracking the current position as a plain
+    integer offset.
+
+    Primitive values are decoded in place with struct.unpack_from, so no
+    intermediate bytes objects are created for individual fields.
+    """
+
+    def __init__(self, buffer, debug: bool = False, tracer: Optional[Tracer] = None,
+                 registry: Optional[ObjectRegistry] = None):
+        """
+        Constructor for BufferStreams
+        :param buffer: object supporting the buffer protocol, e.g. a symbol blob
+        :param debug: true if debugging output should be printed during object read
+        :param tracer: optional tracer to receive structured parse events
+        :param registry: registry used to create objects. Defaults to the REGISTRY singleton.
+        """
+        super().__init__(None, debug, tracer, registry)
+        # if True, heavy child objects are skipped and only decoded when first accessed
+        self.lazy = False
+        self._source = buffer
+        self._buffer = memoryview(buffer)
+        self._length = len(self._buffer)
+        self._offset = 0
+
+    def reset(self, buffer):
+        """
+        Repoints the stream at a new buffer, allowing a single stream to be reused
+        for parsing many blobs
+        """
+        self._source = buffer
+        self._buffer = memoryview(buffer)
+        self._length = len(self._buffer)
+        self._offset = 0
+        self.debug_depth = 0
+        self._retaining = []
+        self.object_count = 0
+
+    def tell(self) -> int:
+        return self._offset
+
+    def read(self, length: int) -> bin:
+        if length < 0:
+            raise UnreadableSymbolException('Negative read length {} at {}'.format(length, hex(self._offset)))
+        start = self._offset
+        end = min(start + length, self._length)
+        self._offset = end
+        return self._buffer[start:end].tobytes()
+
+    def read_view(self, length: int) -> memoryview:
+        if length < 0:
+            raise UnreadableSymbolException('Negative read length {} at {}'.format(length, hex(self._offset)))
+        start = self._offset
+        end = min(start + length, self._length)
+        self._offset = end
+        return self._buffer[start:end]
+
+    def seek(self, offset: int):
+        self._offset = offset
+
+    def rewind(self, length):
+        self._offset -= length
+
+    def skip(self, length: int):
+        if length < 0:
+            raise UnreadableSymbolException('Negative skip length {} at {}'.format(length, hex(self._offset)))
+        end = self._offset + length
+        if end > self._length:
+            raise TruncatedStreamException('Truncated stream at {}'.format(hex(self._offset)), end)
+        self._offset = end
+
+    def read_lazy_object(self, debug_string: str = '', debug_args: tuple = ()) -> Optional[Object]:
+        """
+        Reads an object which may be decoded lazily.
+
+        If the stream is lazy, the object is skipped and a LazyObject handle is returned
+        instead, which is decoded when the attribute holding it is first accessed (see
+        LazyAttribute). Objects are always read immediately by traced streams or streams
+        retaining fields for writing.
+        """
+        if not self.lazy or self.tracer is not None or self.retained is not None:
+            return self.read_object(debug_string, debug_args)
+        start = self._offset
+        object_class = self.skip_object()
+        if object_class is None:
+            return None
+        return LazyObject(self, start, self._offset - start, object_class)
+
+    def read_lazy_picture(self, debug_string: str = '') -> Picture:
+        """
+        Reads an embedded picture which may be decoded lazily. See read_lazy_object().
+        """
+        if not self.lazy or self.tracer is not None or self.retained is not None:
+            return self.read_picture(debug_string)
+        start = self._offset
+        picture_class = self.skip_picture()
+        return LazyObject(self, start, self._offset - start, picture_class, picture=True)
+
+    def _unpack(self, fmt: Struct) -> tuple:
+        try:
+            res = fmt.unpack_from(self._buffer, self._offset)
+        except error as e:  # struct.error
+            raise TruncatedStreamException('Truncated stream at {}'.format(hex(self._offset)),
+                                           self._offset + fmt.size) from e
+        self._offset += fmt.size
+        return res
+
+    def close(self):
+        """
+        Releases the underlying buffer, closing it if it is a memory mapping.
+
+        Views returned by read_view() (e.g. embedded pictures) which are still alive keep
+        the mapping open until they are garbage collected.
+        """
+        self._buffer.release()
+        if isinstance(self._source, mmap.mmap):
+            try:
+                self._source.close()
+            except BufferError:
+                # views into the mapping are still exported
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class LazyObject:
+    """
+    A handle to an object which was skipped by a lazy BufferStream, consisting of the
+    object's class and its location within the stream. The object is decoded from a
+    view of the stream's buffer when the handle is loaded.
+    """
+
+    __slots__ = ('offset', 'length', 'object_class', 'picture', '_view', '_registry', '_limits', '_intern_table')
+
+    LAZY = True
+
+    def __init__(self, stream: BufferStream, offset: int, length: int, object_class,  # pylint: disable=too-many-arguments
+                 picture: bool = False):
+        """
+        Constructor for LazyObject
+        :param stream: stream the object was skipped in
+        :param offset: offset of the object within the stream
+        :param length: length of the object in bytes
+        :param object_class: class of the object
+        :param picture: True if the object is an embedded picture, rather than a persistent object
+        """
+        self.offset = offset
+        self.length = length
+        self.object_class = object_class
+        self.picture = picture
+        self._view = stream._buffer[offset:offset + length]  # pylint: disable=protected-access
+        self._registry = stream.registry
+        self._limits = stream.limits
+        self._intern_table = stream.intern_table
+
+    def __repr__(self):
+        return '<LazyObject {} at {} ({} bytes)>'.format(self.object_class.__name__, hex(self.offset), self.length)
+
+    @property
+    def guid(self) -> str:
+        """
+        Returns the GUID of the object's class
+        """
+        return self.object_class.guid()
+
+    def load(self) -> Object:
+        """
+        Decodes and returns the object. Child objects of the object are also decoded lazily.
+        """
+        stream = BufferStream(self._view, registry=self._registry)
+        stream.limits = self._limits
+        stream.intern_table = self._intern_table
+        stream.lazy = True
+        return stream.read_picture() if self.picture else stream.read_object()
+
+
+class WriterStream:
+    """
+    An output stream for writing objects back to their binary form, e.g.
+
+        stream = WriterStream()
+        stream.write_object(symbol)
+        blob = stream.getvalue()
+
+    Objects are written at the version they were read from and with the values of
+    any skipped fields if they were read with a RetainedFields table, which makes
+    the written blob byte-identical to the original. Otherwise objects are written
+    at their newest compatible version, with skipped fields set to defaults.
+    """
+
+    def __init__(self, retained: Optional[RetainedFields] = None):
+        """
+        Constructor for WriterStream
+        :param retained: optional table of fields retained while reading objects
+        """
+        self._buffer = bytearray()
+        self.retained = retained
+        # retained values and the index of the next value, for each object being written
+        self._writing = []
+
+    def tell(self) -> int:
+        """
+        Returns the current position within the stream
+        """
+        return len(self._buffer)
+
+    def getvalue(self) -> bin:
+        """
+        Returns the content written to the stream
+        """
+        return bytes(self._buffer)
+
+    def write(self, content: bin):
+        """
+        Writes binary content to the stream
+        """
+        self._buffer += content
+
+    def write_uchar(self, value: int):
+        """
+        Writes a uchar to the stream
+        """
+        self._buffer += UCHAR.pack(value)
+
+    def write_double(self, value: float):
+        """
+        Writes a double to the stream
+        """
+        self._buffer += DOUBLE.pack(value)
+
+    def write_int(self, value: int):
+        """
+        Writes an int to the stream
+        """
+        self._buffer += UINT.pack(value)
+
+    def write_uint(self, value: int):
+        """
+        Writes an uint to the stream
+        """
+        self._buffer += UINT.pack(value)
+
+    def write_ulong(self, value: int):
+        """
+        Writes an ulong to the stream
+        """
+        self._buffer += LONG.pack(value)
+
+    def write_ushort(self, value: int):
+        """
+        Writes an unsigned short to the stream
+        """
+        self._buffer += USHORT.pack(value)
+
+    def write_struct(self, fmt: str, *values):
+        """
+        Writes a run of fields described by a struct format string, e.g.
+        write_struct('dLd', 1.5, 3, 2.5)
+        """
+        self._buffer += compiled_struct(fmt).pack(*values)
+
+    def write_doubles(self, values):
+        """
+        Writes a run of doubles to the stream
+        """
+        self.write_struct('{}d'.format(len(values)), *values)
+
+    def write_clsid(self, clsid: bin):
+        """
+        Writes a raw 16 byte CLSID to the stream
+        """
+        self._buffer += clsid
+
+    def write_guid(self, guid: str):
+        """
+        Writes a GUID to the stream
+        """
+        self.write_clsid(ObjectRegistry.guid_to_bytes(guid))
+
+    def write_string(self, value: str):
+        """
+        Writes a length prefixed, null terminated UTF-16 string to the stream
+        """
+        encoded = value.encode('utf-16-le') + b'\x00\x00'
+        self.write_uint(len(encoded))
+        self._buffer += encoded
+
+    def write_version(self, obj: Object, version: int):
+        """
+        Writes the version of a persistent object. Nothing is written for objects without versioning.
+        """
+        if obj.compatible_versions() is not None:
+            self.write_ushort(version)
+
+    def write_object(self, obj: Optional[Object]):
+        """
+        Writes an object, including its CLSID and version, to the stream. None is
+        written as a null CLSID.
+        """
+        if obj is None:
+            self.write_clsid(ObjectRegistry.NULL_CLSID)
+            return
+
+        entry = self.retained.get(obj) if self.retained is not None else None
+        if entry is not None:
+            version, values = entry
+        else:
+            versions = obj.compatible_versions()
+            version = max(versions) if versions else 1
+            values = ()
+
+        self.write_guid(obj.guid())
+        self.write_version(obj, version)
+        self._writing.append([values, 0])
+        try:
+            obj.write(self, version)
+        finally:
+            self._writing.pop()
+
+    def retained_value(self, default=None):
+        """
+        Returns the next value retained for the object currently being written, or
+        default if no value was retained. Values are returned in the order in which
+        they were retained while reading the object.
+        """
+        if not self._writing:
+            return default
+        state = self._writing[-1]
+        values, index = state
+        if index >= len(values):
+            return default
+        state[1] = index + 1
+        return values[index]
+
+    def write_retained(self, default: bin):
+        """
+        Writes the raw bytes of the next skipped field retained for the object
+        currently being written, or default if no value was retained
+        """
+        self._buffer += self.retained_value(default)
+
+    def write_0d_terminator(self):
+        """
+        Writes the standard 0d00000000000000 layer terminator
+        """
+        self.write_retained(TERMINATOR)
+
+    def write_embedded_file(self, content: bin):
+        """
+        Writes a length prefixed embedded file to the stream
+        """
+        self.write_int(len(content))
+        self._buffer += content
+
+    def write_picture(self, picture: Object):
+        """
+        Writes an embedded picture to the stream
+        """
+        Picture.write_to_stream(self, picture)
@@ -3,11 +3,20 @@
 Extracts a symbol from a style blob
 """
 
-from slyr.parser.stream import Stream
+import os
+import time
+from typing import Iterable, Iterator, Optional
+from slyr.parser.stream import Stream, BufferStream, WriterStream, RetainedFields, ParseLimits
 from slyr.parser.object import Object
+from slyr.parser.object_registry import ObjectRegistry
 
 from slyr.parser.exceptions import (UnreadableSymbolException,
-                                    InvalidColorException)
+                                    InvalidColorException,
+                                    NotImplementedException,
+                                    UnsupportedVersionException,
+                                    UnknownGuidException,
+                                    UnknownPictureTypeException,
+                                    UnreadablePictureException)
 
 
 class Symbol(Object):
@@ -15,16 +24,93 @@ class Symbol(Object):
     Base class for symbols
     """
 
+    __slots__ = ('levels',)
+    CHILD_ATTRIBUTES = ('levels',)
+
     def __init__(self):
         super().__init__()
         self.levels = []
 
-    def children(self):
-        res = super().children()
+    def read(self, stream: Stream, version):
+        number_layers = self.read_header(stream, version)
+        stream.check_object_count(number_layers, 'symbol layers')
+        for i in range(number_layers):
+            layer = stream.read_object('symbol layer {}/{}', (i + 1, number_layers))
+            self.levels.extend([layer])
+        self.read_footer(stream, version)
+
+    @classmethod
+    def skip(cls, stream, version):
+        number_layers = cls.skip_header(stream, version)
+        for _ in range(number_layers):
+            stream.skip_object()
+        cls.skip_footer(stream, version, number_layers)
+
+    def write(self, stream, version):
+        self.write_header(stream, version)
+        for layer in self.levels:
+            stream.write_object(layer)
+        self.write_footer(stream, version)
+
+    def read_header(self, stream: Stream, version) -> int:
+        """
+        Reads the symbol properties which precede the symbol layers.
+        Subclasses should implement their logic here.
+        :return: number of symbol layers
+        """
+        raise NotImplementedError
+
+    def read_footer(self, stream: Stream, version):
+        """
+        Reads the layer properties which follow the symbol layers
+        """
+        for l in self.levels:
+            l.read_enabled(stream)
         for l in self.levels:
-            if l:
-                res.append(l)
-        return res
+            l.read_locked(stream)
+
+        if version >= 2:
+            for l in self.levels:
+                l.read_tags(stream)
+
+    @staticmethod
+    def skip_header(stream: Stream, version) -> int:
+        """
+        Skips the symbol properties which precede the symbol layers.
+        Subclasses should implement their logic here.
+        :return: number of symbol layers
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def skip_footer(stream: Stream, version, number_layers: int):
+        """
+        Skips the layer properties which follow the symbol layers
+        """
+        stream.skip(number_layers * 8)
+        if version >= 2:
+            for _ in range(number_layers):
+                stream.skip_string()
+
+    def write_header(self, stream, version):
+        """
+        Writes the symbol properties which precede the symbol layers, including the
+        number of symbol layers. Subclasses should implement their logic here.
+        """
+        raise NotImplementedError
+
+    def write_footer(self, stream, version):
+        """
+        Writes the layer properties which follow the symbol layers
+        """
+        for level in self.levels:
+            level.write_enabled(stream)
+        for level in self.levels:
+            level.write_locked(stream)
+
+        if version >= 2:
+            for level in self.levels:
+                level.write_tags(stream)
 
 
 class LineSymbol(Symbol):
@@ -32,6 +118,8 @@ class LineSymbol(Symbol):
     Line symbol
     """
 
+    __slots__ = ()
+
     @staticmethod
     def guid():
         return '7914e5fa-c892-11d0-8bb6-080009ee4e41'
@@ -40,23 +128,22 @@ class LineSymbol(Symbol):
     def compatible_versions():
         return [1, 2]
 
-    def read(self, stream: Stream, version):
+    def read_header(self, stream: Stream, version):
         if not stream.read_0d_terminator():
             raise UnreadableSymbolException('Could not find 0d terminator at {}'.format(hex(stream.tell() - 8)))
 
-        number_layers = stream.read_uint('layer count')
-        for i in range(number_layers):
-            layer = stream.read_object('symbol layer {}/{}'.format(i + 1, number_layers))
-            self.levels.extend([layer])
+        return stream.read_uint('layer count')
 
-        for l in self.levels:
-            l.read_enabled(stream)
-        for l in self.levels:
-            l.read_locked(stream)
+    @staticmethod
+    def skip_header(stream: Stream, version):
+        if not stream.read_0d_terminator():
+            raise UnreadableSymbolException('Could not find 0d terminator at {}'.format(hex(stream.tell() - 8)))
 
-        if version >= 2:
-            for l in self.levels:
-                l.read_tags(stream)
+        return stream.read_uint('layer count')
+
+    def write_header(self, stream, version):
+        stream.write_0d_terminator()
+        stream.write_uint(len(self.levels))
 
 
 class FillSymbol(Symbol):
@@ -64,6 +151,8 @@ class FillSymbol(Symbol):
     Fill symbol
     """
 
+    __slots__ = ()
+
     @staticmethod
     def guid():
         return '7914e604-c892-11d0-8bb6-080009ee4e41'
@@ -72,25 +161,28 @@ class FillSymbol(Symbol):
     def compatible_versions():
         return [1, 2]
 
-    def read(self, stream: Stream, version):
+    def read_header(self, stream: Stream, version):
         if not stream.read_0d_terminator():
             raise UnreadableSymbolException('Could not find 0d terminator at {}'.format(hex(stream.tell() - 8)))
 
-        _ = stream.read_object('unused color')
+        unused_color = stream.read_object('unused color')
+        if stream.retained is not None:
+            stream.retain_value(unused_color)
 
-        number_layers = stream.read_int('layers')
-        for i in range(number_layers):
-            layer = stream.read_object('symbol layer {}/{}'.format(i + 1, number_layers))
-            self.levels.extend([layer])
+        return stream.read_int('layers')
 
-        for l in self.levels:
-            l.read_enabled(stream)
-        for l in self.levels:
-            l.read_locked(stream)
+    @staticmethod
+    def skip_header(stream: Stream, version):
+        if not stream.read_0d_terminator():
+            raise UnreadableSymbolException('Could not find 0d terminator at {}'.format(hex(stream.tell() - 8)))
 
-        if version >= 2:
-            for l in self.levels:
-                l.read_tags(stream)
+        stream.skip_object()
+        return stream.read_int('layers')
+
+    def write_header(self, stream, version):
+        stream.write_0d_terminator()
+        stream.write_object(stream.retained_value())
+        stream.write_int(len(self.levels))
 
 
 class MarkerSymbol(Symbol):
@@ -99,6 +191,9 @@ class MarkerSymbol(Symbol):
 
     """
 
+    __slots__ = ('halo', 'halo_size', 'halo_symbol')
+    CHILD_ATTRIBUTES = ('halo_symbol',)
+
     def __init__(self):
         super().__init__()
         self.halo = False
@@ -113,56 +208,264 @@ class MarkerSymbol(Symbol):
     def compatible_versions():
         return [2, 3]
 
-    def children(self):
-        res = super().children()
-        if self.halo_symbol:
-            res.append(self.halo_symbol)
-        return res
-
-    def read(self, stream: Stream, version):
+    def read_header(self, stream: Stream, version):
         if not stream.read_0d_terminator():
             raise UnreadableSymbolException('Could not find 0d terminator at {}'.format(hex(stream.tell() - 8)))
 
         # consume unused properties - MultiLayerMarkerSymbol implements IMarkerSymbol
         # so that the size/offsets/angle are required properties. But they aren't used
         # or exposed anywhere for MultiLayerMarkerSymbol
-        _ = stream.read_double('unused marker size')
-        _ = stream.read_double('unused marker x/y/offset or angle')
-        _ = stream.read_double('unused marker x/y/offset or angle')
-        _ = stream.read_double('unused marker x/y/offset or angle')
-        _ = stream.read_object('unused color')
+        _ = stream.read_doubles(4, 'unused marker size, x/y/offset or angle')
+        if stream.retained is not None:
+            stream.retain(32)
+        unused_color = stream.read_object('unused color')
+        if stream.retained is not None:
+            stream.retain_value(unused_color)
 
-        self.halo = stream.read_int() == 1
-        self.halo_size = stream.read_double('halo size')
+        halo, self.halo_size = stream.read_struct('Ld', 'halo, halo size')
+        self.halo = halo == 1
 
         self.halo_symbol = stream.read_object('halo')
 
         # useful stuff
-        number_layers = stream.read_int('layers')
-        for i in range(number_layers):
-            layer = stream.read_object('symbol layer {}/{}'.format(i + 1, number_layers))
-            self.levels.extend([layer])
+        return stream.read_int('layers')
+
+    @staticmethod
+    def skip_header(stream: Stream, version):
+        if not stream.read_0d_terminator():
+            raise UnreadableSymbolException('Could not find 0d terminator at {}'.format(hex(stream.tell() - 8)))
 
+        stream.skip(32)
+        stream.skip_object()
+        stream.skip(12)
+        stream.skip_object()
+        return stream.read_int('layers')
+
+    def write_header(self, stream, version):
+        stream.write_0d_terminator()
+        stream.write_retained(bytes(32))
+        stream.write_object(stream.retained_value())
+        stream.write_struct('Ld', 1 if self.halo else 0, self.halo_size)
+        stream.write_object(self.halo_symbol)
+        stream.write_int(len(self.levels))
+
+    def read_footer(self, stream: Stream, version):
         for l in self.levels:
             l.read_enabled(stream)
         for l in self.levels:
             l.read_locked(stream)
 
-        _ = stream.read_double('unknown size')
-        _ = stream.read_double('unknown size')
+        _ = stream.read_doubles(2, 'unknown sizes')
+        if stream.retained is not None:
+            stream.retain(16)
 
         if version >= 3:
             for l in self.levels:
                 l.read_tags(stream)
 
+    @staticmethod
+    def skip_footer(stream: Stream, version, number_layers: int):
+        stream.skip(number_layers * 8 + 16)
+        if version >= 3:
+            for _ in range(number_layers):
+                stream.skip_string()
+
+    def write_footer(self, stream, version):
+        for level in self.levels:
+            level.write_enabled(stream)
+        for level in self.levels:
+            level.write_locked(stream)
+
+        stream.write_retained(bytes(16))
+
+        if version >= 3:
+            for level in self.levels:
+                level.write_tags(stream)
+
 
 def read_symbol(_io_stream, debug=False):
     """
-    Reads a symbol from the specified file
+    Reads a symbol from the specified file handle, binary blob, Stream or file path.
+    Blobs (bytes, bytearray or memoryview) are parsed in place without copying, and
+    files specified by path are memory mapped.
     """
-    stream = Stream(_io_stream, debug)
+    if isinstance(_io_stream, (str, os.PathLike)):
+        with Stream.from_path(_io_stream, debug) as stream:
+            return read_symbol(stream)
+    if isinstance(_io_stream, Stream):
+        stream = _io_stream
+    elif isinstance(_io_stream, (bytes, bytearray, memoryview)):
+        stream = BufferStream(_io_stream, debug)
+    else:
+        stream = Stream(_io_stream, debug)
     try:
         symbol_object = stream.read_object('symbol')
-    except InvalidColorException:
-        raise UnreadableSymbolException()
+    except InvalidColorException as e:
+        raise UnreadableSymbolException() from e
     return symbol_object
+
+
+def write_symbol(symbol: Object, retained: Optional[RetainedFields] = None) -> bin:
+    """
+    Writes a symbol (or any other supported object) back to its binary form.
+    :param symbol: symbol to write
+    :param retained: table of fields retained while reading the symbol. If set,
+    the written blob is identical to the blob the symbol was read from (for all
+    properties which have not been modified since).
+    """
+    stream = WriterStream(retained)
+    stream.write_object(symbol)
+    return stream.getvalue()
+
+
+# exceptions which indicate that an individual blob could not be parsed
+PARSE_EXCEPTIONS = (UnreadableSymbolException,
+                    NotImplementedException,
+                    UnsupportedVersionException,
+                    UnknownGuidException,
+                    UnknownPictureTypeException,
+                    UnreadablePictureException)
+
+
+class SymbolResult:
+    """
+    The result of parsing a single blob with read_symbols()
+    """
+
+    def __init__(self, index: int, symbol: Optional[Object] = None, error: Optional[Exception] = None,
+                 elapsed: float = 0.0):
+        """
+        Constructor for SymbolResult
+        :param index: index of blob in the input
+        :param symbol: parsed symbol, or None if the blob could not be parsed
+        :param error: exception raised while parsing the blob, if any
+        :param elapsed: time in seconds spent parsing the blob
+        """
+        self.index = index
+        self.symbol = symbol
+        self.error = error
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        if self.error is not None:
+            return '<SymbolResult {}: {}>'.format(self.index, self.error.__class__.__name__)
+        return '<SymbolResult {}: {}>'.format(self.index, self.symbol.__class__.__name__)
+
+    @property
+    def ok(self) -> bool:
+        """
+        Returns True if the blob was successfully parsed
+        """
+        return self.error is None
+
+
+def read_symbols(blobs: Iterable[bin], on_error: str = 'collect', debug: bool = False,  # pylint: disable=too-many-arguments
+                 registry: Optional[ObjectRegistry] = None, intern_table=None,
+                 limits: Optional[ParseLimits] = None, lazy: bool = False) -> Iterator[SymbolResult]:
+    """
+    Parses an iterable of binary blobs, reusing a single stream for all blobs.
+    Results are yielded as each blob is parsed, so blobs may be produced lazily
+    (e.g. by Extractor.iter_styles).
+    :param blobs: iterable of blobs (bytes, bytearray or memoryview)
+    :param on_error: action to take when a blob cannot be parsed. 'collect' yields
+    a result with the error set, 'skip' omits the result and 'raise' raises the error.
+    :param debug: true if debugging output should be printed during object read
+    :param registry: registry used to create objects. Defaults to the REGISTRY singleton.
+    :param intern_table: optional InternTable, for sharing instances of repeated colors,
+    fonts and line templates between all parsed symbols
+    :param limits: resource limits for parsing each blob. Blobs exceeding the limits
+    fail with a ParseLimitException.
+    :param lazy: if True, heavy child objects such as pictures and outline symbols are
+    only decoded when first accessed. Errors in these objects are raised on access.
+    :return: iterator of SymbolResult
+    """
+    if on_error not in ('collect', 'skip', 'raise'):
+        raise ValueError('Unknown on_error action {}'.format(on_error))
+
+    stream = BufferStream(b'', debug, registry=registry)
+    stream.intern_table = intern_table
+    if limits is not None:
+        stream.limits = limits
+    stream.lazy = lazy
+    for index, blob in enumerate(blobs):
+        stream.reset(blob)
+        start = time.perf_counter()
+        try:
+            try:
+                symbol = stream.read_object('symbol')
+            except InvalidColorException as e:
+                raise UnreadableSymbolException() from e
+        except PARSE_EXCEPTIONS as e:
+            if on_error == 'raise':
+                raise
+            if on_error == 'collect':
+                yield SymbolResult(index, error=e, elapsed=time.perf_counter() - start)
+            continue
+        yield SymbolResult(index, symbol, elapsed=time.perf_counter() - start)
+
+
+class SymbolSummary:
+    """
+    A shallow summary of a symbol blob, as returned by sniff_symbol()
+    """
+
+    def __init__(self, class_name: Optional[str], guid: str, version: Optional[int], layer_guids: list):
+        """
+        Constructor for SymbolSummary
+        :param class_name: name of object class, or None for null objects
+        :param guid: GUID of top level object
+        :param version: version of top level object, or None if the object is not versioned
+        :param layer_guids: list of GUIDs for symbol layers, with None for null layers
+        """
+        self.class_name = class_name
+        self.guid = guid
+        self.version = version
+        self.layer_guids = layer_guids
+
+    def __repr__(self):
+        return '<SymbolSummary {} v{} ({} layers)>'.format(self.class_name, self.version, self.layer_count)
+
+    @property
+    def layer_count(self) -> int:
+        """
+        Returns the number of symbol layers
+        """
+        return len(self.layer_guids)
+
+
+def sniff_symbol(blob) -> SymbolSummary:
+    """
+    Performs a shallow parse of a symbol blob, returning the symbol class, version and
+    the GUIDs of its layers without materialising the symbol.
+
+    Symbol layers are not length prefixed, so all but the last layer are skipped (see
+    Object.skip()) to find the start of the following layer, without being decoded.
+    Everything after the last layer's GUID (including the last layer itself, and all
+    trailing layer properties) is ignored.
+    """
+    stream = blob if isinstance(blob, Stream) else BufferStream(blob)
+    clsid = stream.read_clsid('symbol')
+    guid = ObjectRegistry.bytes_to_guid(clsid)
+    object_class = stream.registry.class_from_clsid(clsid)
+    if object_class is None:
+        return SymbolSummary(None, guid, None, [])
+
+    version = stream.read_version(object_class)
+    versioned = object_class.compatible_versions() is not None
+    summary = SymbolSummary(object_class.__name__, guid, version if versioned else None, [])
+    if not issubclass(object_class, Symbol):
+        return summary
+
+    try:
+        number_layers = object_class.skip_header(stream, version)
+        for i in range(number_layers):
+            if i == number_layers - 1:
+                layer_clsid = stream.read_clsid('symbol layer {}/{}', (i + 1, number_layers))
+                summary.layer_guids.append(
+                    None if layer_clsid == ObjectRegistry.NULL_CLSID else ObjectRegistry.bytes_to_guid(layer_clsid))
+            else:
+                layer_class = stream.skip_object()
+                summary.layer_guids.append(layer_class.guid() if layer_class is not None else None)
+    except InvalidColorException as e:
+        raise UnreadableSymbolException() from e
+    return summary
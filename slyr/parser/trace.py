@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+"""
+Structured trace events emitted while parsing a Stream
+"""
+
+
+class TraceEvent:
+    """
+    A single structured event emitted by a Stream while parsing.
+
+    Event labels are stored as an unformatted template plus arguments, and are only
+    materialised when a tracer actually asks for them.
+    """
+
+    __slots__ = ('kind', 'template', 'args', 'offset', 'size', 'value', 'depth')
+
+    # a primitive field (uchar/double/int/uint/ulong/ushort/struct/string/guid/binary)
+    UCHAR = 'uchar'
+    DOUBLE = 'double'
+    INT = 'int'
+    UINT = 'uint'
+    ULONG = 'ulong'
+    USHORT = 'ushort'
+    STRUCT = 'struct'
+    STRING = 'string'
+    GUID = 'guid'
+    BINARY = 'binary'
+    # version of a persistent object
+    VERSION = 'version'
+    # start and end of a persistent object
+    OBJECT_START = 'object_start'
+    OBJECT_END = 'object_end'
+    # free-form log message
+    MESSAGE = 'message'
+
+    def __init__(self, kind: str, template: str, args: tuple, offset: int,  # pylint: disable=too-many-arguments
+                 size: int = 0, value=None, depth: int = 0):
+        """
+        Constructor for TraceEvent
+        :param kind: event kind, e.g. TraceEvent.DOUBLE
+        :param template: label template, formatted using args
+        :param args: arguments for label template
+        :param offset: stream offset at which the event starts
+        :param size: number of bytes covered by the event
+        :param value: value read from the stream, if any
+        :param depth: object nesting depth
+        """
+        self.kind = kind
+        self.template = template
+        self.args = args
+        self.offset = offset
+        self.size = size
+        self.value = value
+        self.depth = depth
+
+    @property
+    def label(self) -> str:
+        """
+        Returns the formatted event label
+        """
+        if self.args:
+            return self.template.format(*self.args)
+        return self.template
+
+    @property
+    def end(self) -> int:
+        """
+        Returns the stream offset at which the event ends
+        """
+        return self.offset + self.size
+
+
+class Tracer:
+    """
+    Base class for sinks which receive structured parse events from a Stream
+    """
+
+    def event(self, event: TraceEvent):
+        """
+        Called for every event emitted by the stream. Subclasses should implement
+        their logic here.
+        """
+
+
+class PrintTracer(Tracer):
+    """
+    Prints parse events to the console, in the classic --debug format
+    """
+
+    FORMATS = {
+        TraceEvent.UCHAR: 'read uchar {} of {}',
+        TraceEvent.DOUBLE: 'read double {} of {}',
+        TraceEvent.INT: 'read int {} of {}',
+        TraceEvent.UINT: 'read uint {} of {}',
+        TraceEvent.ULONG: 'read ulong {} of {}',
+        TraceEvent.USHORT: 'read ushort {} of {}',
+        TraceEvent.STRUCT: 'read struct {} of {}',
+        TraceEvent.STRING: 'found string {} "{}"',
+        TraceEvent.GUID: 'Found {} guid of {}',
+        TraceEvent.BINARY: 'Found embedded file {} of length {}',
+        TraceEvent.VERSION: 'read ushort {} of {}',
+    }
+
+    # event kinds which are printed even when no label was given
+    ALWAYS_PRINTED = {TraceEvent.GUID, TraceEvent.STRING, TraceEvent.BINARY}
+
+    def event(self, event: TraceEvent):
+        if event.kind == TraceEvent.OBJECT_START:
+            if event.value is None:
+                message = '{} not found'.format(event.label)
+            else:
+                message = '** {} **'.format(event.value.__class__.__name__)
+        elif event.kind == TraceEvent.OBJECT_END:
+            message = 'ended {}'.format(event.value.__class__.__name__)
+        elif event.kind == TraceEvent.MESSAGE:
+            message = event.label
+        elif not event.template and event.kind not in self.ALWAYS_PRINTED:
+            return
+        else:
+            message = self.FORMATS[event.kind].format(event.label, event.value)
+
+        print('{}{} at {}'.format('   ' * event.depth, message, hex(event.offset)))
+        if event.kind == TraceEvent.OBJECT_END:
+            print('')
@@ -24,7 +24,6 @@ SLYR QGIS Processing algorithms
 """
 
 import os
-from io import BytesIO
 from qgis.core import (QgsProcessing,
                        QgsProcessingAlgorithm,
                        QgsProcessingParameterFile,
@@ -48,10 +47,9 @@ from qgis.PyQt.QtCore import QVariant
 from processing.core.ProcessingConfig import ProcessingConfig
 
 from slyr.bintools.extractor import Extractor
-from slyr.parser.stream import Stream
-from slyr.parser.exceptions import (UnreadableSymbolException,
-                                    InvalidColorException,
-                                    UnsupportedVersionException,
+from slyr.parser.symbol_parser import read_symbols
+from slyr.parser.object import walk
+from slyr.parser.exceptions import (UnsupportedVersionException,
                                     NotImplementedException,
                                     UnknownGuidException,
                                     UnreadablePictureException)
@@ -212,7 +210,8 @@ class StyleToQgisXml(QgsProcessingAlgorithm):
                 break
 
             unreadable = 0
-            for index, raw_symbol in enumerate(raw_symbols):
+            parse_results = read_symbols(raw_symbol[Extractor.BLOB] for raw_symbol in raw_symbols)
+            for index, (raw_symbol, parse_result) in enumerate(zip(raw_symbols, parse_results)):
                 feedback.setProgress(index / len(raw_symbols) * 33.3 + 33.3 * type_index)
                 if feedback.isCanceled():
                     break
@@ -224,48 +223,13 @@ class StyleToQgisXml(QgsProcessingAlgorithm):
                 if name != unique_name:
                     feedback.pushInfo('Corrected to unique name of {}'.format(unique_name))
 
-                handle = BytesIO(raw_symbol[Extractor.BLOB])
-                stream = Stream(handle)
-
-                f = QgsFeature()
-                try:
-                    symbol = stream.read_object()
-                except UnreadableSymbolException as e:
-                    feedback.reportError('Error reading symbol {}: {}'.format(name, e))
+                if not parse_result.ok:
+                    self.report_parse_error(name, parse_result.error, feedback, sink)
                     unreadable += 1
-                    if sink:
-                        f.setAttributes([name, 'Error reading symbol: {}'.format(e)])
-                        sink.addFeature(f)
-                    continue
-                except NotImplementedException as e:
-                    feedback.reportError('Parsing {} is not supported: {}'.format(name, e))
-                    unreadable += 1
-                    if sink:
-                        f.setAttributes([name, 'Parsing not supported: {}'.format(e)])
-                        sink.addFeature(f)
-                    continue
-                except UnsupportedVersionException as e:
-                    feedback.reportError('Cannot read {} version: {}'.format(name, e))
-                    unreadable += 1
-                    if sink:
-                        f.setAttributes([name, 'Version not supported: {}'.format(e)])
-                        sink.addFeature(f)
-                    continue
-                except UnknownGuidException as e:
-                    feedback.reportError(str(e))
-                    unreadable += 1
-                    if sink:
-                        f.setAttributes([name, 'Unknown object: {}'.format(e)])
-                        sink.addFeature(f)
-                    continue
-                except UnreadablePictureException as e:
-                    feedback.reportError(str(e))
-                    unreadable += 1
-                    if sink:
-                        f.setAttributes([name, 'Unreadable picture: {}'.format(e)])
-                        sink.addFeature(f)
                     continue
 
+                symbol = parse_result.symbol
+                f = QgsFeature()
                 self.check_for_unsupported_property(name, symbol, feedback, sink)
 
                 context = Context()
@@ -319,6 +283,32 @@ class StyleToQgisXml(QgsProcessingAlgorithm):
         results[self.REPORT] = dest
         return results
 
+    @staticmethod
+    def report_parse_error(name: str, error: Exception, feedback: QgsProcessingFeedback, sink):
+        """
+        Reports an error encountered while parsing a symbol
+        """
+        if isinstance(error, NotImplementedException):
+            feedback.reportError('Parsing {} is not supported: {}'.format(name, error))
+            message = 'Parsing not supported: {}'.format(error)
+        elif isinstance(error, UnsupportedVersionException):
+            feedback.reportError('Cannot read {} version: {}'.format(name, error))
+            message = 'Version not supported: {}'.format(error)
+        elif isinstance(error, UnknownGuidException):
+            feedback.reportError(str(error))
+            message = 'Unknown object: {}'.format(error)
+        elif isinstance(error, UnreadablePictureException):
+            feedback.reportError(str(error))
+            message = 'Unreadable picture: {}'.format(error)
+        else:
+            feedback.reportError('Error reading symbol {}: {}'.format(name, error))
+            message = 'Error reading symbol: {}'.format(error)
+
+        if sink:
+            f = QgsFeature()
+            f.setAttributes([name, message])
+            sink.addFeature(f)
+
     @staticmethod
     def check_for_missing_fonts(symbol: QgsSymbol, feedback: QgsProcessingFeedback):
         """
@@ -335,17 +325,25 @@ class StyleToQgisXml(QgsProcessingAlgorithm):
                 feedback.reportError('Warning: font {} not available on system'.format(font))
 
     @staticmethod
-    def check_for_unsupported_property(name,  # pylint:disable=too-many-branches
+    def check_for_unsupported_property(name,
                                        symbol,
                                        feedback: QgsProcessingFeedback,
                                        sink):
         """
-        Checks for properties of ESRI symbols which have no equivalent in QGIS,
-        and warns
+        Checks for properties of ESRI symbols (and all objects they reference) which
+        have no equivalent in QGIS, and warns
         """
-        for c in symbol.children():
-            StyleToQgisXml.check_for_unsupported_property(name, c, feedback, sink)
+        for step in walk(symbol):
+            StyleToQgisXml.check_object_for_unsupported_property(name, step.obj, feedback, sink)
 
+    @staticmethod
+    def check_object_for_unsupported_property(name,  # pylint:disable=too-many-branches
+                                              symbol,
+                                              feedback: QgsProcessingFeedback,
+                                              sink):
+        """
+        Checks a single object for properties which have no equivalent in QGIS, and warns
+        """
         try:
             if symbol.random:
                 feedback.reportError(
@@ -463,7 +461,8 @@ class StyleToGpl(QgsProcessingAlgorithm):
         feedback.pushInfo('Found {} colors'.format(len(raw_colors)))
 
         unreadable = 0
-        for index, raw_color in enumerate(raw_colors):
+        parse_results = read_symbols(raw_color[Extractor.BLOB] for raw_color in raw_colors)
+        for index, (raw_color, parse_result) in enumerate(zip(raw_colors, parse_results)):
             feedback.setProgress(index / len(raw_colors) * 100)
             if feedback.isCanceled():
                 break
@@ -471,15 +470,12 @@ class StyleToGpl(QgsProcessingAlgorithm):
             name = raw_color[Extractor.NAME]
             feedback.pushInfo('{}/{}: {}'.format(index + 1, len(raw_colors), name))
 
-            handle = BytesIO(raw_color[Extractor.BLOB])
-            stream = Stream(handle)
-            try:
-                color = stream.read_object()
-            except InvalidColorException:
+            if not parse_result.ok:
                 feedback.reportError('Error reading color {}'.format(name))
                 unreadable += 1
                 continue
 
+            color = parse_result.symbol
             qcolor = symbol_color_to_qcolor(color)
             colors.append((name, qcolor))
 
@@ -2,8 +2,24 @@
 Test color parsing
 """
 
+import os
+import random
+import tempfile
 import unittest
-from slyr.parser.color_parser import cielab_to_rgb
+from slyr.parser.color_parser import (cielab_to_rgb,
+                                      cielab_to_rgb_batch,
+                                      rgb_to_cielab,
+                                      rgb_to_cielab_batch,
+                                      packed_cielab_to_rgb,
+                                      lab_cache_info,
+                                      lookup_lab,
+                                      LAB)
+from slyr.parser.color_lut import COLOR_LUT, ColorLookupTable, write_table, pack_key, unpack_key, lab_key
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 class TestColorParser(unittest.TestCase):
@@ -87,6 +103,120 @@ class TestColorParser(unittest.TestCase):
         self.assertEqual(2, g)
         self.assertEqual(2, b)
 
+    def test_lookup_table(self):
+        self.assertEqual(len(COLOR_LUT), 53500)
+        self.assertEqual(COLOR_LUT[(32.6742, 51.5019, 45.4267)], (131, 2, 2))
+        self.assertIn((0.0035, 2.5592, -3.6661), COLOR_LUT)
+        self.assertNotIn((0.0035, 2.5592, -3.6662), COLOR_LUT)
+        self.assertIsNone(COLOR_LUT.get((500, 0, 0)))
+        self.assertEqual(list(COLOR_LUT.keys), sorted(COLOR_LUT.keys))
+
+        self.assertEqual(unpack_key(pack_key(326742, -515019, 454267)), (326742, -515019, 454267))
+        self.assertIsNone(pack_key(0, -2000000, 0))
+
+        entries = {(1.5, -2.25, 3.0): (1, 2, 3), (0.5, 10.0, -10.0): (4, 5, 6)}
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'lut.bin')
+            write_table(entries, path)
+            table = ColorLookupTable(path)
+            self.assertEqual(dict(table.items()), entries)
+            self.assertEqual(table.get((1.5, -2.25, 3.0)), (1, 2, 3))
+            self.assertIsNone(table.get((1.5, -2.25, 3.0001)))
+            del table
+
+            # colliding hash slots are probed
+            entries = {(lightness / 10, 0, 0): (lightness, 0, 0) for lightness in range(200)}
+            write_table(entries, path)
+            table = ColorLookupTable(path)
+            self.assertEqual({lab: table[lab] for lab in entries}, entries)
+            self.assertEqual(table.find(lab_key(0.1, 0, 0)), 1)
+            self.assertIsNone(table.find(lab_key(20.1, 0, 0)))
+            self.assertIsNone(table.find(None))
+            del table
+
+            with open(path, 'r+b') as f:
+                f.write(b'XXXX')
+            with self.assertRaises(ValueError):
+                len(ColorLookupTable(path))
+
+    def test_lookup_lab(self):
+        # packed integer keys must give identical results to looking up rounded float tuples
+        legacy = dict(COLOR_LUT.items())
+        self.assertEqual(len(legacy), len(COLOR_LUT))
+        for lab, rgb in legacy.items():
+            self.assertEqual(lookup_lab(*lab), rgb)
+            self.assertEqual(lab_key(*lab), pack_key(*(round(v * 10000) for v in lab)))
+            for offset in (0.00004, -0.00004, 0.00005, -0.00005, 0.00006):
+                shifted = tuple(v + offset for v in lab)
+                self.assertEqual(lookup_lab(*shifted), legacy.get(tuple(round(v * 10000) / 10000.0 for v in shifted)), shifted)
+
+        self.assertIsNone(lookup_lab(50.1, 10.2, 10.3))
+        self.assertIsNone(lookup_lab(-5, 0, 0))
+        self.assertIsNone(lab_key(500, 0, 0))
+
+    def test_packed_lab_to_rgb(self):
+        packed_cielab_to_rgb.cache_clear()
+        for lab in ((56.547017615341, 76.8994334713463, 68.1034442713808), (32.6742, 51.5019, 45.4267)):
+            self.assertEqual(packed_cielab_to_rgb(LAB.pack(*lab)), cielab_to_rgb(*lab))
+            self.assertEqual(packed_cielab_to_rgb(LAB.pack(*lab)), cielab_to_rgb(*lab))
+        info = lab_cache_info()
+        self.assertEqual(info.hits, 2)
+        self.assertEqual(info.misses, 2)
+        self.assertEqual(info.currsize, 2)
+
+    @unittest.skipIf(np is None, 'numpy is not available')
+    def test_lab_to_rgb_batch(self):
+        # lookup table values
+        labs = [lab for lab, _ in COLOR_LUT.items()]
+        self.assertTrue((cielab_to_rgb_batch(labs) == np.array([rgb for _, rgb in COLOR_LUT.items()])).all())
+
+        # calculated values
+        rng = random.Random(0)
+        labs = [(rng.uniform(0, 100), rng.uniform(-110, 110), rng.uniform(-110, 110)) for _ in range(20000)]
+        labs.extend([(56.547017615341, 76.8994334713463, 68.1034442713808),
+                     (32.67421111111, 51.50189999999, 45.4267000001),
+                     (500, 0, 0)])
+        expected = [[min(c, 255) for c in cielab_to_rgb(*lab)] for lab in labs]
+        res = cielab_to_rgb_batch(labs)
+        self.assertEqual(res.dtype, np.uint8)
+        self.assertEqual(res.tolist(), expected)
+
+        self.assertEqual(cielab_to_rgb_batch(np.empty((0, 3))).shape, (0, 3))
+
+    def test_rgb_to_lab(self):
+        # lookup table values give the stored ESRI values
+        self.assertEqual(rgb_to_cielab(131, 2, 2), (32.6742, 51.5019, 45.4267))
+        self.assertEqual(rgb_to_cielab(0, 0, 1), (0.0035, 2.5592, -3.6661))
+
+        for lab, rgb in list(COLOR_LUT.items())[::50]:
+            self.assertEqual(rgb_to_cielab(*rgb), lab)
+
+        # all other values convert back to the same RGB value
+        for r in range(0, 256, 15):
+            for g in range(0, 256, 15):
+                for b in range(0, 256, 15):
+                    self.assertEqual(cielab_to_rgb(*rgb_to_cielab(r, g, b)), (r, g, b))
+
+    @unittest.skipIf(np is None, 'numpy is not available')
+    def test_rgb_to_lab_batch(self):
+        rgbs = [(r, g, b) for r in range(0, 256, 5) for g in range(0, 256, 5) for b in range(0, 256, 5)]
+        rgbs.extend(rgb for _, rgb in COLOR_LUT.items())
+        expected = np.array([rgb_to_cielab(*rgb) for rgb in rgbs])
+        res = rgb_to_cielab_batch(rgbs)
+        self.assertEqual(res.tolist(), expected.tolist())
+        self.assertEqual(rgb_to_cielab_batch(np.array(rgbs[:1000], dtype=float)).tolist(), expected[:1000].tolist())
+        self.assertEqual(cielab_to_rgb_batch(res).tolist(), [list(rgb) for rgb in rgbs])
+
+        # results are bit identical for arbitrary values, not just close enough to round trip
+        rgbs = np.random.default_rng(0).integers(0, 256, size=(100000, 3))
+        expected = [rgb_to_cielab(*rgb) for rgb in rgbs.tolist()]
+        self.assertEqual(rgb_to_cielab_batch(rgbs).tolist(), [list(lab) for lab in expected])
+
+    def test_rgb_to_lab_batch_invalid(self):
+        for rgb in ([(0, 0, -1)], [(256, 0, 0)], [(0, 255.5, 0)], [(0, float('nan'), 0)]):
+            with self.assertRaises(ValueError):
+                rgb_to_cielab_batch(rgb)
+
 
 if __name__ == '__main__':
     unittest.main()
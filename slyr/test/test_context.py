@@ -0,0 +1,116 @@
+"""
+Test parser contexts
+"""
+
+import unittest
+import os
+from concurrent.futures import ThreadPoolExecutor
+from slyr.converters.dictionary import DictionaryConverter
+from slyr.parser.context import ParserContext
+from slyr.parser.object_registry import ObjectRegistry
+from slyr.parser.symbol_parser import read_symbol
+from slyr.parser.exceptions import UnreadableSymbolException, UnknownGuidException
+from slyr.parser.initalize_registry import initialize_registry
+
+initialize_registry()
+
+STYLES_PATH = os.path.join(os.path.dirname(__file__), 'styles')
+
+
+def symbol_blobs():
+    """
+    Returns a list of all test symbol blobs
+    """
+    blobs = []
+    for group in ('fill_bin', 'line_bin', 'marker_bin', 'ramps_bin'):
+        group_path = os.path.join(STYLES_PATH, group)
+        for fn in sorted(os.listdir(group_path)):
+            with open(os.path.join(group_path, fn), 'rb') as f:
+                blobs.append(f.read())
+    return blobs
+
+
+class TestParserContext(unittest.TestCase):
+    """
+    Test parser contexts
+    """
+
+    def test_isolated_registry(self):
+        """
+        Test that contexts create objects from their own registry
+        """
+        with open(os.path.join(STYLES_PATH, 'fill_bin', 'Picture Fill Circle.bin'), 'rb') as f:
+            blob = f.read()
+        registry = ObjectRegistry()
+        context = ParserContext(registry)
+        with self.assertRaises(UnknownGuidException):
+            context.read_symbol(blob)
+        self.assertEqual(context.stats.snapshot()['errors'], 1)
+
+        initialize_registry(registry)
+        self.assertEqual(DictionaryConverter().convert_symbol(context.read_symbol(blob)),
+                         DictionaryConverter().convert_symbol(read_symbol(blob)))
+        self.assertEqual(context.sniff_symbol(blob).class_name, 'FillSymbol')
+
+    def test_read_symbols(self):
+        """
+        Test bulk parsing through a context
+        """
+        blobs = symbol_blobs()[:10]
+        blobs.insert(2, b'\x01\x02')
+        context = ParserContext()
+        results = list(context.read_symbols(blobs))
+        ok = len([r for r in results if r.ok])
+        self.assertFalse(results[2].ok)
+        self.assertEqual(len(list(context.read_symbols(blobs, on_error='skip'))), ok)
+        stats = context.stats.snapshot()
+        self.assertEqual(stats['symbols'], ok * 2)
+        self.assertEqual(stats['errors'], (len(blobs) - ok) * 2)
+        self.assertEqual(stats['bytes'], sum(len(b) for b in blobs) * 2)
+        with self.assertRaises(UnreadableSymbolException):
+            list(context.read_symbols(blobs[2:], on_error='raise'))
+
+    def test_threads(self):
+        """
+        Test parsing concurrently from many threads with a shared context
+        """
+        blobs = symbol_blobs()
+        converter = DictionaryConverter()
+        expected = []
+        for blob in blobs:
+            try:
+                expected.append(converter.convert_symbol(read_symbol(blob)))
+            except Exception as e:  # pylint: disable=broad-except
+                expected.append(e.__class__)
+
+        # a fresh registry, so that classes are lazily loaded while threads are racing
+        registry = ObjectRegistry()
+        initialize_registry(registry)
+        context = ParserContext(registry)
+
+        def parse(blob):
+            """
+            Parses a blob, returning the exception class on failure
+            """
+            try:
+                return context.read_symbol(blob)
+            except Exception as e:  # pylint: disable=broad-except
+                return e.__class__
+
+        repeats = 8
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(parse, blobs * repeats))
+
+        for i, result in enumerate(results):
+            if isinstance(result, type):
+                self.assertEqual(result, expected[i % len(blobs)])
+            else:
+                self.assertEqual(converter.convert_symbol(result), expected[i % len(blobs)])
+
+        stats = context.stats.snapshot()
+        self.assertEqual(stats['symbols'] + stats['errors'], len(blobs) * repeats)
+        self.assertEqual(stats['bytes'], sum(len(b) for b in blobs) * repeats)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+"""
+Test structural fingerprints
+"""
+
+import unittest
+import os
+from slyr.parser.symbol_parser import read_symbol
+from slyr.parser.objects.colors import RgbColor
+from slyr.parser.fingerprint import fingerprint
+from slyr.parser.initalize_registry import initialize_registry
+
+initialize_registry()
+
+STYLES_PATH = os.path.join(os.path.dirname(__file__), 'styles')
+
+
+class TestFingerprint(unittest.TestCase):
+    """
+    Test structural fingerprints
+    """
+
+    def test_stable(self):
+        """
+        Test that fingerprints do not change between runs
+        """
+        color = RgbColor()
+        color.red, color.green, color.blue = 255, 127, 0
+        self.assertEqual(fingerprint(color).hex(), 'e74287a6233f84f9ddc83efdfd227945')
+
+    def test_symbols(self):
+        """
+        Test fingerprinting parsed symbols
+        """
+        path = os.path.join(STYLES_PATH, 'line_bin', 'Cartographic line 3 positions flip all.bin')
+        symbol = read_symbol(path)
+        self.assertEqual(len(fingerprint(symbol)), 16)
+        self.assertEqual(fingerprint(symbol), fingerprint(read_symbol(path)))
+
+        other = read_symbol(os.path.join(STYLES_PATH, 'fill_bin', 'Picture Fill Circle.bin'))
+        self.assertNotEqual(fingerprint(symbol), fingerprint(other))
+
+        # rounding
+        modified = read_symbol(path)
+        modified.levels[0].width += 1e-9
+        self.assertNotEqual(fingerprint(symbol), fingerprint(modified))
+        self.assertEqual(fingerprint(symbol, float_digits=6), fingerprint(modified, float_digits=6))
+
+        # names
+        modified = read_symbol(path)
+        modified.levels[0].tags = 'renamed'
+        self.assertNotEqual(fingerprint(symbol), fingerprint(modified))
+        self.assertEqual(fingerprint(symbol, ignore_names=True), fingerprint(modified, ignore_names=True))
+        modified.levels[0].enabled = not modified.levels[0].enabled
+        self.assertNotEqual(fingerprint(symbol, ignore_names=True), fingerprint(modified, ignore_names=True))
+        self.assertEqual(fingerprint(symbol, ignore_names=True, ignore=['enabled']),
+                         fingerprint(modified, ignore_names=True, ignore=['enabled']))
+
+
+if __name__ == '__main__':
+    unittest.main()
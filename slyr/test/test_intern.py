@@ -0,0 +1,89 @@
+"""
+Test interning of repeated objects
+"""
+
+import unittest
+import os
+from struct import pack
+from slyr.converters.dictionary import DictionaryConverter
+from slyr.parser.stream import BufferStream
+from slyr.parser.object_registry import ObjectRegistry
+from slyr.parser.symbol_parser import read_symbol, read_symbols
+from slyr.parser.intern import InternTable
+from slyr.parser.object import is_frozen, thaw
+from slyr.parser.objects.colors import RgbColor
+from slyr.parser.initalize_registry import initialize_registry
+
+initialize_registry()
+
+STYLES_PATH = os.path.join(os.path.dirname(__file__), 'styles')
+
+
+def symbol_blobs():
+    """
+    Returns a list of all test symbol blobs
+    """
+    blobs = []
+    for group in ('fill_bin', 'line_bin', 'marker_bin', 'ramps_bin'):
+        group_path = os.path.join(STYLES_PATH, group)
+        for fn in sorted(os.listdir(group_path)):
+            with open(os.path.join(group_path, fn), 'rb') as f:
+                blobs.append(f.read())
+    return blobs
+
+
+class TestIntern(unittest.TestCase):
+    """
+    Test interning of repeated objects
+    """
+
+    def test_interned_symbols(self):
+        """
+        Test that symbols parsed with interning match those parsed without
+        """
+        blobs = symbol_blobs()
+        table = InternTable()
+        converter = DictionaryConverter()
+        results = list(read_symbols(blobs, intern_table=table))
+        for blob, result in zip(blobs, results):
+            if result.ok:
+                self.assertEqual(converter.convert_symbol(result.symbol), converter.convert_symbol(read_symbol(blob)))
+        self.assertGreater(len(table), 0)
+        self.assertGreater(table.hits, 0)
+
+    def test_shared_instances(self):
+        """
+        Test that identical colors are shared and immutable
+        """
+        # black rgb color
+        blob = ObjectRegistry.guid_to_bytes(RgbColor.guid()) + b'\x01\x00' + bytes(3) + pack('<3d', 0, 0, 0) + b'\x00\x00'
+        table = InternTable()
+        stream = BufferStream(blob + blob)
+        stream.intern_table = table
+        first = stream.read_object()
+        second = stream.read_object()
+        self.assertEqual(stream.tell(), len(blob) * 2)
+        self.assertIs(first, second)
+        self.assertIsInstance(first, RgbColor)
+        self.assertEqual(first.__class__.__name__, 'RgbColor')
+        self.assertEqual(first.to_dict(), {'R': 0, 'G': 0, 'B': 0, 'dither': False, 'is_null': False})
+        self.assertEqual((table.hits, table.misses), (1, 1))
+
+        self.assertTrue(is_frozen(first))
+        with self.assertRaises(AttributeError):
+            first.red = 255
+        copy = thaw(first)
+        self.assertFalse(is_frozen(copy))
+        copy.red = 255
+        self.assertEqual(copy.to_dict()['R'], 255)
+        self.assertEqual(first.red, 0)
+
+        # full tables decode as normal
+        table = InternTable(max_size=0)
+        stream = BufferStream(blob + blob)
+        stream.intern_table = table
+        self.assertIsNot(stream.read_object(), stream.read_object())
+
+
+if __name__ == '__main__':
+    unittest.main()
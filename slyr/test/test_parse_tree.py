@@ -0,0 +1,83 @@
+"""
+Test parse tree recording
+"""
+
+import unittest
+import os
+from slyr.parser.stream import BufferStream
+from slyr.parser.parse_tree import ParseNode, ParseTree, ParseTreeRecorder
+from slyr.parser.symbol_parser import read_symbol
+from slyr.parser.initalize_registry import initialize_registry
+
+initialize_registry()
+
+STYLES_PATH = os.path.join(os.path.dirname(__file__), 'styles')
+
+
+class TestParseTree(unittest.TestCase):
+    """
+    Test parse tree recording
+    """
+
+    def record(self, file_name: str, keep_objects: bool = False) -> ParseTreeRecorder:
+        """
+        Records the parse tree for a test blob
+        """
+        with open(os.path.join(STYLES_PATH, file_name), 'rb') as f:
+            content = f.read()
+        recorder = ParseTreeRecorder(keep_objects=keep_objects)
+        read_symbol(BufferStream(content, tracer=recorder))
+        self.assertEqual(recorder.tree.root.end, len(content))
+        return recorder
+
+    def test_spans(self):
+        """
+        Test recorded object spans
+        """
+        recorder = self.record('cmyk_bin/C 0 M 0 Y 0 B 100.bin')
+        symbol = recorder.tree.root.children[0]
+        self.assertEqual(symbol.kind, ParseNode.OBJECT)
+        self.assertEqual(symbol.class_name, 'FillSymbol')
+        self.assertEqual(symbol.guid, '7914e604-c892-11d0-8bb6-080009ee4e41')
+        self.assertEqual(symbol.version, 2)
+        self.assertEqual((symbol.start, symbol.end), (0, 232))
+
+        # children must be contiguous and non overlapping
+        for node in recorder.tree.root.walk():
+            position = node.start + (18 if node.kind == ParseNode.OBJECT else 0)
+            for child in node.children:
+                self.assertGreaterEqual(child.start, position)
+                position = child.end
+            if node.children:
+                self.assertLessEqual(position, node.end)
+
+        self.assertIn('CMYKColor', recorder.tree.class_statistics())
+        self.assertIsNone(symbol.children[1].obj)
+
+    def test_attributes(self):
+        """
+        Test resolving attributes for child objects
+        """
+        recorder = self.record('cmyk_bin/C 0 M 0 Y 0 B 100.bin', keep_objects=True)
+        symbol = recorder.tree.root.children[0]
+        layers = [c for c in symbol.children if c.kind == ParseNode.OBJECT and c.class_name.endswith('Layer')]
+        self.assertTrue(layers)
+        self.assertEqual([c.attribute for c in layers], ['levels[{}]'.format(i) for i in range(len(layers))])
+        self.assertIs(layers[0].obj, symbol.obj.levels[0])
+
+    def test_export(self):
+        """
+        Test exporting trees
+        """
+        tree = self.record('cmyk_bin/C 0 M 0 Y 0 B 100.bin').tree
+        self.assertIn('"class": "FillSymbol"', tree.to_json())
+
+        restored = ParseTree.from_bytes(tree.to_bytes())
+        self.assertEqual([(n.kind, n.start, n.end, n.class_name, n.version) for n in restored.root.walk()],
+                         [(n.kind, n.start, n.end, n.class_name, n.version) for n in tree.root.walk()])
+        with self.assertRaises(ValueError):
+            ParseTree.from_bytes(b'xxxx' + tree.to_bytes()[4:])
+
+
+if __name__ == '__main__':
+    unittest.main()
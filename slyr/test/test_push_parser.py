@@ -0,0 +1,99 @@
+"""
+Test incremental parsing
+"""
+
+import unittest
+import os
+from io import BytesIO
+from slyr.bintools.extractor import Extractor
+from slyr.converters.dictionary import DictionaryConverter
+from slyr.parser.exceptions import TruncatedStreamException
+from slyr.parser.push_parser import PushParser, iter_objects
+from slyr.parser.symbol_parser import read_symbol
+from slyr.parser.initalize_registry import initialize_registry
+
+initialize_registry()
+
+STYLES_PATH = os.path.join(os.path.dirname(__file__), 'styles')
+
+BLOBS = [os.path.join(STYLES_PATH, 'fill_bin', 'Picture Fill Circle.bin'),
+         os.path.join(STYLES_PATH, 'cmyk_bin', 'C 0 M 0 Y 0 B 100.bin'),
+         os.path.join(STYLES_PATH, 'line_bin', 'Cartographic line 3 positions flip all.bin')]
+
+
+class TestPushParser(unittest.TestCase):
+    """
+    Test incremental parsing
+    """
+
+    def setUp(self):
+        self.contents = []
+        for file in BLOBS:
+            with open(file, 'rb') as f:
+                self.contents.append(f.read())
+        converter = DictionaryConverter()
+        self.expected = [converter.convert_symbol(read_symbol(c)) for c in self.contents]
+
+    def test_chunks(self):
+        """
+        Test feeding chunks of various sizes
+        """
+        converter = DictionaryConverter()
+        data = b''.join(self.contents)
+        for chunk_size in (1, 7, 100, len(data)):
+            parser = PushParser()
+            symbols = []
+            for i in range(0, len(data), chunk_size):
+                symbols.extend(parser.feed(data[i:i + chunk_size]))
+                # each symbol must be available as soon as its last byte arrives
+                self.assertEqual(len(symbols),
+                                 len([n for n in range(len(self.contents))
+                                      if len(b''.join(self.contents[:n + 1])) <= i + chunk_size]))
+            parser.close()
+            self.assertEqual([converter.convert_symbol(s) for s in symbols], self.expected)
+
+    def test_iter_objects(self):
+        """
+        Test parsing from file handles
+        """
+        converter = DictionaryConverter()
+        symbols = iter_objects(BytesIO(b''.join(self.contents)), chunk_size=64)
+        self.assertEqual([converter.convert_symbol(s) for s in symbols], self.expected)
+
+    def test_truncated(self):
+        """
+        Test closing a parser mid object
+        """
+        parser = PushParser()
+        self.assertEqual(parser.feed(self.contents[1][:-10]), [])
+        self.assertEqual(parser.buffered, len(self.contents[1]) - 10)
+        with self.assertRaises(TruncatedStreamException):
+            parser.close()
+
+        # consumed objects are not counted as buffered
+        parser = PushParser()
+        self.assertEqual(len(parser.feed(self.contents[0] * 3 + self.contents[1][:-10])), 3)
+        self.assertEqual(parser.buffered, len(self.contents[1]) - 10)
+        self.assertEqual(len(parser.feed(self.contents[1][-10:])), 1)
+        self.assertEqual(parser.buffered, 0)
+        parser.close()
+
+    def test_split_records(self):
+        """
+        Test splitting mdb-export output into records
+        """
+        separator = b'arcgissuxxxxxxxxxx'
+        data = separator.join([b'first', b'second record', b'', b'third']) + separator
+        for chunk_size in (1, 5, 17, len(data)):
+            self.assertEqual(list(Extractor.split_records(BytesIO(data), chunk_size)),
+                             [b'first', b'second record', b'third'])
+
+        # long records and records without a final separator
+        data = separator.join([b'x' * 100000, b'short', b'y' * 50000]) + separator + b'last'
+        for chunk_size in (7, 4096):
+            self.assertEqual(list(Extractor.split_records(BytesIO(data), chunk_size)),
+                             [b'x' * 100000, b'short', b'y' * 50000, b'last'])
+
+
+if __name__ == '__main__':
+    unittest.main()
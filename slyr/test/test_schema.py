@@ -0,0 +1,172 @@
+"""
+Test object schemas
+"""
+
+import unittest
+import struct
+from slyr.parser.object import Object
+from slyr.parser.stream import BufferStream
+from slyr.parser.schema import (Field,
+                                Enum,
+                                Constant,
+                                Padding,
+                                Terminator,
+                                Array,
+                                When,
+                                reader_source,
+                                schema_to_markdown)
+from slyr.parser.exceptions import (UnreadableSymbolException,
+                                    TruncatedStreamException)
+from slyr.parser.trace import Tracer, TraceEvent
+
+
+class ExampleObject(Object):
+    """
+    Object for testing schemas
+    """
+
+    __slots__ = ('size', 'style', 'visible', 'positions')
+
+    SCHEMA = [
+        Field('size', 'd'),
+        Enum('style', 'B', {0: 'solid', 1: 'dashed'}),
+        Padding(3),
+        Terminator(required=True),
+        When('version >= 2', [
+            Field('visible', 'B', convert=bool),
+            Constant('H', 0xffff)
+        ]),
+        Array('positions', 'd')
+    ]
+
+    def __init__(self):
+        super().__init__()
+        self.size = 0
+        self.style = None
+        self.visible = None
+        self.positions = []
+
+    @staticmethod
+    def compatible_versions():
+        return [1, 2]
+
+
+class TestSchema(unittest.TestCase):
+    """
+    Test object schemas
+    """
+
+    @staticmethod
+    def encode(style=1, terminator=0x0d, constant=0xffff) -> bytes:
+        """
+        Encodes a version 2 ExampleObject
+        """
+        return (struct.pack('<dB3xI4xBH', 2.5, style, terminator, 1, constant) +
+                struct.pack('<I2d', 2, 0.0, 1.0))
+
+    def test_read(self):
+        """
+        Test reading with a compiled schema
+        """
+        obj = ExampleObject()
+        obj.read(BufferStream(self.encode()), 2)
+        self.assertEqual(obj.size, 2.5)
+        self.assertEqual(obj.style, 'dashed')
+        self.assertIs(obj.visible, True)
+        self.assertEqual(obj.positions, [0.0, 1.0])
+
+        # version 1 skips the conditional block
+        obj = ExampleObject()
+        obj.read(BufferStream(self.encode()[:20] + struct.pack('<I2d', 2, 0.0, 1.0)), 1)
+        self.assertIsNone(obj.visible)
+        self.assertEqual(obj.positions, [0.0, 1.0])
+
+    def test_compiled_on_creation(self):
+        """
+        Test that schemas are compiled when the class is created, without being registered
+        """
+        self.assertIsNot(ExampleObject.read, Object.read)
+        self.assertIsNot(ExampleObject.write, Object.write)
+
+        # skip() must consume the object rather than reading into a discarded default
+        stream = BufferStream(self.encode() + b'\xff')
+        ExampleObject.skip(stream, 2)
+        self.assertEqual(stream.tell(), len(self.encode()))
+
+        with self.assertRaises(UnreadableSymbolException):
+            ExampleObject().read(BufferStream(self.encode()[:10]), 2)
+
+    def test_runs(self):
+        """
+        Test that contiguous fixed size fields are read with a single struct
+        """
+
+        class StructCounter(Tracer):
+            """
+            Collects struct events
+            """
+
+            def __init__(self):
+                self.formats = []
+
+            def event(self, event: TraceEvent):
+                if event.kind == TraceEvent.STRUCT:
+                    self.formats.append(event.size)
+
+        counter = StructCounter()
+        ExampleObject().read(BufferStream(self.encode(), tracer=counter), 2)
+        # size/style/padding/terminator, visible/constant, then the array
+        self.assertEqual(counter.formats, [20, 3, 16])
+        self.assertEqual(reader_source(ExampleObject)[0].count('stream.read_struct'), 3)
+
+    def test_padding_run(self):
+        """
+        Test that runs containing only padding are skipped with bounds checks
+        """
+
+        class PaddedObject(Object):
+            """
+            Object ending with padding
+            """
+
+            __slots__ = ('positions',)
+
+            SCHEMA = [
+                Array('positions', 'd'),
+                Padding(4)
+            ]
+
+            def __init__(self):
+                super().__init__()
+                self.positions = []
+
+        self.assertIn('stream.skip(4)', reader_source(PaddedObject)[0])
+        encoded = struct.pack('<Id4x', 1, 2.0)
+        stream = BufferStream(encoded)
+        PaddedObject().read(stream, 1)
+        self.assertEqual(stream.tell(), len(encoded))
+        with self.assertRaises(TruncatedStreamException):
+            PaddedObject().read(BufferStream(encoded[:-1]), 1)
+
+    def test_errors(self):
+        """
+        Test validation of read values
+        """
+        with self.assertRaises(UnreadableSymbolException):
+            ExampleObject().read(BufferStream(self.encode(style=5)), 2)
+        with self.assertRaises(UnreadableSymbolException):
+            ExampleObject().read(BufferStream(self.encode(terminator=0)), 2)
+        with self.assertRaises(UnreadableSymbolException):
+            ExampleObject().read(BufferStream(self.encode(constant=0)), 2)
+
+    def test_markdown(self):
+        """
+        Test generating documentation from schemas
+        """
+        docs = schema_to_markdown(ExampleObject)
+        self.assertIn('| style | uint8 | style | 0: solid, 1: dashed |', docs)
+        self.assertIn('*if version >= 2*', docs)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Test serialization of parsed object trees
+"""
+
+import unittest
+import os
+import pickle
+from slyr.parser.symbol_parser import read_symbol, read_symbols
+from slyr.parser.objects.colors import RgbColor
+from slyr.parser.objects.picture import BmpPicture
+from slyr.parser.fingerprint import fingerprint
+from slyr.parser.intern import InternTable
+from slyr.parser.object import is_frozen
+from slyr.parser.serialization import dumps, loads
+from slyr.parser.initalize_registry import initialize_registry
+
+initialize_registry()
+
+STYLES_PATH = os.path.join(os.path.dirname(__file__), 'styles')
+
+
+class TestSerialization(unittest.TestCase):
+    """
+    Test serialization of parsed object trees
+    """
+
+    def test_round_trip(self):
+        """
+        Test that serialized symbols are restored unchanged
+        """
+        for folder in ('line_bin', 'fill_bin', 'marker_bin'):
+            blobs = []
+            for fn in sorted(os.listdir(os.path.join(STYLES_PATH, folder))):
+                with open(os.path.join(STYLES_PATH, folder, fn), 'rb') as f:
+                    blobs.append(f.read())
+            for result in read_symbols(blobs, on_error='skip'):
+                restored = loads(dumps(result.symbol))
+                self.assertEqual(restored.__class__, result.symbol.__class__)
+                self.assertEqual(fingerprint(restored), fingerprint(result.symbol))
+
+    def test_buffers(self):
+        """
+        Test out-of-band buffers for binary content
+        """
+        symbol = read_symbol(os.path.join(STYLES_PATH, 'fill_bin', 'Picture Fill Circle.bin'))
+        picture = symbol.levels[0].picture
+        self.assertIsInstance(picture, BmpPicture)
+
+        buffers = []
+        data = dumps(symbol, buffers)
+        self.assertEqual(len(buffers), 1)
+        self.assertLess(len(data), len(dumps(symbol)))
+        with self.assertRaises(ValueError):
+            loads(data)
+        restored = loads(data, buffers)
+        self.assertEqual(restored.levels[0].picture.content, picture.content)
+        self.assertEqual(fingerprint(restored), fingerprint(symbol))
+
+    def test_shared(self):
+        """
+        Test that shared and interned objects are restored as shared, immutable objects
+        """
+        path = os.path.join(STYLES_PATH, 'line_bin', 'Two levels.bin')
+        with open(path, 'rb') as f:
+            blob = f.read()
+        table = InternTable()
+        symbol = next(read_symbols([blob], intern_table=table)).symbol
+        color = symbol.levels[0].color
+        self.assertTrue(is_frozen(color))
+
+        restored = loads(dumps(symbol))
+        self.assertTrue(is_frozen(restored.levels[0].color))
+        with self.assertRaises(AttributeError):
+            restored.levels[0].color.red = 5
+
+        color = RgbColor()
+        symbol.levels[0].color = color
+        symbol.levels[1].color = color
+        restored = loads(dumps(symbol))
+        self.assertIs(restored.levels[0].color, restored.levels[1].color)
+        self.assertFalse(is_frozen(restored.levels[0].color))
+
+    def test_pickle(self):
+        """
+        Test pickling parsed symbols
+        """
+        symbol = read_symbol(os.path.join(STYLES_PATH, 'fill_bin', 'Picture Fill Circle.bin'))
+        for protocol in (2, pickle.HIGHEST_PROTOCOL):
+            restored = pickle.loads(pickle.dumps(symbol, protocol=protocol))
+            self.assertEqual(fingerprint(restored), fingerprint(symbol))
+
+        if pickle.HIGHEST_PROTOCOL >= 5:
+            buffers = []
+            data = pickle.dumps(symbol, protocol=5, buffer_callback=buffers.append)
+            self.assertEqual(len(buffers), 1)
+            restored = pickle.loads(data, buffers=buffers)
+            self.assertEqual(fingerprint(restored), fingerprint(symbol))
+
+    def test_invalid(self):
+        """
+        Test that invalid data is rejected
+        """
+        data = dumps(RgbColor())
+        with self.assertRaises(ValueError):
+            loads(b'XXXX' + data[4:])
+        with self.assertRaises(ValueError):
+            loads(data[:4] + b'\xff' + data[5:])
+        with self.assertRaises(ValueError):
+            loads(data.replace(b'slyr.parser.objects.colors', b'xxxx.parser.objects.colors'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,461 @@
+"""
+Test binary streams
+"""
+
+import unittest
+import os
+import random
+import subprocess
+import sys
+from io import BytesIO
+from slyr.converters.dictionary import DictionaryConverter
+from slyr.parser.stream import Stream, BufferStream, WriterStream, RetainedFields, ParseLimits
+from slyr.parser.symbol_parser import read_symbol, read_symbols, write_symbol, PARSE_EXCEPTIONS
+from slyr.parser.exceptions import (UnreadableSymbolException,
+                                    InvalidColorException,
+                                    NotImplementedException,
+                                    ParseLimitException,
+                                    TruncatedStreamException)
+from slyr.parser.fingerprint import fingerprint
+from slyr.parser.object import Object, lazy_handle
+from slyr.parser.trace import Tracer, TraceEvent, PrintTracer
+from slyr.parser.initalize_registry import initialize_registry
+
+initialize_registry()
+
+STYLES_PATH = os.path.join(os.path.dirname(__file__), 'styles')
+
+
+def symbol_blobs():
+    """
+    Returns a list of paths to all test symbol blobs
+    """
+    blobs = []
+    for group in sorted(os.listdir(STYLES_PATH)):
+        group_path = os.path.join(STYLES_PATH, group)
+        if not os.path.isdir(group_path) or group == 'colors_bin':
+            continue
+        for fn in sorted(os.listdir(group_path)):
+            blobs.append(os.path.join(group_path, fn))
+    return blobs
+
+
+class TestStream(unittest.TestCase):
+    """
+    Test stream reading
+    """
+
+    DATA = (b'\x07'  # uchar
+            b'\x00\x00\x00\x00\x00\x00\xf0\x3f'  # double 1.0
+            b'\x02\x01\x00\x00'  # int 258
+            b'\x03\x00'  # ushort
+            b'\x06\x00\x00\x00a\x00b\x00\x00\x00')  # string 'ab'
+
+    def check_primitives(self, stream: Stream):
+        """
+        Checks reading primitives from a stream containing DATA
+        """
+        self.assertEqual(stream.read_uchar(), 7)
+        self.assertEqual(stream.read_double(), 1.0)
+        self.assertEqual(stream.tell(), 9)
+        self.assertEqual(stream.read_int(), 258)
+        stream.rewind(4)
+        self.assertEqual(stream.read_uint(), 258)
+        self.assertEqual(stream.read_ushort(), 3)
+        self.assertEqual(stream.read_string(), 'ab')
+        self.assertEqual(stream.tell(), len(self.DATA))
+        stream.seek(1)
+        self.assertEqual(stream.read(8), b'\x00\x00\x00\x00\x00\x00\xf0\x3f')
+
+    def test_file_stream(self):
+        """
+        Test reading primitives from a file handle
+        """
+        self.check_primitives(Stream(BytesIO(self.DATA)))
+
+    def test_buffer_stream(self):
+        """
+        Test reading primitives from in memory buffers
+        """
+        self.check_primitives(BufferStream(self.DATA))
+        self.check_primitives(BufferStream(bytearray(self.DATA)))
+        self.check_primitives(BufferStream(memoryview(self.DATA)))
+
+    def test_buffer_stream_truncated(self):
+        """
+        Test reading past the end of a buffer
+        """
+        stream = BufferStream(b'\x01\x00')
+        self.assertEqual(stream.read(4), b'\x01\x00')
+        self.assertEqual(stream.tell(), 2)
+        stream.seek(0)
+        with self.assertRaises(Exception):
+            stream.read_double()
+
+    def test_buffer_stream_symbols(self):
+        """
+        Test that symbols parsed from buffers match those parsed from files
+        """
+        converter = DictionaryConverter()
+        for file in symbol_blobs():
+            with open(file, 'rb') as f:
+                content = f.read()
+                f.seek(0)
+                try:
+                    expected = converter.convert_symbol(read_symbol(f))
+                except Exception as e:  # pylint: disable=broad-except
+                    with self.assertRaises(e.__class__):
+                        read_symbol(content)
+                    continue
+            self.assertEqual(converter.convert_symbol(read_symbol(content)), expected, file)
+
+    def test_read_symbols(self):
+        """
+        Test bulk parsing of blobs
+        """
+        converter = DictionaryConverter()
+        blobs = []
+        for file in symbol_blobs()[:20]:
+            with open(file, 'rb') as f:
+                blobs.append(f.read())
+        blobs.insert(3, b'\x01\x02')
+
+        results = list(read_symbols(blobs))
+        self.assertEqual([r.index for r in results], list(range(len(blobs))))
+        self.assertFalse(results[3].ok)
+        self.assertIsInstance(results[3].error, UnreadableSymbolException)
+        for blob, result in zip(blobs, results):
+            if result.ok:
+                self.assertEqual(converter.convert_symbol(result.symbol), converter.convert_symbol(read_symbol(blob)))
+                self.assertGreater(result.elapsed, 0)
+
+        self.assertEqual([r.index for r in read_symbols(blobs, on_error='skip')],
+                         [r.index for r in results if r.ok])
+        with self.assertRaises(UnreadableSymbolException):
+            list(read_symbols(blobs, on_error='raise'))
+
+    def test_read_symbols_corrupt(self):
+        """
+        Test that errors in truncated and corrupted blobs are always collected
+        """
+        rng = random.Random(0)
+        blobs = []
+        for file in symbol_blobs():
+            with open(file, 'rb') as f:
+                blob = f.read()
+            for _ in range(5):
+                blobs.append(blob[:rng.randrange(len(blob))])
+            for _ in range(10):
+                corrupt = bytearray(blob)
+                for _ in range(rng.randint(1, 4)):
+                    pos = rng.randrange(len(corrupt) - 4)
+                    corrupt[pos:pos + 4] = rng.choice((b'\xff\xff\xff\xff', b'\x00\x00\x00\x80', b'\x00\x00\xf8\x7f',
+                                                       bytes(rng.randrange(256) for _ in range(4))))
+                blobs.append(bytes(corrupt))
+
+        for lazy in (False, True):
+            results = list(read_symbols(blobs, lazy=lazy))
+            self.assertEqual(len(results), len(blobs))
+            for result in results:
+                if not result.ok:
+                    self.assertIsInstance(result.error, PARSE_EXCEPTIONS)
+
+    def test_path_stream(self):
+        """
+        Test parsing over memory mapped files
+        """
+        file = os.path.join(STYLES_PATH, 'fill_bin', 'Picture Fill Circle.bin')
+        with open(file, 'rb') as f:
+            content = f.read()
+        with Stream.from_path(file) as stream:
+            symbol = stream.read_object()
+            self.assertEqual(stream.tell(), len(content))
+
+        # picture content is a view of the closed mapping until requested
+        picture = symbol.levels[0].picture
+        self.assertIsInstance(picture._content, memoryview)  # pylint: disable=protected-access
+        self.assertIsInstance(picture.content, bytes)
+        self.assertIn(picture.content, content)
+
+        self.assertEqual(DictionaryConverter().convert_symbol(read_symbol(file)),
+                         DictionaryConverter().convert_symbol(read_symbol(content)))
+
+    def test_trace_events(self):
+        """
+        Test structured trace events
+        """
+
+        class RecordingTracer(Tracer):
+            """
+            Collects trace events
+            """
+
+            def __init__(self):
+                self.events = []
+
+            def event(self, event: TraceEvent):
+                self.events.append(event)
+
+        tracer = RecordingTracer()
+        stream = BufferStream(self.DATA, tracer=tracer)
+        self.assertTrue(stream.debug)
+        stream.read_uchar('first')
+        stream.read_double('second {}')
+        stream.read_int()
+        stream.log('value {} of {}', 1, 2, offset=4)
+        self.assertEqual([e.kind for e in tracer.events],
+                         [TraceEvent.UCHAR, TraceEvent.DOUBLE, TraceEvent.INT, TraceEvent.MESSAGE])
+        self.assertEqual([e.label for e in tracer.events], ['first', 'second {}', '', 'value 1 of 2'])
+        self.assertEqual([(e.offset, e.end) for e in tracer.events], [(0, 1), (1, 9), (9, 13), (9, 13)])
+        self.assertEqual(tracer.events[1].value, 1.0)
+
+        # disabling debug output keeps a caller's tracer
+        stream.debug = False
+        self.assertIs(stream.tracer, tracer)
+        stream.tracer = None
+        stream.read_ushort('not traced')
+        self.assertEqual(len(tracer.events), 4)
+
+        # ...but removes the console tracer
+        stream = BufferStream(self.DATA, debug=True)
+        self.assertIsInstance(stream.tracer, PrintTracer)
+        stream.debug = False
+        self.assertIsNone(stream.tracer)
+        stream.debug = True
+        self.assertIsInstance(stream.tracer, PrintTracer)
+        stream.debug = False
+        self.assertIsNone(stream.tracer)
+
+    def test_writer_stream(self):
+        """
+        Test writing primitives
+        """
+        stream = WriterStream()
+        stream.write_uchar(7)
+        stream.write_double(1.0)
+        stream.write_int(258)
+        stream.write_ushort(3)
+        stream.write_string('ab')
+        self.assertEqual(stream.getvalue(), self.DATA)
+        self.assertEqual(stream.tell(), len(self.DATA))
+        self.check_primitives(BufferStream(stream.getvalue()))
+
+    def test_write_round_trip(self):
+        """
+        Test that symbols read with retained fields are written back unchanged
+        """
+        # blobs containing trailing bytes which are not read by the parser
+        trailing = ('Picture Fill Version 4.bin', 'Picture Marker Version 5.bin', 'color_symbol_blue_band_3.bin',
+                    'color_symbol_green_band_2.bin', 'color_symbol_red_band_1.bin')
+        colors_path = os.path.join(STYLES_PATH, 'colors_bin')
+        colors = [os.path.join(colors_path, fn) for fn in sorted(os.listdir(colors_path))]
+        for file in symbol_blobs() + colors:
+            with open(file, 'rb') as f:
+                blob = f.read()
+            retained = RetainedFields()
+            stream = BufferStream(blob)
+            stream.retained = retained
+            try:
+                symbol = stream.read_object()
+            except PARSE_EXCEPTIONS + (InvalidColorException,):
+                continue
+            if os.path.basename(file) in trailing:
+                blob = blob[:stream.tell()]
+            self.assertEqual(write_symbol(symbol, retained), blob, file)
+
+    def test_write_unregistered(self):
+        """
+        Test writing hand built symbols in a fresh process, before any classes are registered
+        """
+        script = '\n'.join([
+            'import sys',
+            'from slyr.parser.symbol_parser import LineSymbol, write_symbol',
+            'from slyr.parser.objects.line_symbol_layer import SimpleLineSymbolLayer',
+            'from slyr.parser.objects.colors import RgbColor',
+            'layer = SimpleLineSymbolLayer()',
+            'layer.color = RgbColor()',
+            'layer.color.red = 200',
+            'layer.width = 2.5',
+            "layer.line_type = 'dashed'",
+            'symbol = LineSymbol()',
+            'symbol.levels.append(layer)',
+            'sys.stdout.write(write_symbol(symbol).hex())'])
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        blob = bytes.fromhex(subprocess.check_output([sys.executable, '-c', script], cwd=root).decode())
+
+        layer = read_symbol(blob).levels[0]
+        self.assertEqual(layer.color.red, 200)
+        self.assertEqual(layer.width, 2.5)
+        self.assertEqual(layer.line_type, 'dashed')
+
+        # objects with content but no writer are not silently dropped
+        class Unwritable(Object):
+            """
+            Object without a writer
+            """
+            __slots__ = ('value',)
+
+            @staticmethod
+            def guid():
+                return '00000000-0000-0000-0000-000000000001'
+
+        with self.assertRaises(NotImplementedException):
+            write_symbol(Unwritable())
+
+    def test_write_defaults(self):
+        """
+        Test writing symbols without retained fields
+        """
+        for file in ('line_bin/Cartographic line 3 positions flip all.bin',
+                     'fill_bin/Picture Fill Version 8 3.bin',
+                     'fill_bin/Gradient fill buffered.bin',
+                     'marker_bin/Character marker R255 G0 B0.bin'):
+            symbol = read_symbol(os.path.join(STYLES_PATH, file))
+            written = read_symbol(write_symbol(symbol))
+            self.assertEqual(fingerprint(written), fingerprint(symbol), file)
+
+        # modified properties are written, even if fields were retained
+        retained = RetainedFields()
+        stream = BufferStream(write_symbol(symbol))
+        stream.retained = retained
+        symbol = stream.read_object()
+        symbol.levels[0].color.red = 200
+        symbol.levels[0].enabled = False
+        written = read_symbol(write_symbol(symbol, retained))
+        self.assertEqual(written.levels[0].color.red, 200)
+        self.assertFalse(written.levels[0].enabled)
+
+    def test_skip_object(self):
+        """
+        Test that skipping an object consumes the same bytes as reading it
+        """
+        for file in symbol_blobs():
+            with open(file, 'rb') as f:
+                blob = f.read()
+            stream = BufferStream(blob)
+            try:
+                symbol = stream.read_object()
+            except PARSE_EXCEPTIONS + (InvalidColorException,):
+                continue
+            end = stream.tell()
+
+            stream = BufferStream(blob)
+            self.assertIs(stream.skip_object(), symbol.__class__, file)
+            self.assertEqual(stream.tell(), end, file)
+
+        with self.assertRaises(TruncatedStreamException):
+            BufferStream(b'').skip(1)
+
+        with open(os.path.join(STYLES_PATH, 'line_bin', 'Two levels.bin'), 'rb') as f:
+            blob = f.read()
+        # skipped objects count towards the object limit
+        stream = BufferStream(blob)
+        stream.limits = ParseLimits(max_objects=3)
+        with self.assertRaises(ParseLimitException) as e:
+            stream.skip_object()
+        self.assertEqual(e.exception.limit, 'max_objects')
+        self.assertEqual(stream.debug_depth, 0)
+
+        # the nesting depth is restored when skipping fails
+        stream = BufferStream(blob[:len(blob) // 2])
+        with self.assertRaises(UnreadableSymbolException):
+            stream.skip_object()
+        self.assertEqual(stream.debug_depth, 0)
+
+        # ...and when reading fails, along with the object being retained
+        stream = BufferStream(blob[:len(blob) // 2])
+        stream.retained = RetainedFields()
+        with self.assertRaises(UnreadableSymbolException):
+            stream.read_object()
+        self.assertEqual(stream.debug_depth, 0)
+        self.assertEqual(stream._retaining, [])  # pylint: disable=protected-access
+
+    def test_lazy(self):
+        """
+        Test that lazily decoded symbols are identical to eagerly decoded symbols
+        """
+        for file in symbol_blobs():
+            with open(file, 'rb') as f:
+                blob = f.read()
+            try:
+                symbol = read_symbol(blob)
+            except PARSE_EXCEPTIONS + (InvalidColorException,):
+                continue
+            stream = BufferStream(blob)
+            stream.lazy = True
+            lazy_symbol = stream.read_object()
+            self.assertEqual(fingerprint(lazy_symbol), fingerprint(symbol), file)
+            self.assertEqual(DictionaryConverter().convert_symbol(lazy_symbol),
+                             DictionaryConverter().convert_symbol(symbol), file)
+
+        with open(os.path.join(STYLES_PATH, 'fill_bin', 'Picture Fill Version 8 3.bin'), 'rb') as f:
+            blob = f.read()
+        stream = BufferStream(blob)
+        stream.lazy = True
+        layer = stream.read_object().levels[0]
+        handle = lazy_handle(layer, 'picture')
+        self.assertEqual(handle.guid, '0be35204-8f91-11ce-9de3-00aa004bb851')
+        self.assertGreater(handle.length, 0)
+        self.assertIsNone(lazy_handle(layer, 'color_foreground'))
+        picture = layer.picture
+        self.assertIs(picture.__class__, handle.object_class)
+        self.assertIs(layer.picture, picture)
+        self.assertIsNone(lazy_handle(layer, 'picture'))
+
+        # traced streams always decode objects immediately
+        stream = BufferStream(blob, tracer=Tracer())
+        stream.lazy = True
+        self.assertIsNone(lazy_handle(stream.read_object().levels[0], 'picture'))
+
+    def test_parse_limits(self):
+        """
+        Test resource limits for parsing
+        """
+        # a string length of 4GB is rejected before reading
+        stream = Stream(BytesIO(b'\xff\xff\xff\xff' + b'\x00' * 16))
+        with self.assertRaises(ParseLimitException) as e:
+            stream.read_string()
+        self.assertEqual(e.exception.limit, 'max_allocation')
+        self.assertEqual(e.exception.value, 0xffffffff)
+        self.assertEqual(stream.tell(), 4)
+
+        # negative (signed) lengths are rejected rather than read as "until the end"
+        for stream in (Stream(BytesIO(b'\xff\xff\xff\xff' + b'\x00' * 16)),
+                       BufferStream(b'\xff\xff\xff\xff' + b'\x00' * 16)):
+            with self.assertRaises(UnreadableSymbolException):
+                stream.read_embedded_file()
+            for method in (stream.read, stream.read_view, stream.skip):
+                with self.assertRaises(UnreadableSymbolException):
+                    method(-1)
+
+        with open(os.path.join(STYLES_PATH, 'line_bin', 'Two levels.bin'), 'rb') as f:
+            blob = f.read()
+
+        # corrupt layer count
+        corrupt = blob[:26] + b'\xff\xff\xff\x7f' + blob[30:]
+        with self.assertRaises(ParseLimitException) as e:
+            read_symbol(corrupt)
+        self.assertEqual(e.exception.limit, 'max_objects')
+
+        for limits, limit in ((ParseLimits(max_depth=1), 'max_depth'),
+                              (ParseLimits(max_objects=3), 'max_objects')):
+            stream = BufferStream(blob)
+            stream.limits = limits
+            with self.assertRaises(ParseLimitException) as e:
+                stream.read_object()
+            self.assertEqual(e.exception.limit, limit)
+
+        # limits apply to each blob separately
+        limits = ParseLimits(max_objects=5)
+        results = list(read_symbols([blob, blob, corrupt], limits=limits))
+        self.assertEqual([r.ok for r in results], [True, True, False])
+        self.assertIsInstance(results[2].error, ParseLimitException)
+
+        with open(os.path.join(STYLES_PATH, 'fill_bin', 'Picture Fill Circle.bin'), 'rb') as f:
+            blob = f.read()
+        results = list(read_symbols([blob], limits=ParseLimits(max_allocation=1024)))
+        self.assertEqual(results[0].error.limit, 'max_allocation')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -50,12 +50,10 @@ class TestStyleColorParser(unittest.TestCase):
             group, symbol_name = os.path.split(file)
             path, group = os.path.split(group)
 
-            with open(file, 'rb') as f:
-                expected_symbol = expected[group][symbol_name]
-                if 'skip' in expected_symbol:
-                    continue
-                stream = Stream(f, debug=False)
-
+            expected_symbol = expected[group][symbol_name]
+            if 'skip' in expected_symbol:
+                continue
+            with Stream.from_path(file) as stream:
                 color = stream.read_object()
 
                 self.assertEqual(color.to_dict(), expected_symbol['color'])
@@ -6,10 +6,21 @@ Test symbol parsing
 
 import unittest
 import os
+import binascii
+import struct
+import subprocess
+import sys
 from slyr.converters.dictionary import DictionaryConverter
 from slyr.parser.symbol_parser import read_symbol
 from slyr.parser.object_registry import ObjectRegistry
-from slyr.parser.initalize_registry import initialize_registry
+from slyr.parser.symbol_parser import FillSymbol, sniff_symbol
+from slyr.parser.objects.line_template import LineTemplate
+from slyr.parser.objects.colors import Color
+from slyr.parser.objects.ramps import ColorRamp
+from slyr.parser.object import walk
+from slyr.parser.objects.picture import BmpPicture, EmfPicture
+from slyr.parser.exceptions import NotImplementedException, UnknownGuidException
+from slyr.parser.initalize_registry import initialize_registry, KNOWN_OBJECTS
 
 expected = {
     'marker_bin':
@@ -15910,15 +15921,14 @@ class TestSymbolParser(unittest.TestCase):
             group, symbol_name = os.path.split(file)
             path, group = os.path.split(group)
 
-            with open(file, 'rb') as f:
-                expected_symbol = expected[group][symbol_name]
-                if 'skip' in expected_symbol:
-                    continue
-                symbol = read_symbol(f, debug=False)
+            expected_symbol = expected[group][symbol_name]
+            if 'skip' in expected_symbol:
+                continue
+            symbol = read_symbol(file, debug=False)
 
-                converter = DictionaryConverter()
-                self.assertEqual(converter.convert_symbol(
-                    symbol), expected_symbol)
+            converter = DictionaryConverter()
+            self.assertEqual(converter.convert_symbol(
+                symbol), expected_symbol)
 
     def test_lines(self):
         """
@@ -15986,6 +15996,118 @@ class TestSymbolParser(unittest.TestCase):
                          '7914e603-c892-11d0-8bb6-080009ee4e41')
         self.assertEqual(ObjectRegistry.hex_to_guid(b'f5883d531a0ad211b27f0000f878229e'),
                          '533d88f5-0a1a-11d2-b27f-0000f878229e')
+        self.assertEqual(ObjectRegistry.guid_to_bytes('7914e603-c892-11d0-8bb6-080009ee4e41'),
+                         binascii.unhexlify(b'03e6147992c8d0118bb6080009ee4e41'))
+        self.assertEqual(ObjectRegistry.bytes_to_guid(binascii.unhexlify(b'f5883d531a0ad211b27f0000f878229e')),
+                         '533d88f5-0a1a-11d2-b27f-0000f878229e')
+
+    def test_sniff(self):
+        """
+        Test shallow symbol parsing
+        """
+        path = os.path.join(os.path.dirname(__file__), 'styles')
+        for group in ('fill_bin', 'line_bin', 'marker_bin'):
+            for fn in os.listdir(os.path.join(path, group)):
+                file = os.path.join(path, group, fn)
+                with open(file, 'rb') as f:
+                    content = f.read()
+                try:
+                    symbol = read_symbol(content)
+                except Exception:  # pylint: disable=broad-except
+                    continue
+                summary = sniff_symbol(content)
+                self.assertEqual(summary.class_name, symbol.__class__.__name__, file)
+                self.assertEqual(summary.guid, symbol.guid())
+                self.assertEqual(summary.layer_guids, [layer.guid() for layer in symbol.levels], file)
+
+        # null layers
+        with open(os.path.join(path, 'line_bin', 'Cartographic line 3 positions flip all.bin'), 'rb') as f:
+            header = f.read(26)
+        summary = sniff_symbol(header + struct.pack('<I', 2) + bytes(32))
+        self.assertEqual(summary.class_name, 'LineSymbol')
+        self.assertEqual(summary.layer_guids, [None, None])
+
+    def test_clsid_dispatch(self):
+        """
+        Test creating objects from raw CLSIDs
+        """
+        registry = ObjectRegistry()
+        registry.register(FillSymbol)
+        self.assertIsInstance(registry.create_object_from_clsid(
+            binascii.unhexlify(b'04e6147992c8d0118bb6080009ee4e41')), FillSymbol)
+        self.assertIsNone(registry.create_object_from_clsid(bytes(16)))
+        with self.assertRaises(NotImplementedException):
+            registry.create_object_from_clsid(ObjectRegistry.guid_to_bytes('8d738780-c069-42e0-9dfa-2b7b61707ba9'))
+        with self.assertRaisesRegex(UnknownGuidException, '7914e603-c892-11d0-8bb6-080009ee4e41'):
+            registry.create_object_from_clsid(binascii.unhexlify(b'03e6147992c8d0118bb6080009ee4e41'))
+
+    def test_walk(self):
+        """
+        Test walking object trees
+        """
+        symbol = read_symbol(os.path.join(os.path.dirname(__file__), 'styles', 'fill_bin',
+                                          'Gradient fill Intervals 13 Percent 14 Angle 15.bin'))
+        steps = list(walk(symbol))
+        self.assertEqual([(s.obj.__class__.__name__, s.path) for s in steps],
+                         [('FillSymbol', ()),
+                          ('GradientFillSymbolLayer', (('levels', 0),)),
+                          ('SimpleLineSymbolLayer', (('levels', 0), 'outline_layer')),
+                          ('RgbColor', (('levels', 0), 'outline_layer', 'color')),
+                          ('AlgorithmicColorRamp', (('levels', 0), 'ramp')),
+                          ('HSVColor', (('levels', 0), 'ramp', 'color1')),
+                          ('HSVColor', (('levels', 0), 'ramp', 'color2'))])
+        self.assertIsNone(steps[0].parent)
+        self.assertIs(steps[3].parent, steps[2].obj)
+        self.assertEqual(symbol.levels[0].children(),
+                         [symbol.levels[0].outline_layer, symbol.levels[0].ramp])
+
+        self.assertEqual([s.obj.__class__.__name__ for s in walk(symbol, depth_first=False)],
+                         ['FillSymbol', 'GradientFillSymbolLayer', 'SimpleLineSymbolLayer', 'AlgorithmicColorRamp',
+                          'RgbColor', 'HSVColor', 'HSVColor'])
+        self.assertEqual([s.path for s in walk(symbol, types=Color, include_root=False)],
+                         [s.path for s in steps[3:4] + steps[5:]])
+        # early exit
+        self.assertIs(next(walk(symbol, ColorRamp)).obj, symbol.levels[0].ramp)
+
+    def test_slots(self):
+        """
+        Test that parsed objects do not carry a per-instance __dict__
+        """
+        registry = ObjectRegistry()
+        initialize_registry(registry)
+        registry.load_all()
+        for object_class in list(registry.objects.values()) + [BmpPicture, EmfPicture]:
+            self.assertFalse(hasattr(object_class(), '__dict__'), object_class.__name__)
+
+        template = LineTemplate()
+        template.pattern_parts = [[2, 1], [0.5, 3]]
+        self.assertEqual(template.pattern_parts, [(2.0, 1.0), (0.5, 3.0)])
+
+    def test_lazy_registry(self):
+        """
+        Test that object modules are only imported when first required
+        """
+        registry = ObjectRegistry()
+        for guid, module, class_name in KNOWN_OBJECTS:
+            registry.register_lazy(guid, module, class_name)
+        self.assertEqual(registry.objects, {})
+        self.assertIsInstance(registry.create_object_from_clsid(
+            binascii.unhexlify(b'04e6147992c8d0118bb6080009ee4e41')), FillSymbol)
+        self.assertEqual(list(registry.objects), ['7914e604-c892-11d0-8bb6-080009ee4e41'])
+        registry.load_all()
+        self.assertEqual(sorted(registry.objects), sorted(guid for guid, _, _ in KNOWN_OBJECTS))
+        for guid, object_class in registry.objects.items():
+            self.assertEqual(object_class.guid(), guid)
+
+        # in a fresh interpreter, initializing the registry must not import object modules or the color table
+        modules = subprocess.check_output([sys.executable, '-c',
+                                           'import sys\n'
+                                           'from slyr.parser.initalize_registry import initialize_registry\n'
+                                           'initialize_registry()\n'
+                                           'print(sorted(sys.modules))'], universal_newlines=True)
+        self.assertNotIn('slyr.parser.color_lut', modules)
+        self.assertNotIn('slyr.parser.objects.ramps', modules)
+        self.assertNotIn('slyr.parser.objects.colors', modules)
 
 
 if __name__ == '__main__':
@@ -9,8 +9,10 @@ import pprint
 from io import BytesIO
 
 from slyr.parser.symbol_parser import read_symbol
+from slyr.parser.stream import Stream
+from slyr.parser.parse_tree import ParseTreeRecorder
 from slyr.converters.dictionary import DictionaryConverter
-from slyr.bintools.scanner import SCANNERS
+from slyr.bintools.scanner import SCANNERS, matches_from_parse_tree
 
 from slyr.parser.initalize_registry import initialize_registry
 
@@ -20,6 +22,8 @@ parser = argparse.ArgumentParser()
 parser.add_argument("file", help="bin file to parse")
 parser.add_argument('--debug', help='Debug mode', action='store_true')
 parser.add_argument('--scan', help='Scan mode', action='store_true')
+parser.add_argument('--brute-force', help='Scan every offset, instead of using parse results', action='store_true')
+parser.add_argument('--tree', help='Export parse tree to file (.json, or compact binary otherwise)')
 
 args = parser.parse_args()
 
@@ -32,6 +36,16 @@ if args.scan:
     with open(args.file, 'rb') as f:
         data = BytesIO(f.read())
 
+    parse_matches = None
+    if not args.brute_force:
+        recorder = ParseTreeRecorder(keep_objects=True)
+        try:
+            with Stream.from_path(args.file, tracer=recorder) as stream:
+                read_symbol(stream)
+            parse_matches = matches_from_parse_tree(recorder.tree)
+        except Exception as e:  # nopep8, pylint: disable=broad-except
+            print('Could not parse file ({}), falling back to brute force scan'.format(e))
+
     with data as f:
         f.seek(0, 2)
         length_file = f.tell()
@@ -41,7 +55,14 @@ if args.scan:
         scan_results_array = [None] * length_file
         scan_results = []
 
-        while True:
+        if parse_matches is not None:
+            for res in parse_matches:
+                scan_results.append(res)
+                for i in range(res.match_start, min(res.match_end, length_file)):
+                    if scan_results_array[i] is None or scan_results_array[i].precedence() < res.precedence():
+                        scan_results_array[i] = res
+
+        while parse_matches is None:
 
             for s in SCANNERS:
                 res = s.scan(f)
@@ -91,8 +112,17 @@ if args.scan:
 
     print('Scanning complete\n\n\n')
 
-with open(args.file, 'rb') as f:
-    symbol = read_symbol(f, debug=args.debug)
+if args.tree:
+    recorder = ParseTreeRecorder()
+    with Stream.from_path(args.file, tracer=recorder) as stream:
+        read_symbol(stream)
+    with open(args.tree, 'wb') as f:
+        if args.tree.lower().endswith('.json'):
+            f.write(recorder.tree.to_json(indent=2).encode('utf-8'))
+        else:
+            f.write(recorder.tree.to_bytes())
+
+symbol = read_symbol(args.file, debug=args.debug)
 
 converter = DictionaryConverter()
 pprint.pprint(converter.convert_symbol(symbol))
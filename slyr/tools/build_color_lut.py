@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+
+"""
+Builds the binary color lookup table (color_lut.bin) from a table of CIELAB to RGB
+overrides, given either as a Python source file assigning a dictionary literal to
+COLOR_LUT, or as a CSV file of l,a,b,r,g,b rows
+"""
+
+import argparse
+import ast
+import csv
+from slyr.parser.color_lut import write_table, TABLE_PATH
+
+parser = argparse.ArgumentParser()
+parser.add_argument('source', help='Python or CSV file containing the lookup table entries')
+parser.add_argument('destination', nargs='?', default=TABLE_PATH, help='table file to write')
+args = parser.parse_args()
+
+if args.source.lower().endswith('.csv'):
+    entries = {}
+    with open(args.source, 'rt') as f:
+        for row in csv.reader(f):
+            if row:
+                entries[tuple(float(v) for v in row[:3])] = tuple(int(v) for v in row[3:6])
+else:
+    with open(args.source, 'rt') as f:
+        module = ast.parse(f.read())
+    entries = None
+    for node in module.body:
+        if isinstance(node, ast.Assign) and any(getattr(t, 'id', None) == 'COLOR_LUT' for t in node.targets):
+            entries = ast.literal_eval(node.value)
+    if entries is None:
+        parser.error('{} does not assign COLOR_LUT'.format(args.source))
+
+write_table(entries, args.destination)
+print('Wrote {} entries to {}'.format(len(entries), args.destination))
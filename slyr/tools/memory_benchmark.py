@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+
+"""
+Measures the memory retained by parsed symbols, in bytes per symbol
+"""
+
+import argparse
+import os
+import tracemalloc
+
+from slyr.parser.symbol_parser import read_symbols
+from slyr.parser.intern import InternTable
+from slyr.parser.initalize_registry import initialize_registry
+
+initialize_registry()
+
+parser = argparse.ArgumentParser()
+parser.add_argument('paths', nargs='+', help='bin files, or directories of bin files, to parse')
+parser.add_argument('--repeat', type=int, default=10, help='Number of copies of each symbol to keep resident')
+parser.add_argument('--intern', help='Share repeated colors, fonts and line templates', action='store_true')
+args = parser.parse_args()
+
+blobs = []
+for path in args.paths:
+    if os.path.isdir(path):
+        files = [os.path.join(path, fn) for fn in sorted(os.listdir(path))]
+    else:
+        files = [path]
+    for file in files:
+        with open(file, 'rb') as f:
+            blobs.append(f.read())
+
+# parse once before measuring, so that lazily loaded classes and lookup tables are not counted
+list(read_symbols(blobs, on_error='skip'))
+
+tracemalloc.start()
+before = tracemalloc.get_traced_memory()[0]
+intern_table = InternTable() if args.intern else None
+symbols = []
+for _ in range(args.repeat):
+    symbols.extend(r.symbol for r in read_symbols(blobs, on_error='skip', intern_table=intern_table))
+after = tracemalloc.get_traced_memory()[0]
+tracemalloc.stop()
+
+print('Parsed {} symbols ({} blobs x {})'.format(len(symbols), len(blobs), args.repeat))
+print('Retained {} bytes, {:.0f} bytes per symbol'.format(after - before, (after - before) / len(symbols)))
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+
+"""
+Generates markdown documentation of object binary layouts from their schemas,
+and optionally updates the generated section within specs.md
+"""
+
+import argparse
+from slyr.parser.object_registry import REGISTRY
+from slyr.parser.schema import schema_to_markdown
+from slyr.parser.initalize_registry import initialize_registry
+
+initialize_registry()
+REGISTRY.load_all()
+
+SECTION_START = '<!-- BEGIN GENERATED OBJECT LAYOUTS -->'
+SECTION_END = '<!-- END GENERATED OBJECT LAYOUTS -->'
+
+parser = argparse.ArgumentParser()
+parser.add_argument('--update', help='specs.md file to update')
+args = parser.parse_args()
+
+classes = sorted((c for c in REGISTRY.objects.values() if c.SCHEMA is not None), key=lambda c: c.__name__)
+docs = '\n'.join(schema_to_markdown(c) for c in classes)
+
+if args.update:
+    with open(args.update, 'rt') as f:
+        specs = f.read()
+    start = specs.index(SECTION_START) + len(SECTION_START)
+    end = specs.index(SECTION_END)
+    with open(args.update, 'wt') as f:
+        f.write(specs[:start] + '\n' + docs + specs[end:])
+else:
+    print(docs)
@@ -5,7 +5,6 @@ Dumps the contents of an ESRI .style file to a QGIS style library XML
 """
 
 import argparse
-from io import BytesIO
 from qgis.core import QgsStyle
 from slyr.bintools.extractor import Extractor
 from slyr.parser.symbol_parser import read_symbol, UnreadableSymbolException
@@ -41,9 +40,8 @@ for (fill_style_db, symbol_type) in styles:
         name = raw_symbol[Extractor.NAME]
         # print('{}/{}: {}'.format(index + 1, len(raw_symbols),name))
 
-        handle = BytesIO(raw_symbol[Extractor.BLOB])
         try:
-            symbol = read_symbol(file_handle=handle)
+            symbol = read_symbol(raw_symbol[Extractor.BLOB])
         except UnreadableSymbolException:
             print('Error reading symbol {}'.format(name))
             continue
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+"""
+Synthesizes a large corpus of realistic symbol blobs for benchmarking and fuzzing,
+by writing randomly perturbed copies of existing symbols
+"""
+
+import argparse
+import os
+import random
+
+from slyr.parser.stream import BufferStream, RetainedFields
+from slyr.parser.symbol_parser import write_symbol, PARSE_EXCEPTIONS
+from slyr.parser.object import walk, attribute_names
+from slyr.parser.exceptions import InvalidColorException
+from slyr.parser.initalize_registry import initialize_registry
+
+initialize_registry()
+
+parser = argparse.ArgumentParser()
+parser.add_argument('paths', nargs='+', help='bin files, or directories of bin files, to use as templates')
+parser.add_argument('destination', help='destination folder')
+parser.add_argument('--count', type=int, default=100000, help='Number of symbols to write')
+parser.add_argument('--seed', type=int, default=0, help='Random seed')
+args = parser.parse_args()
+
+blobs = []
+for path in args.paths:
+    if os.path.isdir(path):
+        files = [os.path.join(path, fn) for fn in sorted(os.listdir(path))]
+    else:
+        files = [path]
+    for file in files:
+        with open(file, 'rb') as f:
+            blobs.append(f.read())
+
+rng = random.Random(args.seed)
+os.makedirs(args.destination, exist_ok=True)
+
+written = 0
+while written < args.count:
+    retained = RetainedFields()
+    stream = BufferStream(rng.choice(blobs))
+    stream.retained = retained
+    try:
+        symbol = stream.read_object()
+    except PARSE_EXCEPTIONS + (InvalidColorException,):
+        continue
+
+    # scale sizes, offsets and angles of every object in the symbol
+    for step in walk(symbol):
+        for name in attribute_names(step.obj.__class__):
+            value = getattr(step.obj, name, None)
+            if isinstance(value, float):
+                setattr(step.obj, name, value * rng.uniform(0.5, 2))
+
+    with open(os.path.join(args.destination, '{:07d}.bin'.format(written)), 'wb') as f:
+        f.write(write_symbol(symbol, retained))
+    written += 1
+
+print('Wrote {} symbols from {} templates'.format(written, len(blobs)))